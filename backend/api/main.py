@@ -1,4 +1,5 @@
 import logging
+import time
 from fastapi import FastAPI, Request, status, WebSocket
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
@@ -10,6 +11,7 @@ from backend.api.routes.data_routes import DataRouter
 from backend.api.routes.library_routes import LibraryRouter
 from backend.api.routes.settings_routes import SettingsRouter
 from backend.api.routes.playground_routes import PlaygroundRouter
+from backend.api.routes.metrics_routes import MetricsRouter
 from backend.controlers.model_control import ModelControl
 from backend.controlers.playground_control import PlaygroundControl
 from backend.controlers.runtime_control import RuntimeControl
@@ -17,6 +19,10 @@ from backend.controlers.library_control import LibraryControl
 from backend.utils.console_train_stream import start_console_stream_server
 from backend.utils.console_train_stream import start_load_model_server
 from backend.utils.console_train_stream import start_unload_model_server
+from backend.utils.results_store import results_store
+from backend.utils.metrics import HTTP_REQUEST_ERRORS, HTTP_REQUEST_SECONDS
+from backend.core.exceptions import ServerBusyError
+from backend.utils.api_response import error_response
 
 # Initialize logging
 logging.basicConfig(level=logging.DEBUG)
@@ -42,18 +48,33 @@ playground_control = PlaygroundControl(model_control)
 library_control._initialise_library()
 RuntimeControl._initialise_runtime_data()
 
+# Evict stale result artefacts left over from previous sessions
+results_store.collect_garbage()
+
 # Create router instances
 model_router = ModelRouter(model_control)
 data_router = DataRouter()
 library_router = LibraryRouter(library_control)
 settings_router = SettingsRouter()
 playground_router = PlaygroundRouter(playground_control)
+metrics_router = MetricsRouter(model_control)
 
 # Add logging middleware
 @app.middleware("http")
 async def log_requests(request, call_next):
     logger.info(f"New request: {request.method} {request.url}")
-    response = await call_next(request)
+    start_time = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        # label by route template so path parameters do not create a series per value
+        route = request.scope.get("route")
+        labels = {"method": request.method, "route": getattr(route, "path", "unmatched"), "status": str(status_code)}
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start_time, **labels)
+        if status_code >= 500:
+            HTTP_REQUEST_ERRORS.inc(**labels)
     logger.info(f"Completed response: {response.status_code}")
     return response
 
@@ -65,12 +86,20 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         content=jsonable_encoder({"error": exc.errors()}),
     )
 
+# Reject work the executors have no room for, clients are asked to retry shortly
+@app.exception_handler(ServerBusyError)
+async def server_busy_exception_handler(request: Request, exc: ServerBusyError):
+    response = error_response(message=str(exc), status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+    response.headers["Retry-After"] = "1"
+    return response
+
 # Include routers
 app.include_router(model_router.router, prefix="/model", tags=["model"])
 app.include_router(data_router.router, prefix="/data", tags=["data"])
 app.include_router(library_router.router, prefix="/library", tags=["library"])
 app.include_router(settings_router.router, prefix="/settings", tags=["settings"])
 app.include_router(playground_router.router, prefix="/playground", tags=["playground"])
+app.include_router(metrics_router.router, tags=["metrics"])
 
 # Establish WebSocket route for prediction
 @app.websocket("/ws/predict-live/{model_id}")
@@ -80,7 +109,7 @@ async def predict_live(websocket: WebSocket, model_id: str):
 # Establish WebSocket route for training
 @app.websocket("/ws/console-stream/{model_id}/{action}/{epochs}/{batch_size}/{learning_rate}/{dataset_id}/{imgsz}")
 async def console_stream(websocket: WebSocket, model_id: str, action: str, epochs: int, batch_size: int, learning_rate: float, dataset_id: str, imgsz: int):
-    await start_console_stream_server(websocket, model_id, action, epochs, batch_size, learning_rate, dataset_id, imgsz)
+    await start_console_stream_server(websocket, model_control, model_id, action, epochs, batch_size, learning_rate, dataset_id, imgsz)
 
 # Establish WebSocket route for loading models
 @app.websocket("/ws/load-model/{model_id}")
@@ -19,8 +19,9 @@ from backend.utils.file_type_manager import FileTypeManager
 from backend.utils.api_response import success_response, error_response
 from fastapi.responses import FileResponse
 
-from backend.core.exceptions import FileReadError, ModelError, ModelNotAvailableError
+from backend.core.exceptions import FileReadError, ModelError, ModelNotAvailableError, ServerBusyError
 from backend.utils.api_response import error_response, success_response
+from backend.utils.executors import CPU, IO, executors
 
 logger = logging.getLogger(__name__)
 
@@ -54,8 +55,10 @@ class DataRouter:
     async def upload_dataset(self, request: DatasetProcessRequest):
         try:
             dataset_file_management = DatasetFileManagement()
-            result = dataset_file_management.upload_dataset(request.file_path)
+            result = await executors.run(IO, dataset_file_management.upload_dataset, request.file_path)
             return result
+        except ServerBusyError:
+            raise
         except Exception as e:
             logger.error(f"Error uploading dataset: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -82,6 +85,10 @@ class DataRouter:
     #         raise HTTPException(status_code=500, detail=str(e))
 
     async def upload_image_dataset(self, request: DatasetProcessRequest):
+        # copying and unpacking the archive is blocking, it runs on the CPU executor
+        return await executors.run(CPU, self._upload_image_dataset, request)
+
+    def _upload_image_dataset(self, request: DatasetProcessRequest):
         dataset_dir = ""
         try:
             source_path = Path(request.file_path)
@@ -109,7 +116,7 @@ class DataRouter:
         try:
             dataset_manager = DatasetManagement(model_name=request.model_name)
             file_path = Path(request.file_path)
-            result = dataset_manager.process_dataset(file_path)
+            result = await executors.run(CPU, dataset_manager.process_dataset, file_path)
             return success_response(message="Dataset processed successfully", data=result)
         except ModelError as e:
             logger.error(f"ModelError in process_dataset: {str(e)}")
@@ -117,6 +124,8 @@ class DataRouter:
         except ValueError as e:
             logger.error(f"ValueError in process_dataset: {str(e)}")
             return error_response(message=str(e), status_code=400)
+        except ServerBusyError:
+            raise
         except Exception as e:
             logger.error(f"Unexpected error in process_dataset: {str(e)}", exc_info=True)
             return error_response(message=f"An unexpected error occurred: {str(e)}", status_code=500)
@@ -124,7 +133,9 @@ class DataRouter:
     async def list_datasets(self):
         try:
             dataset_file_management = DatasetFileManagement()
-            return dataset_file_management.list_datasets()
+            return await executors.run(IO, dataset_file_management.list_datasets)
+        except ServerBusyError:
+            raise
         except Exception as e:
             logger.error(f"Error listing datasets: {str(e)}", exc_info=True)
             raise HTTPException(status_code=500, detail=f"Error listing datasets: {str(e)}")
@@ -132,7 +143,9 @@ class DataRouter:
     async def list_datasets_names(self):
         try:
             dataset_file_management = DatasetFileManagement()
-            return dataset_file_management.list_datasets_names()
+            return await executors.run(IO, dataset_file_management.list_datasets_names)
+        except ServerBusyError:
+            raise
         except Exception as e:
             logger.error(f"Error listing datasets: {str(e)}", exc_info=True)
             raise HTTPException(status_code=500, detail=f"Error listing datasets: {str(e)}")
@@ -147,8 +160,10 @@ class DataRouter:
     async def preview_dataset(self, dataset_name: str):
         try:
             dataset_file_management = DatasetFileManagement()
-            result = dataset_file_management.preview_dataset(dataset_name)
+            result = await executors.run(IO, dataset_file_management.preview_dataset, dataset_name)
             return result
+        except ServerBusyError:
+            raise
         except Exception as e:
             logger.error(f"Error previewing dataset: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -156,8 +171,10 @@ class DataRouter:
     async def get_dataset_processing_status(self, dataset_name: str):
         try:
             dataset_file_management = DatasetFileManagement()
-            result = dataset_file_management.get_dataset_processing_status(dataset_name)
+            result = await executors.run(IO, dataset_file_management.get_dataset_processing_status, dataset_name)
             return result
+        except ServerBusyError:
+            raise
         except Exception as e:
             logger.error(f"Error getting dataset processing status: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -165,8 +182,10 @@ class DataRouter:
     async def delete_dataset(self, dataset_name: str):
         try:
             dataset_file_management = DatasetFileManagement()
-            result = dataset_file_management.delete_dataset(dataset_name)
+            result = await executors.run(IO, dataset_file_management.delete_dataset, dataset_name)
             return result
+        except ServerBusyError:
+            raise
         except Exception as e:
             logger.error(f"Error deleting dataset: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -174,8 +193,10 @@ class DataRouter:
     async def get_dataset_processing_info(self, dataset_name: str, processing_type: str):
         try:
             dataset_file_management = DatasetFileManagement()
-            result = dataset_file_management.get_dataset_processing_info(dataset_name, processing_type)
+            result = await executors.run(IO, dataset_file_management.get_dataset_processing_info, dataset_name, processing_type)
             return result
+        except ServerBusyError:
+            raise
         except Exception as e:
             logger.error(f"Error getting dataset processing info: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -183,7 +204,9 @@ class DataRouter:
     async def get_datasets_tracker_info(self):
         try:
             dataset_file_management = DatasetFileManagement()
-            return dataset_file_management.get_datasets_tracker_info()
+            return await executors.run(IO, dataset_file_management.get_datasets_tracker_info)
+        except ServerBusyError:
+            raise
         except Exception as e:
             logger.error(f"Error getting datasets with tracker info: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -192,29 +215,31 @@ class DataRouter:
                                     embedding_id: Annotated[str, Body()] = ...,
                                     embedding: Annotated[list, Body()] = ...):
         try:
-            SpeakerEmbeddingManager.add_speaker_embedding(embedding_id, embedding)
+            await executors.run(IO, SpeakerEmbeddingManager.add_speaker_embedding, embedding_id, embedding)
             return success_response(message="Successfully added new speaker embedding")
+        except ServerBusyError:
+            raise
         except Exception as e:
             return error_response(message=f"Unexpected Error: {str(e)}", status_code=500)
 
     async def remove_speaker_embedding(self, embedding_id: str):
         try:
-            SpeakerEmbeddingManager.remove_speaker_embedding(embedding_id)
+            await executors.run(IO, SpeakerEmbeddingManager.remove_speaker_embedding, embedding_id)
             return success_response(status_code=204)
         except KeyError:
             return error_response(message=f"Speaker Embedding {embedding_id} does not exist.", status_code=404)
         
     async def list_speaker_embedding(self):
-        embeddings = SpeakerEmbeddingManager.list_speaker_embedding()
+        embeddings = await executors.run(IO, SpeakerEmbeddingManager.list_speaker_embedding)
         return success_response(data=embeddings)
 
     async def reset_speaker_embedding(self):
-        embeddings = SpeakerEmbeddingManager.reset_speaker_embedding()
+        embeddings = await executors.run(IO, SpeakerEmbeddingManager.reset_speaker_embedding)
         return success_response(message="Successfully Reset All Speaker Embeddings",
                                 data=embeddings)
         
     async def configure_speaker_embeddings(self, speaker_embeddings: Annotated[dict[str, list[float]], Body(embed=True)] = ...):
-        SpeakerEmbeddingManager.configure_speaker_embeddings(speaker_embeddings)
+        await executors.run(IO, SpeakerEmbeddingManager.configure_speaker_embeddings, speaker_embeddings)
         return success_response(message="Successfully Overwrite Speaker Embeddings")
 
     
@@ -230,10 +255,12 @@ class DataRouter:
     async def get_dataset_report(self, dataset_name: str, processing_type: str):
         try:
             dataset_file_management = DatasetFileManagement()
-            report_path = dataset_file_management.get_dataset_report(dataset_name, processing_type)
+            report_path = await executors.run(IO, dataset_file_management.get_dataset_report, dataset_name, processing_type)
             if report_path is None:
                 raise HTTPException(status_code=404, detail="Report not found")
             return FileResponse(report_path, media_type="text/html")
+        except ServerBusyError:
+            raise
         except Exception as e:
             logger.error(f"Error getting dataset report: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
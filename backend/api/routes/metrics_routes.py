@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+
+from backend.controlers.model_control import ModelControl
+from backend.utils.metrics import registry
+
+# content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+class MetricsRouter:
+    def __init__(self, model_control: ModelControl):
+        self.router = APIRouter()
+        self.model_control = model_control
+
+        self.router.add_api_route("/metrics", self.get_metrics, methods=["GET"])
+
+    async def get_metrics(self):
+        # collecting from the model processes goes through their pipes, which must not block the event loop
+        worker_snapshots = await run_in_threadpool(self.model_control.collect_worker_metrics)
+        return PlainTextResponse(registry.render(worker_snapshots), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,10 +1,11 @@
+import asyncio
 import logging
 from typing import Annotated
 
 import cv2
 import numpy as np
-from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Body, Query, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi.responses import JSONResponse, FileResponse
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel, Field
 
@@ -15,9 +16,12 @@ from backend.utils.process_vis_out import process_vision_output, _ensure_json_se
 from PIL import Image
 from io import BytesIO
 import base64
-from backend.core.exceptions import FileReadError, ModelError, ModelNotAvailableError
+from backend.core.exceptions import FileReadError, ModelError, ModelNotAvailableError, ServerBusyError
 from backend.utils.api_response import error_response, success_response
-from backend.utils.console_train_stream import start_console_stream_server
+from backend.utils.console_train_stream import start_console_stream_server, stream_training_job
+from backend.utils.executors import CPU, IO, MODEL_IPC, executors, wait_for_event
+from backend.utils.results_store import results_store
+from backend.utils.training_telemetry import read_metrics_log
 
 
 logger = logging.getLogger(__name__)
@@ -37,6 +41,7 @@ class ProcessImageOutputRequest(BaseModel):
     image_path: str
     output: dict
     task: str
+    result_delivery: str = "url"
 
 class TrainRequest(BaseModel):
     model_id: str
@@ -64,34 +69,99 @@ class ModelRouter:
 
         # Define routes
         self.router.add_api_route("/download-model", self.download_model, methods=["POST"])
+        self.router.add_api_route("/download-jobs/start", self.start_download_job, methods=["POST"])
+        self.router.add_api_route("/download-jobs/status", self.get_download_job, methods=["GET"])
+        self.router.add_api_route("/download-jobs/list", self.list_download_jobs, methods=["GET"])
+        self.router.add_api_route("/download-jobs/cancel", self.cancel_download_job, methods=["POST"])
         self.router.add_api_route("/load", self.load_model, methods=["POST"])
         self.router.add_api_route("/unload", self.unload_model, methods=["POST"])
         self.router.add_api_route("/is-model-loaded", self.is_model_loaded, methods=["GET"])
         self.router.add_api_route("/active", self.list_active_models, methods=["GET"])
         self.router.add_api_route("/inference", self.inference, methods=["POST"])
         self.router.add_api_route("/train", self.train_model, methods=["POST"])
+        self.router.add_api_route("/training-jobs/start", self.start_training_job, methods=["POST"])
+        self.router.add_api_route("/training-jobs/status", self.get_training_job, methods=["GET"])
+        self.router.add_api_route("/training-jobs/list", self.list_training_jobs, methods=["GET"])
+        self.router.add_api_route("/training-jobs/cancel", self.cancel_training_job, methods=["POST"])
+        self.router.add_api_route("/training-jobs/metrics", self.get_training_metrics_log, methods=["GET"])
         self.router.add_api_route("/configure", self.configure_model, methods=["POST"])
         self.router.add_api_route("/process-image", self.process_image, methods=["POST"], response_model=dict)
         self.router.add_api_route("/reset-config", self.reset_model_config, methods=["POST"])
         self.router.add_api_route("/hardware-usage", self.get_model_hardware_usage, methods=["GET"])
+        self.router.add_api_route("/hardware-usage/history", self.get_model_hardware_history, methods=["GET"])
+        self.router.add_api_route("/profile", self.profile_model, methods=["POST"])
+        self.router.add_api_route("/results/cleanup", self.cleanup_results, methods=["POST"])
+        self.router.add_api_route("/results/{filename}", self.get_result, methods=["GET"])
 
         self.router.add_api_route("/delete-model", self.delete_model, methods=["DELETE"])
         self.router.add_websocket_route("/ws/predict-live/{model_id}", self.predict_live)
+        self.router.add_websocket_route("/ws/download-progress/{job_id}", self.download_progress)
+        self.router.add_websocket_route("/ws/training-metrics/{job_id}", self.training_metrics)
         self.router.add_websocket_route("/ws/console-stream/{model_id}/{action}/{epochs}/{batch_size}/{learning_rate}/{dataset_id}/{imgsz}", self.console_stream)
         
     
     async def download_model(self, model_id: str = Query(...), auth_token: str = Query(None)):
         try:
-            self.model_control.download_model(model_id, auth_token)
+            submitted = await executors.run(IO, self.model_control.submit_download, model_id, auth_token)
+            job = self.model_control.download_manager.get_job(submitted["job_id"])
+            # the download runs in the download manager, it is waited for without holding an executor thread
+            await wait_for_event(job.done_event)
+            self.model_control.download_outcome(job)
             return success_response(message=f"Model {model_id} downloaded successfully")
         except ModelNotAvailableError as e:
             return error_response(message=str(e), status_code=503)  # 503 Service Unavailable
         except (ModelError, ValueError) as e:
             return error_response(message=str(e), status_code=500)
+
+    async def start_download_job(self, model_id: str = Query(...), auth_token: str = Query(None)):
+        try:
+            result = await executors.run(IO, self.model_control.submit_download, model_id, auth_token)
+            return success_response(message=f"Download of model {model_id} queued", data=result, status_code=202)
+        except ValueError as e:
+            return error_response(message=str(e), status_code=404)
+
+    async def get_download_job(self, job_id: str = Query(...)):
+        try:
+            result = self.model_control.download_manager.get_job(job_id).to_dict()
+            return success_response(data=result)
+        except KeyError as e:
+            return error_response(message=str(e), status_code=404)
+
+    async def list_download_jobs(self):
+        return success_response(data=self.model_control.download_manager.list_jobs())
+
+    async def cancel_download_job(self, job_id: Annotated[str, Body(embed=True)] = ...):
+        try:
+            result = self.model_control.download_manager.cancel(job_id).to_dict()
+            return success_response(message=f"Download job {job_id} cancelled", data=result)
+        except KeyError as e:
+            return error_response(message=str(e), status_code=404)
+        except ModelError as e:
+            return error_response(message=str(e), status_code=409)
+
+    async def download_progress(self, websocket: WebSocket, job_id: str):
+        await websocket.accept()
+        try:
+            job = self.model_control.download_manager.get_job(job_id)
+        except KeyError as e:
+            await websocket.send_json({"error": str(e)})
+            await websocket.close()
+            return
+        try:
+            # push the job status until it finishes
+            while True:
+                await websocket.send_json(job.to_dict())
+                if job.is_finished():
+                    break
+                await asyncio.sleep(0.5)
+        except WebSocketDisconnect:
+            logger.info(f"Download progress WebSocket disconnected for job: {job_id}")
+            return
+        await websocket.close()
     
     async def load_model(self, model_id: str = Query(...)):
         try:
-            self.model_control.load_model(model_id)
+            await executors.run(MODEL_IPC, self.model_control.load_model, model_id)
             return success_response(message=f"Model {model_id} loaded successfully")
         except ValueError as e:
             return error_response(message=str(e), status_code=404)
@@ -102,7 +172,7 @@ class ModelRouter:
     
     async def unload_model(self, model_id: str = Query(...)):
         try:
-            self.model_control.unload_model(model_id)
+            await executors.run(MODEL_IPC, self.model_control.unload_model, model_id)
             return success_response(message=f"Model {model_id} unloaded successfully")
         except ModelError as e:
             return error_response(message=str(e), status_code=409)
@@ -124,7 +194,7 @@ class ModelRouter:
 
     async def inference(self, inferenceRequest: InferenceRequest):
         try:
-            result = self.model_control.inference(jsonable_encoder(inferenceRequest))
+            result = await executors.run(MODEL_IPC, self.model_control.inference, jsonable_encoder(inferenceRequest))
             return success_response(data=result)
         except KeyError as e:
             return error_response(message=str(e), status_code=400)
@@ -135,19 +205,70 @@ class ModelRouter:
 
     async def train_model(self, trainRequest: TrainRequest):
         try:
-            data, message = self.model_control.train_model(jsonable_encoder(trainRequest))
+            submitted = await executors.run(IO, self.model_control.submit_training, jsonable_encoder(trainRequest))
+            job = self.model_control.training_manager.get_job(submitted["job_id"])
+            # the training runs in its own process, it is waited for without holding an executor thread
+            await wait_for_event(job.done_event, poll_interval=1.0)
+            data, message = self.model_control.training_outcome(job)
             return success_response(data=data, message=message)
         except KeyError as e:
             return error_response(message=str(e), status_code=422)
+        except ServerBusyError:
+            raise
         except Exception as e:
             return error_response(message=str(e), status_code=500)
 
+    async def start_training_job(self, trainRequest: TrainRequest):
+        try:
+            result = await executors.run(IO, self.model_control.submit_training, jsonable_encoder(trainRequest))
+            return success_response(message=f"Training of model {trainRequest.model_id} queued", data=result, status_code=202)
+        except ValueError as e:
+            return error_response(message=str(e), status_code=404)
+
+    async def get_training_job(self, job_id: str = Query(...)):
+        try:
+            result = self.model_control.training_manager.get_job(job_id).to_dict()
+            return success_response(data=result)
+        except KeyError as e:
+            return error_response(message=str(e), status_code=404)
+
+    async def list_training_jobs(self):
+        return success_response(data=self.model_control.training_manager.list_jobs())
+
+    async def cancel_training_job(self, job_id: Annotated[str, Body(embed=True)] = ...):
+        try:
+            result = self.model_control.training_manager.cancel(job_id).to_dict()
+            return success_response(message=f"Training job {job_id} cancelled", data=result)
+        except KeyError as e:
+            return error_response(message=str(e), status_code=404)
+        except ModelError as e:
+            return error_response(message=str(e), status_code=409)
+
+    async def training_metrics(self, websocket: WebSocket, job_id: str):
+        await websocket.accept()
+        try:
+            job = self.model_control.training_manager.get_job(job_id)
+        except KeyError as e:
+            await websocket.send_json({"error": str(e)})
+            await websocket.close()
+            return
+        await stream_training_job(websocket, job)
+
+    async def get_training_metrics_log(self, job_id: str = Query(...)):
+        try:
+            job = self.model_control.training_manager.get_job(job_id)
+            return success_response(data=await executors.run(IO, read_metrics_log, job.metrics_log_path))
+        except KeyError as e:
+            return error_response(message=str(e), status_code=404)
+
     async def configure_model(self, configureRequest: ConfigureRequest):
         try:
-            response = self.model_control.configure_model(jsonable_encoder(configureRequest))
+            response = await executors.run(IO, self.model_control.configure_model, jsonable_encoder(configureRequest))
             return success_response(message=response)
         except KeyError as e:
             return error_response(message=str(e), status_code=400)
+        except ServerBusyError:
+            raise
         except Exception as e:
             return error_response(message=str(e), status_code=500)
         
@@ -156,28 +277,45 @@ class ModelRouter:
             output = request.output
             if isinstance(output, list):
                 output = {"predictions": output}
-            processed_output = self.model_control.process_image(request.image_path, output, request.task)
+            processed_output = await executors.run(CPU, self.model_control.process_image, request.image_path, output, request.task, request.result_delivery)
             return processed_output
         except ValueError as e:
             logger.error(f"Error in process_image: {str(e)}")
             return error_response(message=str(e), status_code=400)
+        except ServerBusyError:
+            raise
         except Exception as e:
             logger.error(f"Error in process_image: {str(e)}")
             return error_response(message=str(e), status_code=500)
 
+    async def get_result(self, filename: str):
+        try:
+            result_path = results_store.get_path(filename)
+            return FileResponse(result_path, filename=filename)
+        except ValueError as e:
+            return error_response(message=str(e), status_code=400)
+        except FileNotFoundError as e:
+            return error_response(message=str(e), status_code=404)
+
+    async def cleanup_results(self):
+        result = await executors.run(IO, results_store.collect_garbage)
+        return success_response(message="Result artefacts cleaned up", data=result)
+
     async def reset_model_config(self, resetRequest: ResetConfigRequest):
         try:
-            result = self.model_control.reset_model_config(jsonable_encoder(resetRequest.model_id))
+            result = await executors.run(IO, self.model_control.reset_model_config, jsonable_encoder(resetRequest.model_id))
             if "error" not in result:
                 return {"message": f"Configuration reset for model {resetRequest.model_id}", "result": result}
             else:
                 raise HTTPException(status_code=400, detail=result["error"])
+        except ServerBusyError:
+            raise
         except Exception as e:
             logger.error(f"Error resetting model configuration: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
         
     async def console_stream(self, websocket: WebSocket, model_id: str, action: str, epochs: int, batch_size: int, learning_rate: float, dataset_id: str, imgsz: int):
-        await start_console_stream_server(websocket, model_id, action, epochs, batch_size, learning_rate, dataset_id, imgsz)
+        await start_console_stream_server(websocket, self.model_control, model_id, action, epochs, batch_size, learning_rate, dataset_id, imgsz)
 
     #async def predict_live(self, websocket: WebSocket, model_id: str):
     #    await websocket.accept()
@@ -196,7 +334,7 @@ class ModelRouter:
 
     async def delete_model(self, model_id: str = Query(...)):
         try:
-            response = self.model_control.delete_model(model_id)
+            response = await executors.run(IO, self.model_control.delete_model, model_id)
             return success_response(message=response)
         except ModelError as e:
             return error_response(message=str(e), status_code=409)
@@ -215,14 +353,6 @@ class ModelRouter:
                 await websocket.close()
                 return
 
-            active_model = self.model_control.get_active_model(model_id)
-            if not active_model:
-                logger.error(f"Model {model_id} is not found or not loaded")
-                await websocket.send_json({"error": f"Model {model_id} is not found or not loaded"})
-                await websocket.close()
-                return
-
-            conn = active_model['conn']
             logger.info(f"Starting inference loop for model: {model_id}")
 
             while True:
@@ -245,10 +375,9 @@ class ModelRouter:
                         await websocket.send_json({"error": f"Failed to decode frame data: {str(decode_error)}"})
                         continue
                     
-                    # Send the frame for inference
-                    conn.send({"task": "inference", "data": {"video_frame": frame.tolist()}})
-                    logger.info("Sent frame for inference")
-                    prediction = conn.recv()
+                    # Send the frame for inference, sharing the model's pipe with other requests
+                    prediction = await executors.run(MODEL_IPC, self.model_control.inference,
+                                                     {"model_id": model_id, "data": {"video_frame": frame.tolist()}})
                     logger.info(f"Received prediction: {prediction}")
                     
                     # Send the prediction back 
@@ -266,12 +395,39 @@ class ModelRouter:
             logger.info(f"Closing WebSocket connection for model: {model_id}")
             await websocket.close()
 
+    async def profile_model(self, model_id: str = Query(...), duration: float = Query(10.0),
+                            torch_trace: bool = Query(False)):
+        try:
+            await executors.run(MODEL_IPC, self.model_control.start_profile, model_id, duration, torch_trace)
+            # shielded so the profiler is stopped even if the client goes away during the window
+            profile = await asyncio.shield(self._finish_profile(model_id, duration))
+            return success_response(data=profile, message=f"Profiled model {model_id} for {duration} seconds")
+        except KeyError as e:
+            return error_response(message=str(e), status_code=404)
+        except ValueError as e:
+            return error_response(message=str(e), status_code=422)
+        except ModelError as e:
+            return error_response(message=str(e), status_code=409)
+
+    async def _finish_profile(self, model_id: str, duration: float):
+        # the pipe is free in the meantime, the requests served now are the ones profiled
+        await asyncio.sleep(duration)
+        return await executors.run(MODEL_IPC, self.model_control.stop_profile, model_id)
+
     async def get_model_hardware_usage(self, model_id: str = Query(...)):
         try:
             usage = self.model_control.get_model_hardware_usage(model_id)
             if usage is None:
                 raise HTTPException(status_code=404, detail=f"Model {model_id} not found or not active")
             return JSONResponse(content=usage)
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error getting hardware usage for model {model_id}: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
+
+    async def get_model_hardware_history(self, model_id: str = Query(...), since: float = Query(None)):
+        history = self.model_control.get_model_hardware_history(model_id, since)
+        if history is None:
+            raise HTTPException(status_code=404, detail=f"Model {model_id} not found or not active")
+        return JSONResponse(content=history)
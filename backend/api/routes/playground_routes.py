@@ -1,11 +1,16 @@
 from fastapi import APIRouter, Query, Body
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Annotated
+from typing import Dict, List, Annotated
 from backend.controlers.playground_control import PlaygroundControl
 from backend.utils.api_response import success_response, error_response
+import json
 import logging
+import queue
+import threading
 from fastapi.encoders import jsonable_encoder
-from backend.core.exceptions import FileReadError, FileWriteError, PlaygroundError, PlaygroundAlreadyExistsError, ChainNotCompatibleError
+from backend.core.exceptions import FileReadError, FileWriteError, ModelError, PlaygroundError, PlaygroundAlreadyExistsError, ChainNotCompatibleError, ServerBusyError
+from backend.utils.executors import IO, MODEL_IPC, executors
 
 logger = logging.getLogger(__name__)
 
@@ -22,9 +27,21 @@ class ChainConfigureRequest(BaseModel):
     playground_id: str = ...
     chain: List[str]
     
+class DagConfigureRequest(BaseModel):
+    playground_id: str = ...
+    dag: Dict[str, List[str]]
+
 class InferenceRequest(BaseModel):
     playground_id: str = ...
-    data: dict = ...
+    data: dict = None
+    batch: List[dict] = None
+
+class BatchJobRequest(BaseModel):
+    playground_id: str = ...
+    items: list = None
+    dataset_path: str = None
+    text_column: str = "text"
+    micro_batch_size: int = 16
 
 class PlaygroundRouter:
     def __init__(self, playground_control: PlaygroundControl):
@@ -40,15 +57,24 @@ class PlaygroundRouter:
         self.router.add_api_route("/list", self.list_playgrounds, methods=["GET"])
         self.router.add_api_route("/info", self.get_playground_info, methods=["GET"])
         self.router.add_api_route("/configure-chain", self.configure_chain, methods=["POST"])
+        self.router.add_api_route("/configure-dag", self.configure_dag, methods=["POST"])
         self.router.add_api_route("/load-chain", self.load_playground_chain, methods=["POST"])
+        self.router.add_api_route("/load-chain-stream", self.load_playground_chain_stream, methods=["POST"])
         self.router.add_api_route("/stop-chain", self.stop_playground_chain, methods=["POST"])
         self.router.add_api_route("/inference", self.inference, methods=["POST"])
+        self.router.add_api_route("/inference-stream", self.inference_stream, methods=["POST"])
+        self.router.add_api_route("/batch-job/start", self.start_batch_job, methods=["POST"])
+        self.router.add_api_route("/batch-job/resume", self.resume_batch_job, methods=["POST"])
+        self.router.add_api_route("/batch-job/cancel", self.cancel_batch_job, methods=["POST"])
+        self.router.add_api_route("/batch-job/status", self.get_batch_job, methods=["GET"])
+        self.router.add_api_route("/batch-job/list", self.list_batch_jobs, methods=["GET"])
+        self.router.add_api_route("/batch-job/results", self.get_batch_job_results, methods=["GET"])
 
     async def create_playground(self, request: CreatePlaygroundRequest):
         try:
             playground_id = request.playground_id
             description = request.description
-            result = self.playground_control.create_playground(playground_id, description)
+            result = await executors.run(IO, self.playground_control.create_playground, playground_id, description)
             message = f"Successfully created new playground with ID: {playground_id}"
             return success_response(message=message, data=result, status_code=201)
         except PlaygroundAlreadyExistsError as e:
@@ -58,7 +84,9 @@ class PlaygroundRouter:
 
     async def update_playground(self, request: UpdatePlaygroundRequest):
         try:
-            result = self.playground_control.update_playground_info(
+            result = await executors.run(
+                IO,
+                self.playground_control.update_playground_info,
                 playground_id=request.playground_id, 
                 new_playground_id=request.new_playground_id, 
                 description=request.description
@@ -68,12 +96,14 @@ class PlaygroundRouter:
             return error_response(message=str(e), status_code=404)
         except FileWriteError as e:
             return error_response(message=str(e), status_code=500)
+        except ServerBusyError:
+            raise
         except Exception as e:
             return error_response(message=str(e), status_code=500)
         
     async def delete_playground(self, playground_id: str = Query(...)):
         try:
-            result = self.playground_control.delete_playground(playground_id)
+            result = await executors.run(IO, self.playground_control.delete_playground, playground_id)
             if result:
                 return success_response(status_code=204)
         except KeyError as e:
@@ -85,7 +115,7 @@ class PlaygroundRouter:
 
     async def add_model_to_playground(self, playground_id: str = Body(...), model_id: str = Body(...)):
         try:
-            result = self.playground_control.add_model_to_playground(playground_id, model_id)
+            result = await executors.run(IO, self.playground_control.add_model_to_playground, playground_id, model_id)
             return success_response(message=f"Model {model_id} added to playground {playground_id}", data=result, status_code=200)
         except KeyError as e:
             return error_response(message=str(e), status_code=404)
@@ -94,7 +124,7 @@ class PlaygroundRouter:
 
     async def remove_model_from_playground(self, playground_id: str = Body(...), model_id: str = Body(...)):
         try:
-            result = self.playground_control.remove_model_from_playground(playground_id, model_id)
+            result = await executors.run(IO, self.playground_control.remove_model_from_playground, playground_id, model_id)
             if result:
                 return success_response(status_code=204)
         except KeyError as e:
@@ -114,7 +144,7 @@ class PlaygroundRouter:
 
     async def configure_chain(self, request: ChainConfigureRequest = ...):
         try:
-            result = self.playground_control.configure_chain(request.playground_id, request.chain)
+            result = await executors.run(IO, self.playground_control.configure_chain, request.playground_id, request.chain)
             return success_response(message="Chain configured successfully", data=result, status_code=200)
         except KeyError as e:
             return error_response(message=str(e), status_code=404)
@@ -125,32 +155,150 @@ class PlaygroundRouter:
         except FileWriteError as e:
             return error_response(message=str(e), status_code=500)
         
+    async def configure_dag(self, request: DagConfigureRequest = ...):
+        try:
+            result = await executors.run(IO, self.playground_control.configure_dag, request.playground_id, request.dag)
+            return success_response(message="DAG configured successfully", data=result, status_code=200)
+        except KeyError as e:
+            return error_response(message=str(e), status_code=404)
+        except ChainNotCompatibleError as e:
+            return error_response(message=str(e), status_code=422)
+        except PlaygroundError as e:
+            return error_response(message=str(e), status_code=409)
+        except FileWriteError as e:
+            return error_response(message=str(e), status_code=500)
+
     async def load_playground_chain(self, playground_id: Annotated[str, Body(embed=True)] = ...):
         try:
-            result = self.playground_control.load_playground_chain(playground_id)
+            result = await executors.run(MODEL_IPC, self.playground_control.load_playground_chain, playground_id)
             return success_response(message="Playground chain loaded successfully", data=result, status_code=200)
         except KeyError as e:
             return error_response(message=str(e), status_code=404)
         except (FileReadError, FileWriteError) as e:
             return error_response(message=str(e), status_code=500)
+        except ModelError as e:
+            return error_response(message=str(e), status_code=500)
+
+    async def load_playground_chain_stream(self, playground_id: Annotated[str, Body(embed=True)] = ...):
+        if playground_id not in self.playground_control.playgrounds:
+            return error_response(message=f"Playground {playground_id} not found", status_code=404)
+
+        events = queue.Queue()
+
+        def load_chain():
+            try:
+                result = self.playground_control.load_playground_chain(playground_id, on_progress=events.put)
+                events.put({"done": True, "data": result})
+            except Exception as e:
+                logger.error(f"Error loading chain for playground {playground_id}: {str(e)}")
+                events.put({"done": True, "error": str(e)})
+
+        def event_stream():
+            # newline-delimited JSON: one event per model as it finishes loading, then a final done event
+            threading.Thread(target=load_chain, daemon=True).start()
+            while True:
+                event = events.get()
+                yield json.dumps(event) + "\n"
+                if event.get("done"):
+                    break
+
+        return StreamingResponse(event_stream(), media_type="application/x-ndjson")
 
     async def stop_playground_chain(self, playground_id: Annotated[str, Body(embed=True)] = ...):
         try:
-            result = self.playground_control.stop_playground_chain(playground_id)
+            result = await executors.run(MODEL_IPC, self.playground_control.stop_playground_chain, playground_id)
             if result:
                 return success_response(status_code=204)
         except KeyError as e:
             return error_response(message=str(e), status_code=404)
         except (FileReadError, FileWriteError) as e:
             return error_response(message=str(e), status_code=500)
+        except ServerBusyError:
+            raise
         except Exception as e:
             return error_response(message=str(e), status_code=500)
 
     async def inference(self, inference_request: InferenceRequest):
         try:
-            result = self.playground_control.inference(jsonable_encoder(inference_request))
+            result = await executors.run(MODEL_IPC, self.playground_control.inference, jsonable_encoder(inference_request))
             return success_response(data=result, status_code=200)
         except KeyError as e:
             return error_response(message=str(e), status_code=404)
+        except ServerBusyError:
+            raise
         except Exception as e:
             return error_response(message=str(e), status_code=500)
+
+    async def inference_stream(self, inference_request: InferenceRequest):
+        request = jsonable_encoder(inference_request)
+        if request["playground_id"] not in self.playground_control.playgrounds:
+            return error_response(message=f"Playground {request['playground_id']} not found", status_code=404)
+        if self.playground_control.playgrounds[request["playground_id"]].dag:
+            return error_response(message="Streaming is only supported for linear chains", status_code=409)
+
+        def event_stream():
+            # newline-delimited JSON: one event per partial output, then a final done or error event
+            try:
+                for chunk in self.playground_control.inference_stream(request):
+                    yield json.dumps({"chunk": jsonable_encoder(chunk)}) + "\n"
+                yield json.dumps({"done": True}) + "\n"
+            except Exception as e:
+                logger.error(f"Error during streaming inference for playground {request['playground_id']}: {str(e)}")
+                yield json.dumps({"error": str(e)}) + "\n"
+
+        return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+    async def start_batch_job(self, request: BatchJobRequest):
+        try:
+            result = await executors.run(
+                IO,
+                self.playground_control.start_batch_job,
+                request.playground_id,
+                items=request.items,
+                dataset_path=request.dataset_path,
+                text_column=request.text_column,
+                micro_batch_size=request.micro_batch_size
+            )
+            return success_response(message="Batch job started", data=result, status_code=202)
+        except KeyError as e:
+            return error_response(message=str(e), status_code=404)
+        except PlaygroundError as e:
+            return error_response(message=str(e), status_code=409)
+        except FileWriteError as e:
+            return error_response(message=str(e), status_code=500)
+
+    async def resume_batch_job(self, job_id: Annotated[str, Body(embed=True)] = ...):
+        try:
+            result = await executors.run(IO, self.playground_control.resume_batch_job, job_id)
+            return success_response(message="Batch job resumed", data=result, status_code=202)
+        except KeyError as e:
+            return error_response(message=str(e), status_code=404)
+        except PlaygroundError as e:
+            return error_response(message=str(e), status_code=409)
+        except FileWriteError as e:
+            return error_response(message=str(e), status_code=500)
+
+    async def cancel_batch_job(self, job_id: Annotated[str, Body(embed=True)] = ...):
+        try:
+            result = self.playground_control.cancel_batch_job(job_id)
+            return success_response(message="Batch job cancellation requested", data=result, status_code=200)
+        except KeyError as e:
+            return error_response(message=str(e), status_code=404)
+
+    async def get_batch_job(self, job_id: str = Query(...)):
+        try:
+            result = self.playground_control.get_batch_job(job_id)
+            return success_response(data=result, status_code=200)
+        except KeyError as e:
+            return error_response(message=str(e), status_code=404)
+
+    async def list_batch_jobs(self, playground_id: str = Query(None)):
+        result = self.playground_control.list_batch_jobs(playground_id)
+        return success_response(data=result, status_code=200)
+
+    async def get_batch_job_results(self, job_id: str = Query(...)):
+        try:
+            output_path = self.playground_control.get_batch_job_results_path(job_id)
+            return FileResponse(output_path, media_type="application/x-ndjson", filename=f"{job_id}.jsonl")
+        except (KeyError, FileNotFoundError) as e:
+            return error_response(message=str(e), status_code=404)
@@ -0,0 +1,45 @@
+from backend.benchmarks.fixture_models import synthetic_text
+from backend.playground.chain_executor import ChainExecutor
+
+
+def test_load_model_cold(benchmark, served_models):
+    # a new model process loading the weights, the files themselves are in the page cache after the first round
+    def unload():
+        if served_models.is_model_loaded("tiny-bert"):
+            served_models.unload_model("tiny-bert")
+
+    benchmark.pedantic(served_models.load_model, args=("tiny-bert",), setup=unload, rounds=5)
+
+
+def test_load_model_warm(benchmark, served_models):
+    # loading a model that is already loaded
+    served_models.load_model("tiny-bert")
+    benchmark(served_models.load_model, "tiny-bert")
+
+
+def test_inference_pipe_round_trip(benchmark, served_models):
+    benchmark(served_models.inference, {"model_id": "echo-a", "data": {"payload": "hello"}})
+
+
+def test_inference_text_classification(benchmark, served_models, rng):
+    payload = synthetic_text(rng, 64)
+    served_models.load_model("tiny-bert")
+    benchmark(served_models.inference, {"model_id": "tiny-bert", "data": {"payload": payload}})
+
+
+def test_inference_batch_text_classification(benchmark, served_models, rng):
+    batch = [{"payload": synthetic_text(rng, 64)} for _ in range(16)]
+    served_models.load_model("tiny-bert")
+    benchmark(served_models.inference_batch, "tiny-bert", batch)
+
+
+def test_chain_inference(benchmark, served_models, rng):
+    items = [{"payload": synthetic_text(rng, 16)} for _ in range(64)]
+    executor = ChainExecutor(served_models, ["echo-a", "echo-b"])
+    benchmark(executor.run, items)
+
+
+def test_chain_inference_micro_batches(benchmark, served_models, rng):
+    items = [{"payload": synthetic_text(rng, 16)} for _ in range(64)]
+    executor = ChainExecutor(served_models, ["echo-a", "echo-b"])
+    benchmark(executor.run_micro_batches, items, 16, lambda index, result: None)
@@ -0,0 +1,83 @@
+import json
+import pickle
+
+import faiss
+import numpy as np
+import pytest
+
+from backend.benchmarks.conftest import RUN_LARGE_BENCHMARKS
+from backend.benchmarks.fixture_models import synthetic_text
+from backend.utils.bm25 import BM25Index
+from backend.utils.dataset_management import DatasetFileManagement
+from backend.utils.dataset_utility import DatasetManagement
+
+EMBEDDING_DIMENSIONS = 384
+
+DATASET_SIZES = [
+    10_000,
+    100_000,
+    pytest.param(1_000_000, marks=pytest.mark.skipif(not RUN_LARGE_BENCHMARKS, reason="set AI_ISLANDS_BENCHMARK_LARGE=1")),
+]
+
+
+def _random_embeddings(rng, count):
+    embeddings = rng.standard_normal((count, EMBEDDING_DIMENSIONS)).astype("float32")
+    faiss.normalize_L2(embeddings)
+    return embeddings
+
+
+@pytest.fixture
+def dataset_management(tmp_path, monkeypatch, rng):
+    # datasets are read relative to the working directory, the embedding model is replaced by random vectors
+    # so the benchmarks measure loading, search and ingest rather than the sentence-transformer
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(DatasetManagement, "generate_embeddings",
+                        lambda self, texts, model_info=None: _random_embeddings(rng, len(texts)))
+    monkeypatch.setattr(DatasetFileManagement, "update_dataset_metadata", lambda self, *args, **kwargs: None)
+    return DatasetManagement()
+
+
+@pytest.fixture(params=DATASET_SIZES, ids=lambda size: f"{size}_chunks")
+def synthetic_dataset(request, tmp_path, rng):
+    size = request.param
+    processing_dir = tmp_path / "Datasets" / f"synthetic_{size}" / "default"
+    processing_dir.mkdir(parents=True)
+
+    embeddings = _random_embeddings(rng, size)
+    index = faiss.IndexFlatIP(EMBEDDING_DIMENSIONS)
+    index.add(embeddings)
+    faiss.write_index(index, str(processing_dir / "faiss_index.bin"))
+    with open(processing_dir / "embeddings.pkl", "wb") as f:
+        pickle.dump(embeddings, f)
+    texts = [f"chunk {i}" for i in range(size)]
+    with open(processing_dir / "data.pkl", "wb") as f:
+        pickle.dump(texts, f)
+    BM25Index.build(texts).save(processing_dir / "bm25_index.pkl")
+    with open(processing_dir / "embedding_model_info.json", "w") as f:
+        json.dump({"model_type": "sentence_transformer", "model_name": "all-MiniLM-L6-v2"}, f)
+    return f"synthetic_{size}"
+
+
+@pytest.mark.parametrize("retrieval_mode", ["vector", "hybrid"])
+def test_find_relevant_entries(benchmark, dataset_management, synthetic_dataset, retrieval_mode):
+    benchmark.pedantic(
+        dataset_management.find_relevant_entries,
+        args=("what is the answer to chunk 42", synthetic_dataset),
+        kwargs={"similarity_threshold": 0.2, "retrieval_mode": retrieval_mode},
+        rounds=5,
+    )
+
+
+def test_process_dataset_ingest(benchmark, dataset_management, tmp_path, rng):
+    dataset_path = tmp_path / "synthetic_ingest.txt"
+    dataset_path.write_text("\n\n".join(synthetic_text(rng, 200) for _ in range(2_000)), encoding="utf-8")
+    dataset_management.chunking_settings = {
+        "use_chunking": True,
+        "chunk_size": 500,
+        "chunk_overlap": 50,
+        "chunk_method": "fixed_length",
+        "rows_per_chunk": 1,
+        "csv_columns": []
+    }
+    result = benchmark.pedantic(dataset_management.process_dataset, args=(dataset_path,), rounds=3)
+    assert result["message"] == "Dataset processed successfully"
@@ -0,0 +1,36 @@
+import pytest
+from PIL import Image
+
+from backend.benchmarks.fixture_models import synthetic_frame
+from backend.models.ultralytics_model import UltralyticsModel
+from backend.utils.process_vis_out import process_vision_output
+
+
+@pytest.fixture(scope="module")
+def detector():
+    from ultralytics import YOLO
+
+    # a randomly initialised YOLOv8n built from its architecture file, nothing is downloaded
+    model = UltralyticsModel("yolov8n")
+    model.model = YOLO("yolov8n.yaml")
+    return model
+
+
+def test_predict_video_frame(benchmark, detector, rng):
+    frame = synthetic_frame(rng)
+    benchmark(detector.predict_video, frame)
+
+
+def test_predict_image(benchmark, detector, rng, tmp_path):
+    image_path = str(tmp_path / "frame.jpg")
+    Image.fromarray(synthetic_frame(rng, 1080, 1920)).save(image_path)
+    benchmark(detector.predict_image, image_path)
+
+
+def test_visualisation(benchmark, rng):
+    image = Image.fromarray(synthetic_frame(rng, 1080, 1920))
+    predictions = [
+        {"class": f"class{i}", "confidence": 0.9, "coordinates": [10.0 * i, 10.0 * i, 10.0 * i + 200, 10.0 * i + 150]}
+        for i in range(20)
+    ]
+    benchmark(process_vision_output, image, predictions, "object-detection", "inline")
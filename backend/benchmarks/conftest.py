@@ -0,0 +1,64 @@
+"""
+Module: conftest
+
+Shared fixtures of the benchmark suite. The benchmarks use pytest-benchmark and live in bench_*.py files,
+so a plain test run never collects them. Run them and keep the results for comparison between commits with:
+
+    python -m pytest backend/benchmarks --benchmark-json=.benchmarks/$(git rev-parse --short HEAD).json
+    pytest-benchmark compare .benchmarks/<before>.json .benchmarks/<after>.json
+
+The largest synthetic RAG dataset (1M chunks, ~1.5 GB of embeddings) only runs with AI_ISLANDS_BENCHMARK_LARGE=1.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from backend.benchmarks.fixture_models import EchoModel, create_tiny_text_classifier
+from backend.controlers.model_control import ModelControl
+from backend.models import TransformerModel
+
+RUN_LARGE_BENCHMARKS = os.environ.get("AI_ISLANDS_BENCHMARK_LARGE") == "1"
+
+
+def pytest_collect_file(file_path, parent):
+    if file_path.name.startswith("bench_") and file_path.suffix == ".py":
+        return pytest.Module.from_parent(parent, path=file_path)
+
+
+class BenchmarkModelControl(ModelControl):
+    """A ModelControl serving the fixture models instead of the models of the library."""
+
+    MODEL_CLASSES = {"EchoModel": EchoModel, "TransformerModel": TransformerModel}
+
+    def __init__(self, library: dict):
+        super().__init__()
+        self.benchmark_library = library
+
+    def _get_model_info(self, model_id: str, source: str = "library"):
+        return self.benchmark_library[model_id]
+
+    def _get_model_class(self, model_id: str, source: str):
+        return self.MODEL_CLASSES[self.benchmark_library[model_id]["model_class"]]
+
+
+@pytest.fixture(scope="session")
+def served_models(tmp_path_factory):
+    root = tmp_path_factory.mktemp("models")
+    library = {"tiny-bert": create_tiny_text_classifier(str(root / "tiny-bert"))}
+    for model_id in ["echo-a", "echo-b"]:
+        os.makedirs(root / model_id)
+        library[model_id] = {"base_model": model_id, "dir": str(root / model_id), "model_class": "EchoModel"}
+
+    model_control = BenchmarkModelControl(library)
+    for model_id in library:
+        model_control.load_model(model_id)
+    yield model_control
+    for model_id in list(model_control.models):
+        model_control.unload_model(model_id)
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
@@ -0,0 +1,75 @@
+"""
+Module: fixture_models
+
+Tiny local models for the benchmarks. They are built from scratch in a temporary directory,
+so the benchmarks never download anything and measure the serving code rather than model size.
+"""
+
+import os
+
+import numpy as np
+
+# enough words for the synthetic texts, every other word maps to [UNK]
+_VOCAB = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + [f"word{i}" for i in range(995)]
+
+
+class EchoModel:
+    """A model class without a model: it returns its payload, so only the serving overhead is measured."""
+
+    def __init__(self, model_id: str):
+        self.model_id = model_id
+
+    def load(self, device, model_info: dict):
+        return True
+
+    def inference(self, data: dict):
+        return {"generated_text": data["payload"]}
+
+    def inference_batch(self, batch: list):
+        return [self.inference(data) for data in batch]
+
+
+def create_tiny_text_classifier(model_dir: str):
+    """
+    Saves a randomly initialised two-layer BERT text classifier and its tokenizer.
+
+    Args:
+        model_dir (str): The directory the model is saved to.
+
+    Returns:
+        dict: A library entry serving the model with TransformerModel.
+    """
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+
+    os.makedirs(model_dir, exist_ok=True)
+    vocab_path = os.path.join(model_dir, "vocab.txt")
+    with open(vocab_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(_VOCAB))
+
+    config = BertConfig(vocab_size=len(_VOCAB), hidden_size=32, num_hidden_layers=2, num_attention_heads=2,
+                        intermediate_size=64, max_position_embeddings=128, num_labels=2)
+    BertForSequenceClassification(config).save_pretrained(model_dir)
+    BertTokenizerFast(vocab_file=vocab_path).save_pretrained(model_dir)
+
+    return {
+        "base_model": "tiny-bert",
+        "dir": model_dir,
+        "is_trained": True,
+        "model_class": "TransformerModel",
+        "pipeline_tag": "text-classification",
+        "requirements": {
+            "required_classes": {
+                "model": "AutoModelForSequenceClassification",
+                "tokenizer": "AutoTokenizer"
+            }
+        },
+        "config": {}
+    }
+
+
+def synthetic_text(rng: np.random.Generator, words: int):
+    return " ".join(f"word{i}" for i in rng.integers(0, len(_VOCAB) - 5, size=words))
+
+
+def synthetic_frame(rng: np.random.Generator, height: int = 480, width: int = 640):
+    return rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
@@ -30,6 +30,22 @@ class LibraryControl:
         logger.info(f"Found {len(matching_models)} models with base_model {base_model}")
         return matching_models
 
+    def get_adapters_of(self, model_id: str) -> List[str]:
+        """
+        Lists the adapter fine-tunes whose adapters are attached to the given model's weights.
+
+        Args:
+            model_id (str): The ID of the base model.
+
+        Returns:
+            List[str]: The IDs of the adapter models.
+        """
+        library = JSONHandler.read_json(DOWNLOADED_MODELS_PATH)
+        return [
+            adapter_id for adapter_id, model_info in library.items()
+            if (model_info.get('adapter_of') or {}).get('model_id') == model_id
+        ]
+
     def update_library(self, model_id: str, new_entry: dict):
         """
         Updates the library with a new entry for a given model ID.
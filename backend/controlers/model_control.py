@@ -3,22 +3,26 @@ import importlib
 import logging
 import multiprocessing
 import os
-import shutil
+import threading
+from contextlib import contextmanager
 from backend.utils.process_vis_out import process_vision_output
-from PIL import Image
+from backend.utils.image_preprocessing import load_image
 import time
-import subprocess
 
 import torch
 
 from backend.controlers.library_control import LibraryControl
 from backend.controlers.runtime_control import RuntimeControl
+from backend.core.config import PROFILE_MAX_SECONDS
 from backend.core.exceptions import ModelError, ModelNotAvailableError
 from backend.settings.settings_service import SettingsService
-from backend.utils.helpers import install_packages, execute_script
-
-import psutil
-import GPUtil
+from backend.utils.blob_store import blob_store, remove_tree
+from backend.utils.download_manager import CANCELLED, FAILED, DownloadManager
+from backend.utils.hardware_telemetry import HardwareTelemetry
+from backend.utils.helpers import install_packages
+from backend.utils.metrics import MODEL_ERRORS, observe_stage, registry as metrics_registry
+from backend.utils.profiling import WorkerProfiler
+from backend.utils.training_jobs import COMPLETED as TRAINING_COMPLETED, TrainingJobManager
 
 logger = logging.getLogger(__name__)
 class ModelControl:
@@ -32,6 +36,9 @@ class ModelControl:
         settings_service = SettingsService()
         self.hardware_preference = settings_service.get_hardware_preference()  # Default will be CPU
         self.library_control = LibraryControl()
+        self.download_manager = DownloadManager(self._download_model)
+        self.training_manager = TrainingJobManager(self._register_trained_model)
+        self.hardware_telemetry = HardwareTelemetry()
         
     @staticmethod
     def _download_process(conn, model_class, model_id, model_info, library_control):
@@ -60,6 +67,12 @@ class ModelControl:
             logger.error(f"Chile process _download_process get an error: {str(e)}")
             # Send error message to parent process
             conn.send({"error": e})
+        except Exception as e:
+            # any other failure must reach the parent too, e.g. a network or disk error of the download
+            logger.error(f"Unexpected error downloading model {model_id}: {str(e)}")
+            conn.send({"error": ModelError(f"Failed to download model {model_id}: {str(e)}")})
+        finally:
+            conn.close()
 
     @staticmethod
     def _load_process(model_class, conn, model_id, device, model_info, lock):
@@ -74,6 +87,8 @@ class ModelControl:
             model_info (dict): Information about the model.
             lock (multiprocessing.Lock): Lock to ensure that only one request is processed at a time.
         """
+        # the process keeps its own metrics, exposed through the "metrics" task
+        metrics_registry.reset()
         # instantiate the model class with model_id
         model = model_class(model_id=model_id)
         try:
@@ -85,19 +100,53 @@ class ModelControl:
             conn.send(f"error: Failed to load model {model_id}: {str(e)}")
             return
 
+        profiler = WorkerProfiler(model_id)
         # A loop to keep the process alive
         while True:
             try:
-                req = conn.recv()  # This will block until a message is received
+                with profiler.waiting():
+                    req = conn.recv()  # This will block until a message is received
                 
                 if req == "terminate":
                     conn.send("Terminating")
                     break
+                elif isinstance(req, dict) and req.get("task") == "metrics":
+                    conn.send({"metrics": metrics_registry.snapshot()})
+                elif isinstance(req, dict) and req.get("task") == "profile_start":
+                    conn.send(profiler.start(req["duration"], req.get("torch_trace", False)))
+                elif isinstance(req, dict) and req.get("task") == "profile_stop":
+                    conn.send({"profile": profiler.stop()})
+                elif isinstance(req, dict) and req.get("task") == "stream":
+                    # partial outputs are sent as they are produced, followed by a done marker
+                    with lock:
+                        logger.info(f"Running streaming inference for model {model_id}")
+                        if hasattr(model, "inference_stream"):
+                            for chunk in model.inference_stream(req["data"]):
+                                conn.send({"chunk": chunk})
+                        else:
+                            conn.send({"chunk": model.inference(req["data"])})
+                        conn.send({"done": True})
+                elif isinstance(req, dict) and req.get("task") == "batch_inference":
+                    # a micro-batch of requests in one round trip, errors are reported per item
+                    with lock:
+                        logger.info(f"Running batch inference of {len(req['data'])} items for model {model_id}")
+                        with observe_stage(model_id, "worker"):
+                            if hasattr(model, "inference_batch"):
+                                results = model.inference_batch(req["data"])
+                            else:
+                                results = []
+                                for data in req["data"]:
+                                    try:
+                                        results.append(model.inference(data))
+                                    except Exception as e:
+                                        results.append({"error": str(e)})
+                        conn.send({"results": results})
                 elif isinstance(req, dict) and req.get("task") in ["inference", "train"]:
                     with lock:  # Use a context manager for the lock
                         if req["task"] == "inference":
                             logger.info(f"Running control inference for model {model_id}")
-                            result = model.inference(req["data"])
+                            with observe_stage(model_id, "worker"):
+                                result = model.inference(req["data"])
                         conn.send(result)
                 else:
                     logger.warning(f"Received unknown request: {req}")
@@ -132,13 +181,26 @@ class ModelControl:
             # Get the model class            
             model_class = self._get_model_class(model_id, "index")
 
+            # a re-download may rewrite weight files in place, which must not reach the models sharing their blobs
+            existing_entry = self.library_control.get_model_info_library(model_id)
+            if existing_entry and existing_entry.get("dir"):
+                blob_store.detach_directory(existing_entry["dir"])
+
             # Create a pipe for communication between parent and child processes
             parent_conn, child_conn = multiprocessing.Pipe()
             process = multiprocessing.Process(target=self._download_process, args=(child_conn, model_class, model_id, model_info, self.library_control))
             process.start()
+            # only the child holds its end of the pipe, so recv fails instead of blocking if the child dies silently
+            child_conn.close()
+            try:
+                response = parent_conn.recv()
+            except EOFError:
+                response = None
             process.join()
-            
-            response = parent_conn.recv()
+            parent_conn.close()
+
+            if response is None:
+                raise ModelError(f"Download process of model {model_id} exited with code {process.exitcode} without a result")
             if isinstance(response, dict) and "error" in response:
                 if isinstance(response["error"], ModelNotAvailableError):
                     raise ModelNotAvailableError(f"Model {model_id} is currently not available in the repository. Please try again later.")
@@ -147,8 +209,11 @@ class ModelControl:
             
             logger.info(f"Model {model_id} downloaded successfully")
             # Check if the download was successful
-            is_library_updated = self.library_control.get_model_info_library(model_id) is not None
-            if is_library_updated:
+            library_entry = self.library_control.get_model_info_library(model_id)
+            if library_entry is not None:
+                # weight files identical to those of other models on disk are linked to a single copy
+                if library_entry.get("dir"):
+                    blob_store.dedupe_directory(library_entry["dir"])
                 return {"message": f"Model {model_id} downloaded successfully"}
             else:
                 raise ValueError(f"Failed to update library.json for model_id: {model_id}")
@@ -163,19 +228,72 @@ class ModelControl:
             raise e
     
     def download_model(self, model_id: str, auth_token: str = None):
-        args = ["-at", auth_token] if auth_token else []
-        execute_script("backend/utils/model_download.py", model_id, *args)
-        
-        download_log = RuntimeControl.get_runtime_data("download_log")
-        if "success" in download_log:
-            return {"message": download_log["success"]}
-        elif "error" in download_log:
-            error_info = download_log["error"]
-            if "error name" in error_info and "error message" in error_info:
-                raise ModelError(f"Error: {error_info['error message']}")
-            else:
-                raise ModelError("Unexpected Error occured during model download") 
+        """
+        Downloads a model through the download manager and waits for the download to finish.
+        
+        Args:
+            model_id (str): The ID of the model to be downloaded.
+            auth_token (str, optional): Authentication token for downloading the model. Defaults to None.
+        
+        Returns:
+            dict: A message indicating the success of the download.
+        
+        Raises:
+            ModelError: If there is an error during the download process.
+            ModelNotAvailableError: If the model is not available in the repository.
+            ValueError: If the model is not in the index or the library cannot be updated.
+        """
+        job = self.download_manager.get_job(self.submit_download(model_id, auth_token)["job_id"])
+        job.done_event.wait()
+        return self.download_outcome(job)
 
+    @staticmethod
+    def download_outcome(job):
+        """
+        Reports the outcome of a finished download job.
+        
+        Args:
+            job (DownloadJob): The finished download job.
+        
+        Returns:
+            dict: A message indicating the success of the download.
+        
+        Raises:
+            ModelError: If the download failed or was cancelled.
+            ModelNotAvailableError: If the model is not available in the repository.
+            ValueError: If the library could not be updated.
+        """
+        if job.status == FAILED:
+            raise job.exception if isinstance(job.exception, (ModelError, ValueError)) else ModelError(job.error)
+        if job.status == CANCELLED:
+            raise ModelError(f"Download of model {job.model_id} was cancelled")
+        return {"message": f"Model {job.model_id} downloaded successfully"}
+
+    def submit_download(self, model_id: str, auth_token: str = None):
+        """
+        Queues a model download in the background and returns immediately.
+        Hugging Face models are fetched file by file in parallel, resuming partially downloaded files.
+        
+        Args:
+            model_id (str): The ID of the model to be downloaded.
+            auth_token (str, optional): Authentication token for downloading the model. Defaults to None.
+        
+        Returns:
+            dict: The download job status.
+        
+        Raises:
+            ValueError: If the model is not in the index.
+        """
+        model_class = self._get_model_class(model_id, "index")
+        # model classes downloading from a Hugging Face repository expose the cache directory they use
+        prefetch_repo = hasattr(model_class, "get_download_dir")
+        job = self.download_manager.submit(
+            model_id,
+            auth_token,
+            prefetch_repo=prefetch_repo,
+            cache_dir=model_class.get_download_dir(model_id) if prefetch_repo else None
+        )
+        return job.to_dict()
 
     def load_model(self, model_id: str):
         """
@@ -220,7 +338,9 @@ class ModelControl:
             logger.debug(f"Received response from load process: {response}")
 
             if response == "Model loaded":
-                self.models[model_id] = {'process': process, 'conn': parent_conn, 'model': model_class, 'pid': process.pid}
+                # conn_lock serialises requests from concurrent threads over the single pipe to the model process
+                self.models[model_id] = {'process': process, 'conn': parent_conn, 'model': model_class, 'pid': process.pid, 'conn_lock': threading.Lock()}
+                self.hardware_telemetry.track(model_id, process.pid)
                 logger.info(f"Model {model_id} loaded and process started.")
                 return True
             elif isinstance(response, dict) and "error" in response:
@@ -257,6 +377,7 @@ class ModelControl:
             conn = self.models[model_id]['conn']
             conn.send("terminate")
             self.models[model_id]['process'].join()
+            self.hardware_telemetry.untrack(model_id)
             del self.models[model_id]
             gc.collect()
             logger.info(f"Model {model_id} unloaded and memory freed.")
@@ -305,11 +426,18 @@ class ModelControl:
                         
                     self.library_control.delete_model(dependent_model_id)
                     logger.info(f"Deleted dependent model: {dependent_model_id}")
+
+                # adapter fine-tunes cannot load without the weights of the model they were trained on
+                for adapter_model_id in self.library_control.get_adapters_of(model_id):
+                    self.delete_model(adapter_model_id)
+                    logger.info(f"Deleted dependent adapter model: {adapter_model_id}")
                 
                 model_dir = model_info['dir']
                 if os.path.exists(model_dir):
-                    shutil.rmtree(model_dir)
+                    remove_tree(model_dir)
                     logger.info(f"Model {model_id} directory deleted")
+                # drop the weight blobs no other model links to anymore
+                blob_store.collect_garbage()
 
                 return {"message": f"Model {model_id} and its dependent models deleted"}
             else:
@@ -345,16 +473,182 @@ class ModelControl:
         # Send the request to the child process
         req = inference_request
         req['task'] = "inference"
-        conn.send(req)
-        # Receive the response from the child process
-        response = conn.recv()
+        with self._acquire_conn(model_id, active_model), observe_stage(model_id, "ipc"):
+            conn.send(req)
+            # Receive the response from the child process
+            response = conn.recv()
         # Check if the response contains an error. If there is an error, raise it
         if "error" in response:
+            MODEL_ERRORS.inc(model_id=model_id, task="inference")
             raise ModelError(response["error"])
         
         return response
+    
+    def inference_stream(self, inference_request):
+        """
+        Performs inference using a loaded model and yields partial outputs as the model produces them.
+        Text generation models yield text pieces, other models yield their full output once.
+        
+        Args:
+            inference_request (dict): The inference request containing model ID and data.
+        
+        Yields:
+            The partial outputs of the model.
+        
+        Raises:
+            KeyError: If the model is not loaded.
+            ModelError: If the model process reports an error.
+        """
+        model_id = inference_request['model_id']
+        active_model = self.get_active_model(model_id)
+        conn = active_model['conn']
+        req = inference_request
+        req['task'] = "stream"
+        with self._acquire_conn(model_id, active_model):
+            conn.send(req)
+            finished = False
+            try:
+                while not finished:
+                    response = conn.recv()
+                    finished = self._is_stream_finished(response)
+                    if isinstance(response, dict) and "error" in response:
+                        MODEL_ERRORS.inc(model_id=model_id, task="stream")
+                        raise ModelError(response["error"])
+                    if not finished:
+                        yield response["chunk"]
+            finally:
+                # if the caller stops early, drain the rest so the next request does not read leftover chunks
+                while not finished:
+                    finished = self._is_stream_finished(conn.recv())
+    
+    def inference_batch(self, model_id: str, batch: list):
+        """
+        Performs inference on a micro-batch of requests with a single round trip to the model process.
+        Models that support batching run the whole micro-batch through the model at once.
         
-    def process_image(self, image_path, output, task):
+        Args:
+            model_id (str): The ID of the loaded model.
+            batch (list): The request data of every item.
+        
+        Returns:
+            list: The result of every item, or a dict with an "error" key for items that failed.
+        
+        Raises:
+            KeyError: If the model is not loaded.
+            ModelError: If the model process reports an error for the whole batch.
+        """
+        active_model = self.get_active_model(model_id)
+        conn = active_model['conn']
+        with self._acquire_conn(model_id, active_model), observe_stage(model_id, "ipc"):
+            conn.send({"task": "batch_inference", "data": batch})
+            response = conn.recv()
+        if "error" in response:
+            MODEL_ERRORS.inc(model_id=model_id, task="batch_inference")
+            raise ModelError(response["error"])
+        
+        return response["results"]
+    
+    @staticmethod
+    @contextmanager
+    def _acquire_conn(model_id: str, active_model: dict):
+        # the time spent waiting for the pipe is the request's queue wait
+        with observe_stage(model_id, "queue_wait"):
+            active_model['conn_lock'].acquire()
+        try:
+            yield
+        finally:
+            active_model['conn_lock'].release()
+
+    def collect_worker_metrics(self):
+        """
+        Collects the metrics recorded inside the model processes, e.g. their preprocess, forward and
+        postprocess times. A model busy with a request keeps the snapshot collected last time.
+        
+        Returns:
+            list: The metric snapshots of the loaded models.
+        """
+        snapshots = {}
+        for model_id, active_model in list(self.models.items()):
+            if active_model['conn_lock'].acquire(blocking=False):
+                try:
+                    active_model['conn'].send({"task": "metrics"})
+                    response = active_model['conn'].recv()
+                    if "metrics" in response:
+                        active_model['metrics'] = response["metrics"]
+                except Exception as e:
+                    logger.warning(f"Failed to collect metrics from model {model_id}: {str(e)}")
+                finally:
+                    active_model['conn_lock'].release()
+            snapshots[model_id] = active_model.get('metrics', {})
+        return list(snapshots.values())
+
+    def profile_model(self, model_id: str, duration: float, torch_trace: bool = False):
+        """
+        Profiles a loaded model process for a number of seconds while it keeps serving requests.
+        The stacks of the process are sampled, and the torch profiler can record its forward passes too.
+        
+        Args:
+            model_id (str): The ID of the loaded model.
+            duration (float): The number of seconds to profile for.
+            torch_trace (bool): Whether to record a torch profiler trace of the forward passes.
+        
+        Returns:
+            dict: The profile, with flamegraph-ready collapsed stacks and the paths of the written files.
+        
+        Raises:
+            KeyError: If the model is not loaded.
+            ValueError: If the duration is out of range.
+            ModelError: If the model is already being profiled or the profiler fails.
+        """
+        self.start_profile(model_id, duration, torch_trace)
+        # the pipe is free in the meantime, the requests served now are the ones profiled
+        time.sleep(duration)
+        return self.stop_profile(model_id)
+
+    def start_profile(self, model_id: str, duration: float, torch_trace: bool = False):
+        """
+        Starts profiling a loaded model process. See profile_model.
+        
+        Raises:
+            KeyError: If the model is not loaded.
+            ValueError: If the duration is out of range.
+            ModelError: If the model is already being profiled or the profiler fails.
+        """
+        if not 0 < duration <= PROFILE_MAX_SECONDS:
+            raise ValueError(f"The profile duration must be between 0 and {PROFILE_MAX_SECONDS} seconds")
+        active_model = self.get_active_model(model_id)
+        conn = active_model['conn']
+        with self._acquire_conn(model_id, active_model):
+            conn.send({"task": "profile_start", "duration": duration, "torch_trace": torch_trace})
+            response = conn.recv()
+        if "error" in response:
+            raise ModelError(response["error"])
+
+    def stop_profile(self, model_id: str):
+        """
+        Stops profiling a loaded model process. See profile_model.
+        
+        Returns:
+            dict: The profile.
+        
+        Raises:
+            KeyError: If the model is not loaded.
+            ModelError: If the model is not being profiled or the profiler fails.
+        """
+        active_model = self.get_active_model(model_id)
+        conn = active_model['conn']
+        with self._acquire_conn(model_id, active_model):
+            conn.send({"task": "profile_stop"})
+            response = conn.recv()
+        if "error" in response:
+            raise ModelError(response["error"])
+        return response["profile"]
+
+    @staticmethod
+    def _is_stream_finished(response):
+        return isinstance(response, dict) and ("error" in response or response.get("done", False))
+        
+    def process_image(self, image_path, output, task, result_delivery="url"):
         try:
             logger.info(f"Image path: {image_path}")
             logger.info(f"Output type: {type(output)}")
@@ -364,8 +658,8 @@ class ModelControl:
             if not isinstance(output, (dict, list)):
                 raise ValueError(f"Expected output to be dict or list, got {type(output)}")
 
-            with Image.open(image_path) as img:
-                processed_output = process_vision_output(img, output, task)
+            img = load_image(image_path)
+            processed_output = process_vision_output(img, output, task, result_delivery)
             
             return processed_output
         except Exception as e:
@@ -378,48 +672,80 @@ class ModelControl:
     
     def train_model(self, train_request):
         """
-        Trains a loaded model.
+        Trains a model through the training job manager and waits for the training to finish.
         
         Args:
             train_request (dict): The training request containing model ID and training data.
         
         Returns:
-            dict: The training result.
+            tuple: The training result data and message.
         
         Raises:
-            KeyError: If the model is not loaded.
+            ValueError: If the model is not in the library.
+            ModelError: If the training fails or is cancelled.
         """
-        logger.info("train request:", train_request)
-        model_id = train_request['model_id']
-        data = train_request["data"]
-        model_info = self._get_model_info(model_id)
-        data["model_info"] = model_info
-        data["hardware_preference"] = self.hardware_preference
-        model_class = self._get_model_class(model_id, "library") 
-        model = model_class(model_id=model_id) 
+        job = self.training_manager.get_job(self.submit_training(train_request)["job_id"])
+        job.done_event.wait()
+        return self.training_outcome(job)
 
-        result = model.train(data)
+    @staticmethod
+    def training_outcome(job):
+        """
+        Reports the outcome of a finished training job.
         
-        logger.info("print result from train")
-        logger.info(result)
-        if "error" not in result:
-            new_model_info = result["data"]["new_model_info"]
-            new_model_id = new_model_info["model_id"]
+        Args:
+            job (TrainingJob): The finished training job.
         
-            # Get the original model info
-            original_model_info = self._get_model_info(model_id)
+        Returns:
+            tuple: The training result data and message.
         
-            # Create a new entry by copying the original model info and updating with new info
-            updated_model_info = original_model_info.copy()
-            updated_model_info.update(new_model_info)
+        Raises:
+            ModelError: If the training failed or was cancelled.
+        """
+        if job.status != TRAINING_COMPLETED:
+            raise ModelError(f"Training of model {job.model_id} {job.status}: {job.error}")
+        return job.result["data"], job.result["message"]
+
+    def submit_training(self, train_request):
+        """
+        Queues a training job and returns immediately. The model is trained in its own process,
+        which loads the model once so the trainer reuses its tokenizer, and reports live metrics.
         
-            # Ensure that these fields are correctly set for the new model
-            updated_model_info["base_model"] = new_model_id  
+        Args:
+            train_request (dict): The training request containing model ID and training data.
+        
+        Returns:
+            dict: The training job status.
         
-            # Add the new model to the library
-            self.library_control.add_fine_tuned_model(updated_model_info)
-            logger.info(f"New fine-tuned model {new_model_id} added to library")
-        return result["data"], result["message"]
+        Raises:
+            ValueError: If the model is not in the library.
+        """
+        model_id = train_request['model_id']
+        data = train_request["data"]
+        model_info = self._get_model_info(model_id)
+        data["model_info"] = model_info
+        data["hardware_preference"] = self.hardware_preference
+        model_class = self._get_model_class(model_id, "library")
+        device = torch.device("cuda" if self.hardware_preference == "gpu" and torch.cuda.is_available() else "cpu")
+
+        job = self.training_manager.submit(model_id, model_class, model_info, data, device)
+        return job.to_dict()
+
+    def _register_trained_model(self, model_id: str, result: dict):
+        new_model_info = result["data"]["new_model_info"]
+        new_model_id = new_model_info["model_id"]
+    
+        # Create a new entry by copying the original model info and updating with new info
+        updated_model_info = self._get_model_info(model_id).copy()
+        updated_model_info.update(new_model_info)
+    
+        # Ensure that these fields are correctly set for the new model
+        updated_model_info["base_model"] = new_model_id  
+    
+        # Add the new model to the library
+        self.library_control.add_fine_tuned_model(updated_model_info)
+        logger.info(f"New fine-tuned model {new_model_id} added to library")
+        blob_store.dedupe_directory(new_model_info["dir"])
     
     def reset_model_config(self, model_id: str):
         try:
@@ -539,84 +865,33 @@ class ModelControl:
             raise ValueError(f"Failed to load model class {model_class_name}: {error_string}")
 
     def get_model_hardware_usage(self, model_id: str):
-        if model_id in self.models:
-            pid = self.models[model_id]['pid']
-            logger.debug(f"Getting hardware usage for model {model_id} with PID: {pid}")
-            try:
-                process = psutil.Process(pid)
-                cpu_percent = process.cpu_percent(interval=1)
-                memory_info = process.memory_info()
-                memory_percent = process.memory_percent()
-                
-                logger.debug(f"CPU usage: {cpu_percent}%, Memory usage: {memory_percent}%")
-                
-                gpu_usage = None
-                gpu_percent = None
-                gpu_utilization = None
-                if torch.cuda.is_available():
-                    logger.debug("CUDA is available, fetching GPU information")
-                    gpus = GPUtil.getGPUs()
-                    if gpus:
-                        gpu = gpus[0]
-                        gpu_usage = gpu.memoryUsed
-                        gpu_total = gpu.memoryTotal
-                        gpu_percent = (gpu_usage / gpu_total) * 100 if gpu_total > 0 else 0
-                        
-                        logger.debug(f"GPU memory usage: {gpu_usage}MB, GPU memory percent: {gpu_percent}%")
-                        
-                        try:
-                            # Get overall GPU utilization
-                            result = subprocess.run(['nvidia-smi', '--query-gpu=utilization.gpu', '--format=csv,noheader,nounits'], 
-                                                    capture_output=True, text=True, check=True)
-                            overall_gpu_utilization = int(result.stdout.strip())
-                            logger.debug(f"Overall GPU utilization: {overall_gpu_utilization}%")
-                            
-                            # Get list of processes using GPU
-                            result = subprocess.run(['nvidia-smi', '--query-compute-apps=pid', '--format=csv,noheader,nounits'], 
-                                                    capture_output=True, text=True, check=True)
-                            gpu_pids = [int(line.strip()) for line in result.stdout.split('\n') if line.strip()]
-                            logger.debug(f"PIDs using GPU: {gpu_pids}")
-                            
-                            if pid in gpu_pids:
-                                # If our process is using the GPU, assume it's responsible for the utilization
-                                gpu_utilization = overall_gpu_utilization
-                                logger.debug(f"PID {pid} found in GPU processes. Assigned utilization: {gpu_utilization}%")
-                            else:
-                                logger.debug(f"PID {pid} not found in GPU processes")
-                                gpu_utilization = 0
-                        except subprocess.CalledProcessError as e:
-                            logger.error(f"Error running nvidia-smi: {str(e)}")
-                            logger.error(f"nvidia-smi stderr output: {e.stderr}")
-                            logger.error(f"nvidia-smi return code: {e.returncode}")
-                            gpu_utilization = None
-                        except FileNotFoundError:
-                            logger.error("nvidia-smi command not found. Make sure NVIDIA drivers are installed and nvidia-smi is in the system PATH.")
-                            gpu_utilization = None
-                        except Exception as e:
-                            logger.error(f"Unexpected error when running nvidia-smi: {str(e)}")
-                            gpu_utilization = None
-                    else:
-                        logger.debug("No GPUs found by GPUtil")
-                else:
-                    logger.debug("CUDA is not available")
-                
-                result = {
-                    'cpu_percent': round(cpu_percent, 2),
-                    'memory_used_mb': round(memory_info.rss / (1024 * 1024), 2),  # Convert to MB
-                    'memory_percent': round(memory_percent, 2),
-                    'gpu_memory_used_mb': round(gpu_usage, 2) if gpu_usage is not None else None,
-                    'gpu_memory_percent': round(gpu_percent, 2) if gpu_percent is not None else None,
-                    'gpu_utilization_percent': round(gpu_utilization, 2) if gpu_utilization is not None else None
-                }
-                
-                logger.debug(f"Hardware usage result: {result}")
-                return result
-            except psutil.NoSuchProcess:
-                logger.error(f"No process found with PID: {pid}")
-                return None
-            except Exception as e:
-                logger.error(f"Unexpected error in get_model_hardware_usage: {str(e)}")
-                return None
-        else:
+        """
+        Retrieves the latest hardware usage sample of a loaded model's process. Samples are taken in the
+        background, so this returns immediately.
+        
+        Args:
+            model_id (str): The ID of the loaded model.
+        
+        Returns:
+            dict: The CPU, memory, thread and GPU usage, or None if the model is not loaded.
+        """
+        if model_id not in self.models:
+            logger.error(f"Model {model_id} not found in active models.")
+            return None
+        return self.hardware_telemetry.latest(model_id)
+
+    def get_model_hardware_history(self, model_id: str, since: float = None):
+        """
+        Retrieves the sampled hardware usage history of a loaded model's process.
+        
+        Args:
+            model_id (str): The ID of the loaded model.
+            since (float, optional): Only samples taken after this Unix timestamp are returned.
+        
+        Returns:
+            list: The samples, oldest first, or None if the model is not loaded.
+        """
+        if model_id not in self.models:
             logger.error(f"Model {model_id} not found in active models.")
             return None
+        return self.hardware_telemetry.history(model_id, since)
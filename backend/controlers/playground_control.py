@@ -1,10 +1,13 @@
 import json
 import logging
 import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from backend.controlers.library_control import LibraryControl
 from backend.controlers.runtime_control import RuntimeControl
-from backend.core.config import PLAYGROUND_JSON_PATH
+from backend.core.config import PLAYGROUND_JOBS_DIR, PLAYGROUND_JSON_PATH
 from backend.core.exceptions import (
     ChainNotCompatibleError,
     FileReadError,
@@ -14,6 +17,9 @@ from backend.core.exceptions import (
     PlaygroundError,
 )
 from backend.data_utils.json_handler import JSONHandler
+from backend.playground.batch_job import ChainBatchJob, load_batch_jobs
+from backend.playground.chain_executor import ChainExecutor
+from backend.playground.dag_executor import DagExecutor, get_upstream, topological_order
 from backend.playground.playground import Playground
 
 logger = logging.getLogger(__name__)
@@ -37,6 +43,7 @@ class PlaygroundControl:
         self.playgrounds = {}
         self._initialise_playground_data_directory()
         self._initialise_all_playgrounds()
+        self.batch_jobs = load_batch_jobs(PLAYGROUND_JOBS_DIR)
 
     def create_playground(self, playground_id: str = None, description: str = None):
         """
@@ -328,6 +335,7 @@ class PlaygroundControl:
         
         # Update the playground's chain configuration
         playground.chain = chain
+        playground.dag = None
         
         # Write the updated playground data to the JSON file
         try:
@@ -338,18 +346,74 @@ class PlaygroundControl:
 
         return {"playground_id": playground_id, "chain": chain}
 
-    def load_playground_chain(self, playground_id: str):
+    def configure_dag(self, playground_id: str, dag: dict):
+        """
+        Configures the chain of models for a playground as a DAG, allowing a model's output
+        to be fanned out to several models and several outputs to be fanned in to one model.
+
+        Args:
+            playground_id (str): The ID of the playground.
+            dag (dict): Maps each model ID to the list of model IDs it feeds its output to.
+
+        Returns:
+            dict: The updated chain configuration, with the models in execution order.
+
+        Raises:
+            PlaygroundError: If the chain is already running.
+            ChainNotCompatibleError: If the DAG has a cycle or connects incompatible models.
+            KeyError: If a model is not found in the playground.
+            FileWriteError: If there is an error writing the playground data.
+        """
+        playground = self.playgrounds[playground_id]
+
+        # Check if the playground is already running a chain
+        if playground.active_chain:
+            raise PlaygroundError(f"Playground {playground_id} is already running a chain, please stop it before configuring.")
+
+        for model_id in dag:
+            if model_id not in playground.models:
+                raise KeyError(f"Model {model_id} not found in playground {playground_id}")
+
+        order = topological_order(dag)
+        upstream = get_upstream(dag)
+
+        # Outputs are passed downstream as text, so every model fed by another must take text
+        for model_id, parents in upstream.items():
+            input_type = playground.models.get(model_id).get("input")
+            for parent in parents:
+                output_type = playground.models.get(parent).get("output")
+                if input_type != 'text' or output_type != 'text':
+                    raise ChainNotCompatibleError(f"Model {parent} cannot feed model {model_id}: outputs passed between models must be text, got {output_type} to {input_type}.")
+
+        # The execution order doubles as the chain, so loading and stopping treat both layouts alike
+        playground.chain = order
+        playground.dag = {model_id: list(children) for model_id, children in dag.items()}
+
+        # Write the updated playground data to the JSON file
+        try:
+            self._write_playgrounds_to_json()
+        except FileWriteError as e:
+            logger.error("Error writing updated playground data to JSON file after configuring DAG")
+            raise e
+
+        return {"playground_id": playground_id, "chain": order, "dag": playground.dag}
+
+    def load_playground_chain(self, playground_id: str, on_progress=None):
         """
         Loads the chain of models for a playground.
+        All model processes are started concurrently, so the chain is ready in about the load time of its
+        slowest model. If any model fails to load, the models loaded for this chain are unloaded again.
 
         Args:
             playground_id (str): The ID of the playground.
+            on_progress (callable, optional): Called with a progress event dict each time a model finishes loading.
 
         Returns:
             dict: The loaded chain configuration.
 
         Raises:
             KeyError: If the playground does not exist.
+            ModelError: If any model of the chain fails to load.
             FileReadError: If there is an error reading the runtime data.
             FileWriteError: If there is an error writing the runtime data.
         """
@@ -359,10 +423,23 @@ class PlaygroundControl:
         playground = self.playgrounds[playground_id]
         logger.info(f"Loading chain for playground {playground_id}")
         
-        # Load the models in the chain
-        for model_id in playground.chain:
-            self.model_control.load_model(model_id)
-            logger.info(f"Model {model_id} loaded")
+        # Load the models in the chain concurrently, each in its own process
+        already_loaded = {model_id for model_id in playground.chain if self.model_control.is_model_loaded(model_id)}
+        loaded, errors = self._load_models_concurrently(playground.chain, on_progress)
+
+        if errors:
+            # roll back, only the models this call loaded are unloaded
+            for model_id in loaded:
+                if model_id in already_loaded:
+                    continue
+                try:
+                    self.model_control.unload_model(model_id)
+                    logger.info(f"Model {model_id} unloaded after the chain failed to load")
+                except ModelError as e:
+                    logger.warning(f"Model {model_id} not unloaded during rollback: {str(e)}")
+            failures = "; ".join(f"{model_id}: {error}" for model_id, error in errors.items())
+            logger.error(f"Failed to load chain for playground {playground_id}: {failures}")
+            raise ModelError(f"Failed to load chain for playground {playground_id}: {failures}")
 
         # set chain status to active
         playground.active_chain = True
@@ -384,6 +461,47 @@ class PlaygroundControl:
 
         return {"playground_id": playground_id, "chain": playground.chain}
 
+    def _load_models_concurrently(self, model_ids: list, on_progress=None):
+        """
+        Loads models in parallel threads, each thread waiting on its own model process.
+
+        Args:
+            model_ids (list): The IDs of the models to load, repeated IDs are loaded once.
+            on_progress (callable, optional): Called with a progress event dict each time a model finishes loading.
+
+        Returns:
+            tuple: The list of loaded model IDs and a dict of the errors of the models that failed.
+        """
+        loaded, errors = [], {}
+        # a chain may use a model more than once, but each model runs in a single process
+        model_ids = list(dict.fromkeys(model_ids))
+        if not model_ids:
+            return loaded, errors
+
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=len(model_ids)) as pool:
+            futures = {pool.submit(self.model_control.load_model, model_id): model_id for model_id in model_ids}
+            for future in as_completed(futures):
+                model_id = futures[future]
+                try:
+                    future.result()
+                    loaded.append(model_id)
+                    logger.info(f"Model {model_id} loaded")
+                    status = "loaded"
+                except Exception as e:
+                    errors[model_id] = str(e)
+                    status = "failed"
+                if on_progress:
+                    on_progress({
+                        "model_id": model_id,
+                        "status": status,
+                        "error": errors.get(model_id),
+                        "completed": len(loaded) + len(errors),
+                        "total": len(model_ids),
+                        "elapsed_seconds": round(time.time() - start_time, 2),
+                    })
+        return loaded, errors
+
     def stop_playground_chain(self, playground_id: str):
         """
         Stops the chain of models for a playground.
@@ -405,6 +523,11 @@ class PlaygroundControl:
             raise KeyError(f"Playground {playground_id} not found")
         playground = self.playgrounds[playground_id]
 
+        # Stop feeding running batch jobs, they can be resumed once the chain is loaded again
+        for job in self.batch_jobs.values():
+            if job.playground_id == playground_id and job.is_active():
+                job.cancel()
+
         # Get the runtime data
         try:
             runtime_data = RuntimeControl.get_runtime_data("playground")
@@ -441,33 +564,185 @@ class PlaygroundControl:
     def inference(self, inference_request):
         """
         Executes inference on a playground's chain of models.
+        A "batch" of request data is pipelined through the chain, so every model works on a different item at once.
+        For DAG chains the result maps each final model ID to its output.
 
         Args:
-            inference_request (dict): The inference request containing the playground ID and data.
+            inference_request (dict): The inference request containing the playground ID and either data or a batch.
 
         Returns:
-            dict: The inference result.
+            The inference result, or a list of results in the order of the batch.
 
         Raises:
             KeyError: If the playground does not exist.
         """
         playground_id = inference_request.get("playground_id")
-        data = inference_request.get("data")
         playground = self.playgrounds[playground_id]
+        executor = self._get_executor(playground)
 
-        for model_id in playground.chain:
-            model_inference_request = {
-                "model_id": model_id,
-                "data": data,
-                "playground_request": True
-            }
-            inference_result = self.model_control.inference(model_inference_request)
-            print("inference_result", inference_result)
-            data = {
-                "payload": str(inference_result)
-            }
-            
-        return inference_result
+        batch = inference_request.get("batch")
+        if batch:
+            return executor.run(batch)
+        return executor.run([inference_request.get("data")])[0]
+
+    def inference_stream(self, inference_request):
+        """
+        Executes inference on a playground's chain of models, yielding the output of the last model as it is produced.
+        Each model receives the upstream text sentence by sentence instead of waiting for the full output.
+
+        Args:
+            inference_request (dict): The inference request containing the playground ID and data.
+
+        Yields:
+            The partial outputs of the last model of the chain.
+
+        Raises:
+            KeyError: If the playground does not exist.
+            PlaygroundError: If the playground's chain is a DAG.
+        """
+        playground_id = inference_request.get("playground_id")
+        playground = self.playgrounds[playground_id]
+        if playground.dag:
+            raise PlaygroundError(f"Playground {playground_id} runs a DAG chain, streaming is only supported for linear chains.")
+        executor = ChainExecutor(self.model_control, playground.chain)
+        yield from executor.stream(inference_request.get("data"))
+
+    def start_batch_job(self, playground_id: str, items: list = None, dataset_path: str = None,
+                        text_column: str = "text", micro_batch_size: int = 16):
+        """
+        Starts processing a dataset through a playground's chain in the background.
+
+        Args:
+            playground_id (str): The ID of the playground.
+            items (list, optional): The items to process, as request data dicts or payloads.
+            dataset_path (str, optional): A .csv, .txt or .jsonl file to read the items from instead.
+            text_column (str, optional): The CSV column holding the text of each item. Defaults to "text".
+            micro_batch_size (int, optional): The number of items sent to a model at once. Defaults to 16.
+
+        Returns:
+            dict: The job state.
+
+        Raises:
+            KeyError: If the playground does not exist.
+            PlaygroundError: If the chain is not loaded or the input is not usable.
+        """
+        playground = self._get_active_playground(playground_id)
+        if micro_batch_size < 1:
+            raise PlaygroundError("micro_batch_size must be at least 1")
+
+        job_id = str(uuid.uuid4())
+        job = ChainBatchJob.create(
+            job_id, playground_id, os.path.join(PLAYGROUND_JOBS_DIR, job_id),
+            items=items, dataset_path=dataset_path, text_column=text_column, micro_batch_size=micro_batch_size
+        )
+        self.batch_jobs[job_id] = job
+        job.start(self._get_executor(playground))
+        logger.info(f"Batch job {job_id} started for playground {playground_id}")
+        return job.to_dict()
+
+    def resume_batch_job(self, job_id: str):
+        """
+        Resumes a cancelled, failed or interrupted batch job, skipping the items that already succeeded.
+
+        Args:
+            job_id (str): The ID of the job.
+
+        Returns:
+            dict: The job state.
+
+        Raises:
+            KeyError: If the job or its playground does not exist.
+            PlaygroundError: If the chain is not loaded or the job is running or completed.
+        """
+        job = self._get_batch_job(job_id)
+        playground = self._get_active_playground(job.playground_id)
+        job.start(self._get_executor(playground))
+        logger.info(f"Batch job {job_id} resumed")
+        return job.to_dict()
+
+    def cancel_batch_job(self, job_id: str):
+        """
+        Cancels a running batch job. Items already in the chain are still written to the results.
+
+        Args:
+            job_id (str): The ID of the job.
+
+        Returns:
+            dict: The job state.
+
+        Raises:
+            KeyError: If the job does not exist.
+        """
+        job = self._get_batch_job(job_id)
+        job.cancel()
+        return job.to_dict()
+
+    def get_batch_job(self, job_id: str):
+        """
+        Gets the state and progress of a batch job.
+
+        Args:
+            job_id (str): The ID of the job.
+
+        Returns:
+            dict: The job state.
+
+        Raises:
+            KeyError: If the job does not exist.
+        """
+        return self._get_batch_job(job_id).to_dict()
+
+    def list_batch_jobs(self, playground_id: str = None):
+        """
+        Lists the batch jobs, optionally of a single playground.
+
+        Args:
+            playground_id (str, optional): The ID of the playground.
+
+        Returns:
+            list: The state of every job.
+        """
+        return [
+            job.to_dict() for job in self.batch_jobs.values()
+            if playground_id is None or job.playground_id == playground_id
+        ]
+
+    def get_batch_job_results_path(self, job_id: str):
+        """
+        Gets the path of the JSON lines file a batch job writes its results to.
+
+        Args:
+            job_id (str): The ID of the job.
+
+        Returns:
+            str: The path of the results file.
+
+        Raises:
+            KeyError: If the job does not exist.
+            FileNotFoundError: If the job has not written any result yet.
+        """
+        output_path = self._get_batch_job(job_id).output_path
+        if not os.path.exists(output_path):
+            raise FileNotFoundError(f"Batch job {job_id} has no results yet")
+        return output_path
+
+    def _get_batch_job(self, job_id: str):
+        if job_id not in self.batch_jobs:
+            raise KeyError(f"Batch job {job_id} not found")
+        return self.batch_jobs[job_id]
+
+    def _get_active_playground(self, playground_id: str):
+        if playground_id not in self.playgrounds:
+            raise KeyError(f"Playground {playground_id} not found")
+        playground = self.playgrounds[playground_id]
+        if not playground.active_chain:
+            raise PlaygroundError(f"Playground {playground_id} chain is not loaded, please load it before running a batch job.")
+        return playground
+
+    def _get_executor(self, playground):
+        if playground.dag:
+            return DagExecutor(self.model_control, playground.dag)
+        return ChainExecutor(self.model_control, playground.chain)
 
     def _initialise_playground(self, playground_id: str):
         """
@@ -491,9 +766,10 @@ class PlaygroundControl:
         description = playground_info.get("description", "")
         models = playground_info.get("models", {})
         chain = playground_info.get("chain", [])
+        dag = playground_info.get("dag")
         
         # Create a new playground instance and add it to the playgrounds dictionary
-        playground = Playground(playground_id, description, models, chain)
+        playground = Playground(playground_id, description, models, chain, dag)
         self.playgrounds[playground_id] = playground
 
         return True
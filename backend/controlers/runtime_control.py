@@ -23,8 +23,7 @@ class RuntimeControl:
             FileWriteError: If the file cannot be written.
         """
         empty_runtime_data = {
-            "playground": {},
-            "download_log": {}
+            "playground": {}
         }
         try:
             JSONHandler.write_json(RUNTIME_DATA_PATH, empty_runtime_data)
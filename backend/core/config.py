@@ -14,9 +14,85 @@ CONFIG_PATH = os.path.join(ROOT_DIR, 'data', 'settings.json')
 UPLOAD_DATASET_DIR = os.path.join(ROOT_DIR, 'data', 'uploaded_dataset')
 DATASETS_DIR =  os.path.join(ROOT_DIR, 'Datasets')
 PLAYGROUND_JSON_PATH = os.path.join(ROOT_DIR, 'data', 'playground.json')
+PLAYGROUND_JOBS_DIR = os.path.join(ROOT_DIR, 'data', 'playground_jobs')
 SPEAKER_EMBEDDING_PATH = os.path.join(ROOT_DIR, 'data', 'speaker_embeddings.json')
 SPEAKER_EMBEDDING_DEFAULT_PATH = os.path.join(ROOT_DIR, 'data', 'speaker_embeddings_default.json')
 
+# Content-addressed store the weight files of all models are hard-linked to
+BLOBS_DIR = os.path.join(ROOT_DIR, 'data', 'blobs')
+
+# Background model downloads: models downloaded at once, files of one model fetched in parallel,
+# and an optional Hugging Face mirror (defaults to the HF_ENDPOINT environment variable, else the Hub)
+MAX_CONCURRENT_DOWNLOADS = 2
+DOWNLOAD_FILE_WORKERS = 8
+DOWNLOAD_MIRROR_ENDPOINT = os.environ.get('HF_ENDPOINT')
+# Finished download jobs are forgotten after DOWNLOAD_JOB_TTL_SECONDS, at most DOWNLOAD_MAX_FINISHED_JOBS are kept
+DOWNLOAD_JOB_TTL_SECONDS = 60 * 60
+DOWNLOAD_MAX_FINISHED_JOBS = 100
+
+# Fine-tuning jobs training at the same time, further jobs wait in a queue and running jobs share the CPU threads
+TRAINING_MAX_CONCURRENT_JOBS = 1
+
+# Per-run training metric logs, and the minimum seconds between two streamed step events of a run
+TRAINING_RUNS_DIR = os.path.join(ROOT_DIR, 'data', 'training_runs')
+TRAINING_TELEMETRY_MIN_INTERVAL = 1.0
+
+# Fine-tuning datasets of at least TOKENIZATION_PARALLEL_MIN_ROWS rows are tokenised by TOKENIZATION_NUM_PROC processes
+TOKENIZATION_NUM_PROC = max(1, min(4, (os.cpu_count() or 1) // 2))
+TOKENIZATION_PARALLEL_MIN_ROWS = 10000
+
+# On-demand profiles of model processes: where their flamegraph stacks and torch traces are written,
+# the longest profile that can be requested and the seconds between two stack samples
+PROFILES_DIR = os.path.join(ROOT_DIR, 'data', 'profiles')
+PROFILE_MAX_SECONDS = 120
+PROFILE_SAMPLE_INTERVAL = 0.005
+
+# Hardware usage of the model processes is sampled every HARDWARE_SAMPLE_INTERVAL seconds,
+# the last HARDWARE_HISTORY_SIZE samples of every process are kept
+HARDWARE_SAMPLE_INTERVAL = 1.0
+HARDWARE_HISTORY_SIZE = 600
+
+# Bounded executors the API offloads blocking work to, per workload class: (worker threads, requests
+# allowed to wait for a worker). Requests beyond that are rejected with 503 instead of queueing up.
+EXECUTOR_LIMITS = {
+    "io": (8, 64),
+    "cpu": (max(1, (os.cpu_count() or 1) // 4), 8),
+    "model_ipc": (16, 128),
+}
+
+# Document text extraction runs in a pool of INGEST_PROCESS_WORKERS processes. PDFs of at least
+# PDF_PARALLEL_MIN_PAGES pages are split into tasks of PDF_PAGES_PER_TASK pages
+INGEST_PROCESS_WORKERS = max(1, (os.cpu_count() or 1) - 1)
+PDF_PARALLEL_MIN_PAGES = 16
+PDF_PAGES_PER_TASK = 8
+
+# Hybrid RAG retrieval: the number of candidates the vector and the BM25 search each contribute, the damping
+# constant of reciprocal rank fusion and the number of fused entries returned by default
+RAG_HYBRID_CANDIDATES = 50
+RAG_RRF_K = 60
+RAG_HYBRID_TOP_K = 5
+
+# Optional cross-encoder re-ranking of RAG entries: the cross-encoder, the number of vector search candidates it
+# re-scores, the pairs scored per batch, and the number of entries and tokens put into the prompt by default
+RAG_RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+RAG_RERANK_CANDIDATES = 20
+RAG_RERANK_BATCH_SIZE = 16
+RAG_RERANK_TOP_K = 5
+RAG_CONTEXT_TOKEN_BUDGET = 1024
+
+# RAG caches: the number of query embeddings kept per process, and the semantic response cache answering a
+# query from a cached answer to a query within SEMANTIC_CACHE_MAX_DISTANCE cosine distance. Answers are kept
+# per model config and dataset version, SEMANTIC_CACHE_SIZE answers for each of SEMANTIC_CACHE_MAX_SCOPES of them
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+SEMANTIC_CACHE_SIZE = 256
+SEMANTIC_CACHE_MAX_SCOPES = 16
+SEMANTIC_CACHE_MAX_DISTANCE = 0.05
+
+# Generated inference artefacts (visualised images, synthesised audio) and their retention limits
+RESULTS_DIR = os.path.join(ROOT_DIR, 'static', 'results')
+RESULTS_MAX_BYTES = 512 * 1024 * 1024
+RESULTS_MAX_AGE_SECONDS = 24 * 60 * 60
+
 # Ensure the upload directory exists
 if not os.path.exists(UPLOAD_IMAGE_DIR):
     os.makedirs(UPLOAD_IMAGE_DIR)
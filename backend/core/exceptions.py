@@ -40,3 +40,9 @@ class ModelNotAvailableError(ModelError):
         self.message = message
         super().__init__(self.message)
 
+
+class ServerBusyError(Exception):
+    """Exception raised when too much work of a kind is already running or waiting."""
+    def __init__(self, message="Server is busy"):
+        self.message = message
+        super().__init__(self.message)
@@ -2,6 +2,7 @@ import json
 import logging
 from typing import Any, Dict
 from backend.core.exceptions import FileReadError, FileWriteError
+from backend.utils.metrics import JSON_IO_SECONDS
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +28,7 @@ class JSONHandler:
         """
         try:
             logger.info(f"Attempting to read JSON file at: {file_path}")
-            with open(file_path, 'r') as f:
+            with JSON_IO_SECONDS.time(operation="read"), open(file_path, 'r') as f:
                 data = json.load(f)
                 logger.info(f"Successfully read JSON file at: {file_path}")
                 return data
@@ -58,7 +59,7 @@ class JSONHandler:
         """
         try:
             logger.info(f"Attempting to write JSON file at: {file_path}")
-            with open(file_path, 'w') as f:
+            with JSON_IO_SECONDS.time(operation="write"), open(file_path, 'w') as f:
                 json.dump(data, f, indent=4)
                 logger.info(f"Successfully wrote JSON file at: {file_path}")
             return True
@@ -1,26 +1,66 @@
 import os
+import hashlib
+import json
 import torch
 import transformers
 import logging
-import json
-import shutil
+import threading
 
 from accelerate import Accelerator
-from PIL import Image
+from transformers.modeling_utils import no_init_weights
 
-from backend.core.config import ROOT_DIR
-from backend.utils.helpers import get_next_suffix, execute_script
+from backend.utils.helpers import get_next_suffix
 from backend.utils.process_audio_out import process_audio_output
 from backend.utils.process_vis_out import process_vision_output
 from .base_model import BaseModel
 from backend.data_utils.speaker_embedding_manager import SpeakerEmbeddingManager
 from backend.utils.process_vis_out import _ensure_json_serializable
+from backend.utils.dynamic_quantization import (
+    DYNAMIC_INT8_MODE,
+    get_quantized_cache_path,
+    load_quantized_state_dict,
+    quantize_model,
+    save_quantized_state_dict,
+)
+from backend.utils.adapters import attach_adapter, is_adapter_dir
+from backend.utils.image_preprocessing import preprocess_image, get_processor_target_size, rescale_predictions
+from backend.utils.metrics import observe_stage, record_cache_lookup
+from backend.core.config import SEMANTIC_CACHE_MAX_DISTANCE
 from backend.core.exceptions import ModelError
 from backend.utils.dataset_utility import DatasetManagement
+from backend.utils.semantic_cache import semantic_response_cache
 
 
 logger = logging.getLogger(__name__)
 
+# runtimes a model can be served with, selected by "runtime" in the model config
+SUPPORTED_RUNTIMES = ["torch", "onnxruntime", "torch-compiled"]
+
+# pipeline tags that can be served by onnxruntime and the optimum class exporting them
+ONNX_RUNTIME_CLASSES = {
+    "text-classification": "ORTModelForSequenceClassification",
+    "zero-shot-classification": "ORTModelForSequenceClassification",
+    "token-classification": "ORTModelForTokenClassification",
+    "feature-extraction": "ORTModelForFeatureExtraction",
+    "translation": "ORTModelForSeq2SeqLM",
+    "text2text-generation": "ORTModelForSeq2SeqLM",
+}
+
+# text pipelines that accept a list of inputs, inference_batch runs them as one batch
+BATCHABLE_TASKS = [
+    "text-classification",
+    "zero-shot-classification",
+    "token-classification",
+    "feature-extraction",
+    "fill-mask",
+    "summarization",
+    "text2text-generation",
+    "translation",
+]
+
+# pipelines that wrap the result of a single input in a one-element list but not the results of a batch
+_LIST_WRAPPED_TASKS = ["text-classification", "summarization", "text2text-generation", "translation"]
+
 class TransformerModel(BaseModel):
     def __init__(self, model_id: str):
         self.model_id = model_id
@@ -33,12 +73,19 @@ class TransformerModel(BaseModel):
         self.accelerator = None
         self.model_instance_data = []
         self.is_trained = False
+        self.adapter_of = None
         self.dataset_management = None
+        self.image_target_size = (None, None)
+        self.runtime = "torch"
+
+    @staticmethod
+    def get_download_dir(model_id: str):
+        return os.path.join('data', 'downloads', 'transformers', model_id)
 
     @staticmethod
     def download(model_id: str, model_info: dict):
         try:
-            model_dir = os.path.join('data', 'downloads', 'transformers', model_id)
+            model_dir = TransformerModel.get_download_dir(model_id)
             if not os.path.exists(model_dir):
                 os.makedirs(model_dir, exist_ok=True)
             
@@ -110,23 +157,30 @@ class TransformerModel(BaseModel):
             pipeline_tag = model_info.get('pipeline_tag')
             translation_config = self.config.get('translation_config', {})
             
+            current_mode = self.config.get("quantization_config", {}).get("current_mode")
+            
             # getting the device configurations and setting up the accelerator accordingly
-            if model_info.get('device_config', {}):
+            if current_mode == DYNAMIC_INT8_MODE:
+                # dynamic int8 kernels only run on CPU
+                USE_CPU = True
+            elif model_info.get('device_config', {}):
                 USE_CPU = model_info.get('device_config', {}).get('device') == "cpu"
             else:
                 USE_CPU = device == "cpu"
             self.accelerator = Accelerator(cpu=USE_CPU)
             
             # getting the quantization configurations and setting up the model config accordingly
-            if self.config.get("quantization_config", {}):
-                current_mode = self.config["quantization_config"].get("current_mode")
+            # dynamic int8 needs no loading arguments, the model is quantized after loading
+            if self.config.get("quantization_config", {}) and current_mode != DYNAMIC_INT8_MODE:
                 if current_mode != "bfloat16" and self.config["quantization_config"]:
                     bnb_config = transformers.BitsAndBytesConfig(**self.config["quantization_config_options"].get(current_mode,{}))
                     model_config["quantization_config"] = bnb_config
                 else:
                     model_config["torch_dtype"] = torch.bfloat16
             
-            if self.config.get("device_config", {}).get("device"):
+            if current_mode == DYNAMIC_INT8_MODE:
+                self.device = "cpu"
+            elif self.config.get("device_config", {}).get("device"):
                 self.device = self.config["device_config"]["device"]
             else:
                 self.device = device
@@ -138,6 +192,22 @@ class TransformerModel(BaseModel):
             # for trained mode;s, they have to be loaded differently
             self.is_trained = model_info.get("is_trained", False)
             
+            self.runtime = self.config.get("runtime", "torch")
+            if self.runtime not in SUPPORTED_RUNTIMES:
+                raise ValueError(f"Unsupported runtime: {self.runtime}. Use one of {', '.join(SUPPORTED_RUNTIMES)}.")
+            if self.runtime == "onnxruntime" and pipeline_tag not in ONNX_RUNTIME_CLASSES:
+                logger.warning(f"onnxruntime is not supported for {pipeline_tag}, falling back to torch")
+                self.runtime = "torch"
+            
+            # fine-tunes saved as adapters name the base model they were trained on
+            adapter_of = model_info.get("adapter_of")
+            self.adapter_of = adapter_of
+            if adapter_of and not is_adapter_dir(model_dir):
+                raise FileNotFoundError(f"Adapter not found in {model_dir}")
+            if adapter_of and self.runtime == "onnxruntime":
+                logger.warning("onnxruntime does not support adapter models, falling back to torch")
+                self.runtime = "torch"
+            
             # Initialize RAG components if enabled
             rag_settings = self.config.get("rag_settings", {})
             if rag_settings.get("use_dataset"):
@@ -156,7 +226,18 @@ class TransformerModel(BaseModel):
                 # read the corresponding config for the class_type
                 obj_config = self.config.get(f'{class_type}_config', {})
                 
-                if not self.is_trained:
+                if adapter_of:
+                    # adapter fine-tunes share the base model's files, only the adapter weights live in model_dir
+                    obj = self._load_from_base(class_, adapter_of, obj_config)
+                    if class_type == "model":
+                        obj = attach_adapter(obj, self.model_dir)
+                        if current_mode == DYNAMIC_INT8_MODE:
+                            obj = quantize_model(obj)
+                elif class_type == "model" and self.runtime == "onnxruntime":
+                    obj = self._load_onnx_model(pipeline_tag)
+                elif class_type == "model" and current_mode == DYNAMIC_INT8_MODE:
+                    obj = self._load_dynamic_int8_model(class_, obj_config)
+                elif not self.is_trained:
                     # load the class object from the local model directory
                     obj = class_.from_pretrained(
                         self.model_id,
@@ -175,7 +256,13 @@ class TransformerModel(BaseModel):
                 self.pipeline_args.update({class_type: obj})
                 logger.info(f"succesfully loaded {class_type} from {model_dir}")
 
-            self.pipeline_args["model"] = self.accelerator.prepare(self.pipeline_args["model"])
+            # onnxruntime sessions are not torch modules, the accelerator has nothing to prepare
+            if self.runtime != "onnxruntime":
+                self.pipeline_args["model"] = self.accelerator.prepare(self.pipeline_args["model"])
+                if self.runtime == "torch-compiled":
+                    # compile the forward only, the pipeline still needs the original model attributes
+                    self.pipeline_args["model"].forward = torch.compile(self.pipeline_args["model"].forward)
+                    logger.info("Model forward compiled with torch.compile")
             
             # for those translation models that require pipeline task = "translation_XX_to_YY"
             # it will set the pipeline task to be "translation_{src}_to_{tgt}"
@@ -184,6 +271,10 @@ class TransformerModel(BaseModel):
             
             self.pipeline = self._construct_pipeline(pipeline_tag)
             logger.info(f"Pipeline created successfully for task: {pipeline_tag}")
+            
+            # vision pipelines: images are downsized to the processor's resolution before inference
+            if getattr(self.pipeline, "image_processor", None) is not None:
+                self.image_target_size = get_processor_target_size(self.pipeline.image_processor)
             logger.info(f"Model loaded successfully from {model_dir}")
             
             if self.pipeline.task in ['text-generation'] :
@@ -211,23 +302,30 @@ class TransformerModel(BaseModel):
                     raise KeyError("'image' and 'text' must be provided in the request data for zero-shot tasks")
                 try:
                     print(f"Opening image from path: {image_path}")
-                    with Image.open(image_path) as image:
-                        print(f"Image opened successfully: {image}")
-                        print(f"Text: {text}")
-                        output = self.pipeline(image=image, candidate_labels=text, **pipeline_config)
-                        print(f"Pipeline output: {output}")
-                        if output is None:
-                            raise ValueError("Pipeline output is None")
-                        
-
+                    image = self._preprocess_image(image_path)
+                    print(f"Text: {text}")
+                    output = self._forward(self.pipeline, image=image.resized, candidate_labels=text, **pipeline_config)
+                    print(f"Pipeline output: {output}")
+                    if output is None:
+                        raise ValueError("Pipeline output is None")
+                    with observe_stage(self.model_id, "postprocess"):
+                        output = rescale_predictions(output, image)
                 except FileNotFoundError:
                     raise FileNotFoundError(f"Image file not found: {image_path}")
-            
+                
+                if visualize:
+                    output = self._attach_visualisation(output, image, data)
             
             elif self.pipeline.task in ['image-segmentation', 'object-detection', 'instance-segmentation']:
-                with Image.open(data["payload"]) as image:
-                    output = self.pipeline(data["payload"], **pipeline_config)
+                # decode once, the same image is used by the pipeline and the visualisation
+                image = self._preprocess_image(data["payload"])
+                output = self._forward(self.pipeline, image.resized, **pipeline_config)
+                with observe_stage(self.model_id, "postprocess"):
+                    output = rescale_predictions(output, image)
                     output = _ensure_json_serializable(output)
+                
+                if visualize:
+                    output = self._attach_visualisation(output, image, data)
                     
             
             # For text-to-speech tasks, if speaker_embedding_config exists in self.config, the model will need speaker embedding to generate speech
@@ -240,8 +338,9 @@ class TransformerModel(BaseModel):
                     # get the speaker embedding tensor, if speaker_embedding_config is not provided, it will use the default speaker embedding config
                     speaker_embedding = SpeakerEmbeddingManager.get_speaker_embedding(speaker_embedding_config, default_speaker_embedding_config)
                     pipeline_config.update({"forward_params": {"speaker_embeddings": speaker_embedding}})
-                output = self.pipeline(data["payload"], **pipeline_config)
-                output = process_audio_output(output)
+                output = self._forward(self.pipeline, data["payload"], **pipeline_config)
+                with observe_stage(self.model_id, "postprocess"):
+                    output = process_audio_output(output, data.get("result_delivery", "inline"))
             # For some translation models, if the api request contains translation_config, it will set the pipeline task to be "translation_{src}_to_{tgt}"
             # the new pipeline is single-use only
             elif data.get("translation_config"):
@@ -253,10 +352,10 @@ class TransformerModel(BaseModel):
                 if src_lang is not None and tgt_lang is not None:
                     pipeline_tag = self._get_translation_pipeline_task(data["translation_config"]["src_lang"], data["translation_config"]["tgt_lang"])
                     temp_pipeline = self._construct_pipeline(pipeline_tag)
-                    output = temp_pipeline(data["payload"], **pipeline_config)
+                    output = self._forward(temp_pipeline, data["payload"], **pipeline_config)
                 elif target_language_token is not None:
                     data = self._append_language_token(data)
-                    output = self.pipeline(data["payload"], **pipeline_config)
+                    output = self._forward(self.pipeline, data["payload"], **pipeline_config)
                     
             elif self.config.get("translation_config") and self.config.get("translation_config").get("target_language"):
                 target_language_token = f"<2{self.config.get('translation_config').get('target_language')}>"
@@ -264,27 +363,34 @@ class TransformerModel(BaseModel):
                     data["payload"] = target_language_token + data["payload"]
                 elif isinstance(data["payload"], list):
                     data["payload"] = [target_language_token + c for c in data["payload"]]
-                output = self.pipeline(data["payload"], **pipeline_config)
+                output = self._forward(self.pipeline, data["payload"], **pipeline_config)
             # For other tasks, the pipeline will be called with the payload
             
             elif self.pipeline.task in ['text-generation']:
                 rag_settings = self.config.get("rag_settings", {})
                 full_prompt = ""
                 
+                # repeated and rephrased questions are answered from the semantic cache without a forward pass
+                cache_scope, query_vector = self._semantic_cache_scope(data, pipeline_config, rag_settings)
+                if cache_scope is not None:
+                    cached_output = semantic_response_cache.lookup(
+                        cache_scope, query_vector, rag_settings.get("semantic_cache_distance", SEMANTIC_CACHE_MAX_DISTANCE))
+                    if cached_output is not None:
+                        return cached_output
+                
                 if rag_settings.get("use_dataset"):
                     logger.info("RAG is enabled, attempting to find relevant entries")
                     dataset_name = rag_settings.get("dataset_name")
-                    similarity_threshold = rag_settings.get("similarity_threshold", 0.5)
-                    use_chunking = rag_settings.get("use_chunking", False)
                     
                     if dataset_name:
                         logger.info(f"Using dataset: {dataset_name}")
-                        relevant_entries = self.dataset_management.find_relevant_entries(
-                            data["payload"],
-                            dataset_name,
-                            use_chunking=use_chunking,
-                            similarity_threshold=similarity_threshold
-                        )
+                        with observe_stage(self.model_id, "retrieval"):
+                            # the token budget of re-ranked entries is counted with this model's own tokenizer
+                            relevant_entries = self.dataset_management.retrieve_context(
+                                data["payload"],
+                                rag_settings,
+                                count_tokens=lambda text: len(self.pipeline.tokenizer.tokenize(text))
+                            )
                         if relevant_entries:
                             logger.info(f"Found {len(relevant_entries)} relevant entries")
                             full_prompt += "Relevant information:\n"
@@ -305,15 +411,18 @@ class TransformerModel(BaseModel):
                 
                 if self.config.get("chat_history"):
                     self.model_instance_data.append(user_prompt)
-                    output = self.pipeline(self.model_instance_data, **pipeline_config)
+                    output = self._forward(self.pipeline, self.model_instance_data, **pipeline_config)
                     self.model_instance_data.append(output[0]["generated_text"][-1])
                     output = output[0]["generated_text"][-1].get("content")
                 else:
-                    output = self.pipeline(self.model_instance_data + [user_prompt], **pipeline_config)
+                    output = self._forward(self.pipeline, self.model_instance_data + [user_prompt], **pipeline_config)
                     output = output[0]["generated_text"][-1].get("content")
+                
+                if cache_scope is not None:
+                    semantic_response_cache.store(cache_scope, data["payload"], query_vector, output)
             else:
                 # call the pipeline with the payload and any extra pipeline_config provided in the request
-                output = self.pipeline(data["payload"], **pipeline_config)
+                output = self._forward(self.pipeline, data["payload"], **pipeline_config)
             
             return output
         except KeyError as e:
@@ -323,54 +432,154 @@ class TransformerModel(BaseModel):
             logger.error(f"Error during inference: {str(e)}")
             raise ModelError(f"Error during inference: {str(e)}")
 
-    def train(self, data: dict):
-        dataset_path = data.get("data")
-        model_info = data.get("model_info")
-        hardware_preference = str(data.get("hardware_preference"))
+    def _semantic_cache_scope(self, data: dict, pipeline_config: dict, rag_settings: dict):
+        """
+        Determines whether the answer to a RAG chat request can be served from and stored in the semantic response
+        cache. It is opted into with the "semantic_cache" RAG setting, and answers are only shared by requests with
+        the same model config and pipeline config, against the same version of the dataset.
+
+        Returns:
+            tuple: The cache scope and the query embedding, or (None, None) if the answer is not cacheable: the cache
+                is off, the conversation history shapes the answer, the answer is streamed or the dataset is not processed.
+        """
+        if not (rag_settings.get("use_dataset") and rag_settings.get("semantic_cache")) or self.dataset_management is None:
+            return None, None
+        if self.config.get("chat_history") or "streamer" in pipeline_config or not isinstance(data["payload"], str):
+            return None, None
+        dataset_name = rag_settings.get("dataset_name")
+        use_chunking = rag_settings.get("use_chunking", False)
+        dataset_version = self.dataset_management.dataset_version(dataset_name, use_chunking) if dataset_name else None
+        if dataset_version is None:
+            return None, None
+
+        # the query embedding is cached too, so retrieval after a cache miss does not embed the query again
+        query_vector = self.dataset_management.query_embedding(data["payload"], dataset_name, use_chunking)
+        config_hash = hashlib.sha256(json.dumps(
+            {"model_id": self.model_id, "config": self.config, "pipeline_config": pipeline_config},
+            sort_keys=True, default=str).encode()).hexdigest()
+        return (config_hash, dataset_name, use_chunking, dataset_version), query_vector
+
+    def inference_stream(self, data: dict):
+        # only text generation produces its output incrementally, other tasks yield the full output once
+        if self.pipeline.task not in ['text-generation']:
+            yield self.inference(data)
+            return
+        
+        streamer = transformers.TextIteratorStreamer(self.pipeline.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        data = {**data, "pipeline_config": {**data.get("pipeline_config", {}), "streamer": streamer}}
+        errors = []
         
+        def _generate():
+            try:
+                self.inference(data)
+            except Exception as e:
+                errors.append(e)
+                # unblock the consumer, generation never started or stopped early
+                streamer.end()
+        
+        # generate in the background, the streamer hands over the decoded text as tokens are produced
+        thread = threading.Thread(target=_generate)
+        thread.start()
+        for text in streamer:
+            if text:
+                yield text
+        thread.join()
+        if errors:
+            raise errors[0]
+
+    def inference_batch(self, batch: list):
+        # plain text pipelines take a list of inputs and batch them through the model,
+        # requests needing per-item handling fall back to one inference call each
+        if self._is_batchable(batch):
+            pipeline_config = batch[0].get("pipeline_config", {})
+            try:
+                outputs = self._forward(self.pipeline, [data["payload"] for data in batch], batch_size=len(batch), **pipeline_config)
+                # keep the shape of single inference outputs so downstream consumers see no difference
+                if self._task_family() in _LIST_WRAPPED_TASKS:
+                    outputs = [output if isinstance(output, list) else [output] for output in outputs]
+                return _ensure_json_serializable(list(outputs))
+            except Exception as e:
+                logger.warning(f"Batched inference failed, falling back to per-item inference: {str(e)}")
+
+        results = []
+        for data in batch:
+            try:
+                results.append(self.inference(data))
+            except Exception as e:
+                results.append({"error": str(e)})
+        return results
+
+    def _task_family(self):
+        # translation pipelines are tagged "translation_{src}_to_{tgt}"
+        return "translation" if self.pipeline.task.startswith("translation") else self.pipeline.task
+
+    def _is_batchable(self, batch: list):
+        if self._task_family() not in BATCHABLE_TASKS:
+            return False
+        if self.config.get("translation_config"):
+            return False
+        pipeline_config = batch[0].get("pipeline_config", {})
+        return all(
+            isinstance(data.get("payload"), str)
+            and not data.get("translation_config")
+            and data.get("pipeline_config", {}) == pipeline_config
+            for data in batch
+        )
+
+    def train(self, data: dict, reporter=None):
+        """
+        Fine-tunes the loaded model in the current process, reusing its tokenizer.
+        Setting "lora" in the training arguments (true, or a dict of LoRA settings) trains LoRA adapters
+        instead of every weight; only the adapter is saved and it is attached to the base model at load time.
+
+        Args:
+            data (dict): The training request data with the dataset path, tokenizer and training arguments.
+            reporter (callable, optional): Called with a dict of live metrics (loss, throughput, ETA) as training progresses.
+
+        Returns:
+            dict: The training result with the library entry of the fine-tuned model.
+
+        Raises:
+            ModelError: If the training fails, or LoRA training is requested for an adapter model.
+        """
+        from backend.utils.train_transformer import train_transformer
+
+        dataset_path = data.get("data")
         tokenizer_args = data.get("tokenizer_args", {})
-        training_args = data.get("training_args", {})
+        training_args = dict(data.get("training_args", {}))
+        lora = training_args.pop("lora", None)
+        lora_config = (lora if isinstance(lora, dict) else {}) if lora else None
 
         if not dataset_path:
             return {"error": "Dataset path not provided in the request data"}
+        if lora_config is not None and self.adapter_of:
+            # the adapter weights were merged on load, a new adapter would have no base files to attach to
+            raise ModelError(f"Model {self.model_id} is an adapter fine-tune, LoRA training needs a fully saved model")
 
         suffix = get_next_suffix(self.model_id)
-        model_dir = model_info.get("dir")
-        trained_model_dir = os.path.join(f"{model_dir}_{suffix}")
-        
-        script_args = {
-            "model_id": self.model_id,
-            "hardware_preference": hardware_preference,
-            "model_info": model_info,
-            "dataset_path": dataset_path,
-            "tokenizer_args": tokenizer_args,
-            "training_args": training_args,
-            "trained_model_dir": trained_model_dir
-        }
-        logger.info(script_args)
-        script_path = os.path.join(ROOT_DIR, "backend", "utils", "train_transformer.py")
-        
-        with open("data/temp_train_args.json", 'w') as f:
-                json.dump(script_args, f, indent=4)
+        trained_model_dir = os.path.join(f"{self.model_dir}_{suffix}")
+        logger.info(f"Training model {self.model_id} on {dataset_path}, the trained model is saved to {trained_model_dir}")
 
-        execute_script(script_path) 
+        try:
+            train_transformer(self, dataset_path, tokenizer_args, training_args, trained_model_dir,
+                              reporter=reporter, lora_config=lora_config)
+        except Exception as e:
+            logger.error(f"Error training model {self.model_id}: {str(e)}")
+            raise ModelError(f"Training failed, please check the training datasets to ensure they are correctly formatted: {str(e)}")
 
-        temp_output_dir = os.path.join(ROOT_DIR, "temp")
-        
-        # If the training script was terminated early due to an error, 
-        # the temp_output_dir will not be deleted and the trained model will not be saved
-        # In such cases, assess the temp_output_dir and return an error message
-        if os.path.exists(temp_output_dir):
-            shutil.rmtree(temp_output_dir, ignore_errors=True)
-            raise ModelError("Training failed, please check the training datasets to ensure they are correctly formatted")
-        
         new_model_info = {
             "model_id": f"{self.model_id}_{suffix}",
             "base_model": f"{self.model_id}_{suffix}",
             "dir": trained_model_dir,
             "model_desc": f"Fine-tuned {self.model_id} model",
             "is_customised": False,
-            "is_trained": True
+            "is_trained": True,
+            # a full fine-tune of an adapter model saves merged weights and stands on its own
+            "adapter_of": {
+                "model_id": self.model_id,
+                "dir": self.model_dir,
+                "is_trained": self.is_trained
+            } if lora_config is not None else None
         }
 
         return {
@@ -381,6 +590,79 @@ class TransformerModel(BaseModel):
             }
         }
     
+    def _load_dynamic_int8_model(self, class_, obj_config: dict):
+        if not self.is_trained:
+            source, source_kwargs = self.model_id, {"cache_dir": self.model_dir}
+        else:
+            source, source_kwargs = self.model_dir, {}
+        
+        # later loads restore the cached int8 weights into an uninitialised skeleton instead of re-quantizing
+        cache_path = get_quantized_cache_path(self.model_dir)
+        record_cache_lookup("quantized_weights", os.path.exists(cache_path))
+        if os.path.exists(cache_path):
+            try:
+                model_config = transformers.AutoConfig.from_pretrained(source, local_files_only=True, **source_kwargs)
+                with no_init_weights():
+                    model = class_.from_config(model_config) if hasattr(class_, "from_config") else class_(model_config)
+                return load_quantized_state_dict(model, cache_path)
+            except Exception as e:
+                logger.warning(f"Failed to load cached quantized model from {cache_path}, quantizing again: {str(e)}")
+        
+        model = class_.from_pretrained(source, local_files_only=True, **source_kwargs, **obj_config)
+        model = quantize_model(model)
+        save_quantized_state_dict(model, cache_path)
+        return model
+    
+    @staticmethod
+    def _load_from_base(class_, base_model_info: dict, obj_config: dict):
+        # the base is either a downloaded model in its cache dir or a fully fine-tuned model saved flat
+        if base_model_info.get("is_trained"):
+            return class_.from_pretrained(base_model_info["dir"], local_files_only=True, **obj_config)
+        return class_.from_pretrained(
+            base_model_info["model_id"],
+            cache_dir=base_model_info["dir"],
+            local_files_only=True,
+            **obj_config
+        )
+
+    def _load_onnx_model(self, pipeline_tag: str):
+        # optimum is only needed when a model is configured to run on onnxruntime
+        try:
+            import optimum.onnxruntime
+        except ImportError:
+            raise ModelError("onnxruntime runtime requires optimum, please install optimum[onnxruntime]")
+        ort_class = getattr(optimum.onnxruntime, ONNX_RUNTIME_CLASSES[pipeline_tag])
+        
+        # the exported graph is cached inside the model directory so it is only exported once
+        onnx_dir = os.path.join(self.model_dir, "onnx")
+        if os.path.exists(os.path.join(onnx_dir, "config.json")):
+            logger.info(f"Loading cached ONNX model from {onnx_dir}")
+            return ort_class.from_pretrained(onnx_dir, local_files_only=True)
+        
+        logger.info(f"Exporting {self.model_id} to ONNX, this only happens on the first load")
+        if not self.is_trained:
+            model = ort_class.from_pretrained(self.model_id, export=True, cache_dir=self.model_dir, local_files_only=True)
+        else:
+            model = ort_class.from_pretrained(self.model_dir, export=True, local_files_only=True)
+        model.save_pretrained(onnx_dir)
+        logger.info(f"ONNX model saved to {onnx_dir}")
+        return model
+    
+    def _forward(self, pipeline, *args, **kwargs):
+        with observe_stage(self.model_id, "forward"):
+            return pipeline(*args, **kwargs)
+    
+    def _preprocess_image(self, image_path: str):
+        max_edge, min_edge = self.image_target_size
+        with observe_stage(self.model_id, "preprocess"):
+            return preprocess_image(image_path, max_edge=max_edge, min_edge=min_edge)
+    
+    def _attach_visualisation(self, output, image, data: dict):
+        # visualise in the worker so the image decoded for inference is reused instead of decoded again
+        with observe_stage(self.model_id, "visualisation"):
+            visualisation = process_vision_output(image.original, output, self.pipeline.task, data.get("result_delivery", "url"))
+        return {"predictions": output, **visualisation}
+    
     def _construct_pipeline(self, pipeline_tag: str):
         pipeline_config = self.config.get('pipeline_config', {})
         print("pipeline_args: ", self.pipeline_args)
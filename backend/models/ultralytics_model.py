@@ -1,8 +1,10 @@
 import logging
 import os
+import re
 import shutil
 import signal
 import sys
+import time
 
 import cv2
 import numpy as np
@@ -15,6 +17,8 @@ from backend.core.exceptions import ModelError
 from backend.data_utils.file_utils import verify_file
 from backend.data_utils.json_handler import JSONHandler
 from backend.utils.process_vis_out import process_vision_output
+from backend.utils.image_preprocessing import PreprocessedImage, preprocess_image, rescale_predictions
+from backend.utils.metrics import observe_stage, record_cache_lookup
 from backend.core.exceptions import ModelError, ModelNotAvailableError
 
 from .base_model import BaseModel
@@ -23,10 +27,29 @@ logger = logging.getLogger(__name__)
 pretrained_model_path = None
 runs_folder = None
 
+# runtimes a model can be served with, "torch" runs the .pt weights directly,
+# the others serve an exported artefact cached next to the .pt
+SUPPORTED_RUNTIMES = ["torch", "onnx", "openvino"]
+
+# characters of export argument values kept out of the artefact names
+_EXPORT_OPTION_UNSAFE = re.compile(r"[^\w.-]")
+
+# the YOLO task of the library pipeline tags, exported models cannot infer it from their weights
+PIPELINE_TAG_TASKS = {
+    "object-detection": "detect",
+    "image-segmentation": "segment",
+    "instance-segmentation": "segment",
+    "keypoint-detection": "pose",
+    "pose-estimation": "pose",
+    "image-classification": "classify",
+}
+
 class UltralyticsModel(BaseModel):
     def __init__(self, model_id: str):
         self.model_id = model_id
         self.model = None
+        self.model_path = None
+        self.runtime = "torch"
     
     @staticmethod
     def download(model_id: str, model_info: dict):
@@ -48,6 +71,12 @@ class UltralyticsModel(BaseModel):
 
             print(f"Model {model_id} downloaded and saved to {model_path}")
 
+            # export at download time when the index asks for an exported runtime,
+            # so the first load does not pay for the conversion
+            config = model_info.get('config', {})
+            if config.get('runtime', 'torch') != 'torch':
+                UltralyticsModel.export(model_path, config['runtime'], config.get('export_config', {}))
+
             root_model_path = os.path.join(ROOT_DIR, model_file_name)
             if os.path.exists(root_model_path):
                 os.remove(root_model_path)
@@ -57,7 +86,7 @@ class UltralyticsModel(BaseModel):
                 "base_model": model_id,
                 "dir": model_dir,
                 "is_customised": False,
-                "config": {}
+                "config": config
             })
             return model_info
         except FileNotFoundError:
@@ -75,7 +104,24 @@ class UltralyticsModel(BaseModel):
             if not os.path.exists(model_path):
                 raise FileNotFoundError(f"Model file not found: {model_path}")
             
+            self.model_path = model_path
+            config = model_info.get('config', {})
+            runtime = config.get('runtime', 'torch')
+            
+            if runtime != 'torch':
+                try:
+                    export_path = self.export(model_path, runtime, config.get('export_config', {}))
+                    # exported models cannot infer their task from the weights, so it is given explicitly
+                    task = PIPELINE_TAG_TASKS.get(model_info.get('pipeline_tag')) or YOLO(model_path).task
+                    self.model = YOLO(export_path, task=task)
+                    self.runtime = runtime
+                    logger.info(f"Model loaded from {export_path} with {runtime} runtime")
+                    return
+                except Exception as e:
+                    logger.warning(f"Failed to serve {self.model_id} with {runtime}, falling back to torch: {str(e)}")
+            
             self.model = YOLO(model_path)  # Load the YOLO model from the specified path
+            self.runtime = 'torch'
         
             logger.info(f"Model loaded from {model_path}")
 
@@ -85,6 +131,49 @@ class UltralyticsModel(BaseModel):
         except Exception as e:
             logger.error(f"Error loading model: {str(e)}")
     
+    @staticmethod
+    def export(model_path: str, runtime: str, export_config: dict = None):
+        """
+        Exports the .pt weights to the given runtime format, reusing the cached artefact when it exists.
+        The artefact is named after the export arguments, so changing them exports again.
+
+        Args:
+            model_path (str): The path of the .pt weights.
+            runtime (str): "onnx" or "openvino".
+            export_config (dict, optional): Extra export arguments, e.g. {"int8": true, "imgsz": 640}.
+
+        Returns:
+            str: The path of the exported artefact.
+
+        Raises:
+            ValueError: If the runtime is not supported.
+        """
+        if runtime not in SUPPORTED_RUNTIMES or runtime == 'torch':
+            raise ValueError(f"Unsupported export runtime: {runtime}. Use one of {', '.join(SUPPORTED_RUNTIMES[1:])}.")
+        export_config = export_config or {}
+        
+        export_path = UltralyticsModel._export_path(model_path, runtime, export_config)
+        record_cache_lookup("exported_model", os.path.exists(export_path))
+        if os.path.exists(export_path):
+            logger.info(f"Using cached {runtime} export: {export_path}")
+            return export_path
+        
+        logger.info(f"Exporting {model_path} to {runtime} with {export_config}")
+        exported_path = str(YOLO(model_path).export(format=runtime, **export_config)).rstrip(os.sep)
+        # ultralytics names its exports after the weights file only, the artefact is moved to its keyed name
+        if os.path.abspath(exported_path) != os.path.abspath(export_path):
+            shutil.move(exported_path, export_path)
+        return export_path
+
+    @staticmethod
+    def _export_path(model_path: str, runtime: str, export_config: dict):
+        # e.g. yolov8n_imgsz-640_int8-True_openvino_model; ultralytics recognises the format by the suffix
+        base_path = os.path.splitext(model_path)[0]
+        options = "".join(f"_{key}-{_EXPORT_OPTION_UNSAFE.sub('', str(export_config[key]))}" for key in sorted(export_config))
+        if runtime == 'onnx':
+            return f"{base_path}{options}.onnx"
+        return f"{base_path}{options}_openvino_model"
+
     def inference(self, request_payload: dict):
         logger.info("Running inference function")
         
@@ -97,8 +186,15 @@ class UltralyticsModel(BaseModel):
         if "image_path" in request_payload:
             logger.info("Running image inference")
             image_path = request_payload["image_path"]
-            predictions = self.predict_image(image_path)
+            with observe_stage(self.model_id, "preprocess"):
+                image = preprocess_image(image_path, max_edge=self._get_imgsz())
+            predictions = self.predict_image(image_path, image)
             result["predictions"] = predictions
+            
+            # visualise in the worker so the decoded image is reused instead of decoded again
+            if visualize and isinstance(predictions, list):
+                with observe_stage(self.model_id, "visualisation"):
+                    result.update(process_vision_output(image.original, predictions, "object-detection", request_payload.get("result_delivery", "url")))
 
         elif "video_frame" in request_payload:
             logger.info("Running video inference")
@@ -113,31 +209,40 @@ class UltralyticsModel(BaseModel):
         logger.info(f"Inference result: {result}")
         return result
 
-    def predict_image(self, image_path: str):
+    def predict_image(self, image_path: str, image: PreprocessedImage = None):
         try:
             if self.model is None:
                 raise ValueError("Model is not loaded")
             
-            results = self.model.predict(image_path)
-            predictions = []
-            class_names = self.model.names
-            
-            for result in results:
-                boxes = result.boxes
-                for box in boxes:
-                    cls = int(box.cls[0])
-                    conf = box.conf[0].item()
-                    coords = box.xyxy[0].tolist()
-                    predictions.append({
-                        "class": class_names[cls],
-                        "confidence": conf,
-                        "coordinates": coords
-                    })
-            return predictions
+            if image is None:
+                with observe_stage(self.model_id, "preprocess"):
+                    image = preprocess_image(image_path, max_edge=self._get_imgsz())
+            with observe_stage(self.model_id, "forward"):
+                results = self.model.predict(image.resized)
+            with observe_stage(self.model_id, "postprocess"):
+                predictions = []
+                class_names = self.model.names
+                
+                for result in results:
+                    boxes = result.boxes
+                    for box in boxes:
+                        cls = int(box.cls[0])
+                        conf = box.conf[0].item()
+                        coords = box.xyxy[0].tolist()
+                        predictions.append({
+                            "class": class_names[cls],
+                            "confidence": conf,
+                            "coordinates": coords
+                        })
+                return rescale_predictions(predictions, image)
         except Exception as e:
             print(f"Error predicting image {image_path}: {str(e)}")
             return {"error": str(e)}
         
+    def _get_imgsz(self):
+        # YOLO letterboxes inputs to imgsz, so larger images can be downsized before inference
+        return self.model.overrides.get("imgsz") or 640
+        
     def predict_video(self, frame):
         try:
             if self.model is None:
@@ -157,7 +262,8 @@ class UltralyticsModel(BaseModel):
 
             logger.info(f"Frame shape: {frame.shape}")
 
-            results = self.model.predict(frame)
+            with observe_stage(self.model_id, "forward"):
+                results = self.model.predict(frame)
             logger.info(f"Prediction results: {results}")
             predictions = []
             class_names = self.model.names
@@ -183,7 +289,7 @@ class UltralyticsModel(BaseModel):
             logger.error(f"Error predicting video frame: {str(e)}")
             return {"error": str(e)}
 
-    def train(self, data):
+    def train(self, data, reporter=None):
         global pretrained_model_path, runs_folder
         try:
             if self.model is None:
@@ -202,7 +308,15 @@ class UltralyticsModel(BaseModel):
         
             if not os.path.exists(data_path):
                 raise FileNotFoundError(f"Dataset path not found: {data_path}")
+            
+            # exported artefacts are inference only, training always runs on the .pt weights
+            if self.runtime != 'torch':
+                self.model = YOLO(self.model_path)
+                self.runtime = 'torch'
         
+            if reporter:
+                for event, callback in self._telemetry_callbacks(reporter).items():
+                    self.model.add_callback(event, callback)
             self.model.train(data=data_path, epochs=epochs, imgsz=imgsz, lr0=learning_rate, batch=batch_size)
             logger.info("Training completed")
 
@@ -278,6 +392,70 @@ class UltralyticsModel(BaseModel):
         finally:
             cleanup()
             
+    @staticmethod
+    def _telemetry_callbacks(reporter):
+        """
+        Creates the Ultralytics callbacks reporting structured training telemetry: a "step" event with the
+        loss and throughput after every batch, and an "epoch" event with the validation mAP after every epoch.
+
+        Args:
+            reporter (callable): Receives each event dict.
+
+        Returns:
+            dict: The callbacks keyed by Ultralytics event name.
+        """
+        start_time = time.time()
+        epoch_state = {"start_time": start_time, "batches": 0}
+
+        def _throughput(trainer):
+            elapsed = time.time() - epoch_state["start_time"]
+            return round(epoch_state["batches"] * trainer.batch_size / elapsed, 2) if elapsed else None
+
+        def _loss(trainer):
+            return float(trainer.tloss.sum()) if trainer.tloss is not None else None
+
+        def on_train_epoch_start(trainer):
+            epoch_state.update({"start_time": time.time(), "batches": 0})
+
+        def on_train_batch_end(trainer):
+            epoch_state["batches"] += 1
+            reporter({
+                "event": "step",
+                "epoch": trainer.epoch + 1,
+                "epochs": trainer.epochs,
+                "step": epoch_state["batches"],
+                "steps_per_epoch": len(trainer.train_loader),
+                "loss": _loss(trainer),
+                "images_per_second": _throughput(trainer),
+            })
+
+        def on_fit_epoch_end(trainer):
+            epoch = trainer.epoch + 1
+            elapsed = time.time() - start_time
+            losses = trainer.label_loss_items(trainer.tloss, prefix="train") if trainer.tloss is not None else {}
+            metrics = trainer.metrics or {}
+            reporter({
+                "event": "epoch",
+                "epoch": epoch,
+                "epochs": trainer.epochs,
+                "loss": _loss(trainer),
+                "losses": {name: float(value) for name, value in losses.items()},
+                "precision": metrics.get("metrics/precision(B)"),
+                "recall": metrics.get("metrics/recall(B)"),
+                "mAP50": metrics.get("metrics/mAP50(B)"),
+                "mAP50_95": metrics.get("metrics/mAP50-95(B)"),
+                "learning_rate": next(iter(trainer.lr.values()), None) if trainer.lr else None,
+                "images_per_second": _throughput(trainer),
+                "elapsed_seconds": round(elapsed, 2),
+                "eta_seconds": round(elapsed / epoch * (trainer.epochs - epoch), 2),
+            })
+
+        return {
+            "on_train_epoch_start": on_train_epoch_start,
+            "on_train_batch_end": on_train_batch_end,
+            "on_fit_epoch_end": on_fit_epoch_end,
+        }
+
     def get_next_suffix(self, base_model_id):
         library = JSONHandler.read_json(DOWNLOADED_MODELS_PATH)
         i = 1
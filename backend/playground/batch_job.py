@@ -0,0 +1,332 @@
+import csv
+import json
+import logging
+import os
+import threading
+import time
+
+from backend.core.exceptions import FileReadError, PlaygroundError
+from backend.data_utils.json_handler import JSONHandler
+
+logger = logging.getLogger(__name__)
+
+# job statuses, "interrupted" marks a job that was running when the server stopped
+PENDING, RUNNING, COMPLETED, CANCELLED, FAILED, INTERRUPTED = (
+    "pending", "running", "completed", "cancelled", "failed", "interrupted"
+)
+
+SUPPORTED_DATASET_EXTENSIONS = [".csv", ".txt", ".jsonl"]
+
+
+def read_batch_items(dataset_path: str, text_column: str = "text"):
+    """
+    Lazily reads the items of a batch dataset file, so large files are never held in memory.
+
+    Args:
+        dataset_path (str): A .csv file (one item per row), .txt file (one item per line)
+            or .jsonl file (one request data dict or string per line).
+        text_column (str): The CSV column holding the text of each item.
+
+    Yields:
+        dict: The request data of each item.
+
+    Raises:
+        PlaygroundError: If the file type is not supported or the CSV has no such column.
+    """
+    extension = os.path.splitext(dataset_path)[1].lower()
+    with open(dataset_path, "r", encoding="utf-8", newline="") as f:
+        if extension == ".csv":
+            reader = csv.DictReader(f)
+            if text_column not in (reader.fieldnames or []):
+                raise PlaygroundError(f"Column {text_column} not found in {dataset_path}")
+            for row in reader:
+                yield {"payload": row[text_column]}
+        elif extension == ".txt":
+            for line in f:
+                line = line.rstrip("\r\n")
+                if line.strip():
+                    yield {"payload": line}
+        elif extension == ".jsonl":
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    yield item if isinstance(item, dict) else {"payload": item}
+        else:
+            raise PlaygroundError(
+                f"Unsupported dataset file type {extension}. Use one of {', '.join(SUPPORTED_DATASET_EXTENSIONS)}."
+            )
+
+
+class ChainBatchJob:
+    """
+    The ChainBatchJob class processes a dataset through a playground chain in the background.
+    Results are appended to a JSON lines file as items leave the chain, and the job state is
+    persisted next to it, so an interrupted or cancelled job resumes where it stopped.
+
+    Attributes:
+        job_id (str): The unique identifier of the job.
+        playground_id (str): The playground whose chain processes the items.
+        job_dir (str): The directory holding the job state, its input and its results.
+        dataset_path (str): The file the items are read from.
+        text_column (str): The CSV column holding the text of each item.
+        micro_batch_size (int): The number of items sent to a model at once.
+        status (str): The current status of the job.
+        total (int): The number of items in the dataset.
+        processed (int): The number of items with a result, successful or not.
+        failed (int): The number of items that failed.
+        error (str): The error that stopped the job, if any.
+    """
+
+    def __init__(self, job_id: str, playground_id: str, job_dir: str, dataset_path: str,
+                 text_column: str = "text", micro_batch_size: int = 16):
+        """
+        Initializes the ChainBatchJob instance.
+
+        Args:
+            job_id (str): The unique identifier of the job.
+            playground_id (str): The playground whose chain processes the items.
+            job_dir (str): The directory holding the job state, its input and its results.
+            dataset_path (str): The file the items are read from.
+            text_column (str, optional): The CSV column holding the text of each item. Defaults to "text".
+            micro_batch_size (int, optional): The number of items sent to a model at once. Defaults to 16.
+        """
+        self.job_id = job_id
+        self.playground_id = playground_id
+        self.job_dir = job_dir
+        self.dataset_path = dataset_path
+        self.text_column = text_column
+        self.micro_batch_size = micro_batch_size
+        self.status = PENDING
+        self.total = 0
+        self.processed = 0
+        self.failed = 0
+        self.error = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def output_path(self):
+        return os.path.join(self.job_dir, "results.jsonl")
+
+    @property
+    def state_path(self):
+        return os.path.join(self.job_dir, "job.json")
+
+    @classmethod
+    def create(cls, job_id: str, playground_id: str, job_dir: str, items: list = None, dataset_path: str = None,
+               text_column: str = "text", micro_batch_size: int = 16):
+        """
+        Creates a job from either a list of items or a dataset file.
+        A list of items is written to the job directory first, so the job can be resumed later.
+
+        Returns:
+            ChainBatchJob: The new job.
+
+        Raises:
+            PlaygroundError: If neither or both of items and dataset_path are given, or the file is not usable.
+        """
+        if (items is None) == (dataset_path is None):
+            raise PlaygroundError("Provide either a list of items or a dataset path for the batch job.")
+        if dataset_path is not None:
+            if not os.path.isfile(dataset_path):
+                raise PlaygroundError(f"Dataset file not found: {dataset_path}")
+            if os.path.splitext(dataset_path)[1].lower() not in SUPPORTED_DATASET_EXTENSIONS:
+                raise PlaygroundError(f"Unsupported dataset file type. Use one of {', '.join(SUPPORTED_DATASET_EXTENSIONS)}.")
+
+        os.makedirs(job_dir, exist_ok=True)
+        if items is not None:
+            dataset_path = os.path.join(job_dir, "input.jsonl")
+            with open(dataset_path, "w", encoding="utf-8") as f:
+                for item in items:
+                    f.write(json.dumps(item if isinstance(item, dict) else {"payload": item}) + "\n")
+
+        job = cls(job_id, playground_id, job_dir, dataset_path, text_column, micro_batch_size)
+        job.save_state()
+        return job
+
+    @classmethod
+    def from_state(cls, job_dir: str):
+        """
+        Restores a job from its persisted state. A job that was running is marked as interrupted.
+
+        Args:
+            job_dir (str): The directory of the job.
+
+        Returns:
+            ChainBatchJob: The restored job.
+
+        Raises:
+            FileReadError: If the job state cannot be read.
+        """
+        state = JSONHandler.read_json(os.path.join(job_dir, "job.json"))
+        job = cls(state["job_id"], state["playground_id"], job_dir, state["dataset_path"],
+                  state.get("text_column", "text"), state.get("micro_batch_size", 16))
+        job.status = INTERRUPTED if state["status"] in (PENDING, RUNNING) else state["status"]
+        job.total = state.get("total", 0)
+        job.processed = state.get("processed", 0)
+        job.failed = state.get("failed", 0)
+        job.error = state.get("error")
+        job.created_at = state.get("created_at", job.created_at)
+        job.updated_at = state.get("updated_at", job.updated_at)
+        return job
+
+    def to_dict(self):
+        """
+        Creates a dictionary representation of the job, including its progress.
+
+        Returns:
+            dict: The job state.
+        """
+        return {
+            "job_id": self.job_id,
+            "playground_id": self.playground_id,
+            "dataset_path": self.dataset_path,
+            "text_column": self.text_column,
+            "micro_batch_size": self.micro_batch_size,
+            "status": self.status,
+            "total": self.total,
+            "processed": self.processed,
+            "failed": self.failed,
+            "progress": round(self.processed / self.total, 4) if self.total else 0.0,
+            "output_path": self.output_path,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+    def save_state(self):
+        self.updated_at = time.time()
+        JSONHandler.write_json(self.state_path, self.to_dict())
+
+    def is_active(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, executor):
+        """
+        Starts processing the items that have no successful result yet in a background thread.
+
+        Args:
+            executor: A ChainExecutor or DagExecutor running the playground's chain.
+
+        Raises:
+            PlaygroundError: If the job is already running or has completed without failed items.
+        """
+        if self.is_active():
+            raise PlaygroundError(f"Batch job {self.job_id} is already running")
+        if self.status == COMPLETED and not self.failed:
+            raise PlaygroundError(f"Batch job {self.job_id} has already completed")
+
+        self._stop_event.clear()
+        self.status = RUNNING
+        self.error = None
+        self.save_state()
+        self._thread = threading.Thread(target=self._run, args=(executor,), daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        """
+        Stops feeding new items to the chain. Items already in the chain are still written.
+        """
+        self._stop_event.set()
+
+    def _run(self, executor):
+        try:
+            done = self._compact_results()
+            self.total = sum(1 for _ in read_batch_items(self.dataset_path, self.text_column))
+            self.processed = len(done)
+            self.failed = 0
+            self.save_state()
+            logger.info(f"Batch job {self.job_id} started: {self.processed}/{self.total} items already processed")
+
+            pending = (
+                (index, data)
+                for index, data in enumerate(read_batch_items(self.dataset_path, self.text_column))
+                if index not in done
+            )
+            lock = threading.Lock()
+            last_saved = [time.time()]
+
+            with open(self.output_path, "a", encoding="utf-8") as output_file:
+                def on_result(index, result):
+                    if isinstance(result, Exception):
+                        line = {"index": index, "error": str(result)}
+                    else:
+                        line = {"index": index, "output": result}
+                    with lock:
+                        output_file.write(json.dumps(line, default=str) + "\n")
+                        output_file.flush()
+                        self.processed += 1
+                        self.failed += isinstance(result, Exception)
+                        # persist the progress at most once a second
+                        if time.time() - last_saved[0] >= 1:
+                            last_saved[0] = time.time()
+                            self.save_state()
+
+                executor.run_micro_batches(pending, self.micro_batch_size, on_result, self._stop_event.is_set)
+
+            self.status = CANCELLED if self._stop_event.is_set() else COMPLETED
+            logger.info(f"Batch job {self.job_id} {self.status}: {self.processed}/{self.total} items, {self.failed} failed")
+        except Exception as e:
+            logger.error(f"Batch job {self.job_id} failed: {str(e)}")
+            self.status = FAILED
+            self.error = str(e)
+        finally:
+            try:
+                self.save_state()
+            except Exception as e:
+                logger.error(f"Failed to save the state of batch job {self.job_id}: {str(e)}")
+
+    def _compact_results(self):
+        """
+        Keeps only the successful results of previous runs, failed items are retried.
+
+        Returns:
+            set: The indices of the items with a successful result.
+        """
+        if not os.path.exists(self.output_path):
+            return set()
+
+        done = set()
+        kept_lines = []
+        with open(self.output_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    # a line cut short by a crash
+                    continue
+                if "output" in result and result["index"] not in done:
+                    done.add(result["index"])
+                    kept_lines.append(line if line.endswith("\n") else line + "\n")
+
+        temp_path = f"{self.output_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.writelines(kept_lines)
+        os.replace(temp_path, self.output_path)
+        return done
+
+
+def load_batch_jobs(jobs_dir: str):
+    """
+    Restores every persisted batch job.
+
+    Args:
+        jobs_dir (str): The directory holding one sub-directory per job.
+
+    Returns:
+        dict: The jobs keyed by job ID.
+    """
+    jobs = {}
+    if not os.path.isdir(jobs_dir):
+        return jobs
+    for job_id in os.listdir(jobs_dir):
+        job_dir = os.path.join(jobs_dir, job_id)
+        if not os.path.exists(os.path.join(job_dir, "job.json")):
+            continue
+        try:
+            jobs[job_id] = ChainBatchJob.from_state(job_dir)
+        except (FileReadError, KeyError) as e:
+            logger.error(f"Failed to restore batch job {job_id}: {str(e)}")
+    return jobs
@@ -0,0 +1,382 @@
+import logging
+import queue
+import re
+import threading
+
+from backend.core.exceptions import ModelError
+
+logger = logging.getLogger(__name__)
+
+# marks the end of the items (or of the partial outputs of one item) flowing through a stage queue
+_END = object()
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?。！？])\s+")
+
+# how often a streaming stage blocked on a queue checks whether the stream was abandoned, in seconds
+_CANCEL_POLL_INTERVAL = 0.1
+
+
+def result_to_payload(result):
+    """
+    Converts the output of a model into the text payload of the next model in the chain.
+
+    Args:
+        result: The output of a model.
+
+    Returns:
+        str: The text carried by the output, or its string representation when there is none.
+    """
+    if isinstance(result, str):
+        return result
+    if isinstance(result, dict):
+        text = _extract_text(result)
+        if text is not None:
+            return text
+    if isinstance(result, list) and result and all(isinstance(item, dict) for item in result):
+        texts = [_extract_text(item) for item in result]
+        if None not in texts:
+            return " ".join(texts)
+    return str(result)
+
+
+def _extract_text(result: dict):
+    for key in ("text", "generated_text", "translation_text", "summary_text"):
+        if isinstance(result.get(key), str):
+            return result[key]
+    return None
+
+
+class ChainExecutor:
+    """
+    The ChainExecutor class runs a playground chain with one worker thread per model, connected by queues.
+    Stages work concurrently: while a stage handles item k+1 the next stage handles item k, and in
+    streaming mode a stage starts on the first complete sentence of its upstream output instead of
+    waiting for the whole output, so end-to-end latency approaches that of the slowest stage.
+    """
+
+    def __init__(self, model_control, chain: list, queue_size: int = 8):
+        """
+        Initializes the ChainExecutor instance.
+
+        Args:
+            model_control: The model control instance holding the loaded models of the chain.
+            chain (list): The model IDs of the chain in execution order.
+            queue_size (int): The maximum number of items waiting between two stages.
+        """
+        self.model_control = model_control
+        self.chain = chain
+        self.queue_size = queue_size
+
+    def run(self, items: list):
+        """
+        Pushes a batch of requests through the chain, pipelining the items across the stages.
+
+        Args:
+            items (list): The request data of every item, as sent to the first model of the chain.
+
+        Returns:
+            list: The output of the last model for every item, in the order of the items.
+
+        Raises:
+            Exception: The first error raised by a model, after all stages have stopped.
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.chain) + 1)]
+        threads = [
+            threading.Thread(target=self._run_stage, args=(model_id, queues[i], queues[i + 1], i == 0), daemon=True)
+            for i, model_id in enumerate(self.chain)
+        ]
+        for thread in threads:
+            thread.start()
+
+        feeder = threading.Thread(target=self._feed, args=(items, queues[0]), daemon=True)
+        feeder.start()
+
+        results = [None] * len(items)
+        errors = []
+        while True:
+            entry = queues[-1].get()
+            if entry is _END:
+                break
+            index, result = entry
+            if isinstance(result, Exception):
+                errors.append(result)
+            results[index] = result
+
+        feeder.join()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        return results
+
+    def run_micro_batches(self, items, micro_batch_size: int, on_result, should_stop=None):
+        """
+        Pushes a large number of requests through the chain in micro-batches.
+        Every stage sends a whole micro-batch to its model in one call, and stages work on
+        different micro-batches at the same time.
+
+        Args:
+            items: An iterable of (index, request data) pairs.
+            micro_batch_size (int): The number of items sent to a model at once.
+            on_result (callable): Called with (index, result) as each item leaves the chain,
+                result is an Exception when the item failed.
+            should_stop (callable, optional): Polled before each micro-batch is fed, returning True stops feeding.
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.chain) + 1)]
+        threads = [
+            threading.Thread(target=self._run_batch_stage, args=(model_id, queues[i], queues[i + 1], i == 0), daemon=True)
+            for i, model_id in enumerate(self.chain)
+        ]
+        for thread in threads:
+            thread.start()
+
+        feeder = threading.Thread(
+            target=self._feed_micro_batches, args=(items, micro_batch_size, queues[0], should_stop), daemon=True
+        )
+        feeder.start()
+
+        while True:
+            entry = queues[-1].get()
+            if entry is _END:
+                break
+            for index, result in entry:
+                on_result(index, result)
+
+        feeder.join()
+        for thread in threads:
+            thread.join()
+
+    def stream(self, data: dict):
+        """
+        Runs a single request through the chain in streaming mode.
+        Text produced by a model is split at sentence boundaries and every complete sentence is
+        sent to the next model straight away. A chain using a model more than once runs its stages
+        one after the other instead: a model serves one request at a time, so a stage would wait for
+        a later stage of the same model while blocking the queue that stage drains.
+
+        Args:
+            data (dict): The request data sent to the first model of the chain.
+
+        Yields:
+            The partial outputs of the last model of the chain as they are produced.
+
+        Raises:
+            Exception: The first error raised by a model.
+        """
+        if len(set(self.chain)) < len(self.chain):
+            logger.info(f"Chain {self.chain} repeats a model, streaming only the output of its last stage")
+            yield from self._stream_sequential(data)
+            return
+
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.chain) + 1)]
+        cancelled = threading.Event()
+        threads = []
+        for i, model_id in enumerate(self.chain):
+            target = self._stream_first_stage if i == 0 else self._stream_stage
+            threads.append(threading.Thread(target=target, args=(model_id, queues[i], queues[i + 1], cancelled), daemon=True))
+        for thread in threads:
+            thread.start()
+
+        try:
+            queues[0].put(data)
+            while True:
+                chunk = queues[-1].get()
+                if chunk is _END:
+                    break
+                if isinstance(chunk, Exception):
+                    # let the remaining stages wind down before reporting the error
+                    for thread in threads:
+                        thread.join()
+                    raise chunk
+                yield chunk
+
+            for thread in threads:
+                thread.join()
+        finally:
+            # when the consumer stops early (e.g. the client disconnected) the stages must not stay blocked on
+            # full queues while their model streams hold the models' connections
+            cancelled.set()
+            for stage_queue in queues:
+                _drain(stage_queue)
+
+    def _stream_sequential(self, data: dict):
+        for model_id in self.chain[:-1]:
+            result = self.model_control.inference({"model_id": model_id, "data": data, "playground_request": True})
+            data = {"payload": result_to_payload(result)}
+        yield from self.model_control.inference_stream({
+            "model_id": self.chain[-1],
+            "data": data,
+            "playground_request": True
+        })
+
+    @staticmethod
+    def _feed(items: list, output_queue: queue.Queue):
+        for index, item in enumerate(items):
+            output_queue.put((index, item))
+        output_queue.put(_END)
+
+    @staticmethod
+    def _feed_micro_batches(items, micro_batch_size: int, output_queue: queue.Queue, should_stop=None):
+        micro_batch = []
+        try:
+            for entry in items:
+                micro_batch.append(entry)
+                if len(micro_batch) < micro_batch_size:
+                    continue
+                if should_stop and should_stop():
+                    micro_batch = []
+                    break
+                output_queue.put(micro_batch)
+                micro_batch = []
+            if micro_batch and not (should_stop and should_stop()):
+                output_queue.put(micro_batch)
+        except Exception as e:
+            logger.error(f"Failed to read the items of the chain: {str(e)}")
+        finally:
+            # the stages always need the end marker, or they would wait forever
+            output_queue.put(_END)
+
+    def _run_batch_stage(self, model_id: str, input_queue: queue.Queue, output_queue: queue.Queue, is_first_stage: bool):
+        while True:
+            micro_batch = input_queue.get()
+            if micro_batch is _END:
+                output_queue.put(_END)
+                return
+            # items that already failed upstream are passed through untouched
+            pending = [(index, data) for index, data in micro_batch if not isinstance(data, Exception)]
+            results = dict((index, data) for index, data in micro_batch if isinstance(data, Exception))
+            if pending:
+                batch = [data if is_first_stage else {"payload": result_to_payload(data)} for _, data in pending]
+                try:
+                    outputs = self.model_control.inference_batch(model_id, batch)
+                    for (index, _), output in zip(pending, outputs):
+                        results[index] = ModelError(output["error"]) if isinstance(output, dict) and "error" in output else output
+                except Exception as e:
+                    logger.error(f"Chain stage {model_id} failed on a micro-batch: {str(e)}")
+                    for index, _ in pending:
+                        results[index] = e
+            output_queue.put([(index, results[index]) for index, _ in micro_batch])
+
+    def _run_stage(self, model_id: str, input_queue: queue.Queue, output_queue: queue.Queue, is_first_stage: bool):
+        while True:
+            entry = input_queue.get()
+            if entry is _END:
+                output_queue.put(_END)
+                return
+            index, data = entry
+            # items that already failed upstream are passed through untouched
+            if isinstance(data, Exception):
+                output_queue.put(entry)
+                continue
+            try:
+                # the first model receives the request data, later models the text of the previous output
+                if not is_first_stage:
+                    data = {"payload": result_to_payload(data)}
+                result = self.model_control.inference({
+                    "model_id": model_id,
+                    "data": data,
+                    "playground_request": True
+                })
+            except Exception as e:
+                logger.error(f"Chain stage {model_id} failed on item {index}: {str(e)}")
+                result = e
+            output_queue.put((index, result))
+
+    def _stream_first_stage(self, model_id: str, input_queue: queue.Queue, output_queue: queue.Queue,
+                            cancelled: threading.Event):
+        data = _get(input_queue, cancelled)
+        if data is _END:
+            return
+        chunks = self.model_control.inference_stream({
+            "model_id": model_id,
+            "data": data,
+            "playground_request": True
+        })
+        try:
+            for chunk in chunks:
+                if not _put(output_queue, chunk, cancelled):
+                    return
+        except Exception as e:
+            logger.error(f"Chain stage {model_id} failed: {str(e)}")
+            _put(output_queue, e, cancelled)
+        finally:
+            # closing the model stream drains its pipe and releases the model
+            chunks.close()
+        _put(output_queue, _END, cancelled)
+
+    def _stream_stage(self, model_id: str, input_queue: queue.Queue, output_queue: queue.Queue,
+                      cancelled: threading.Event):
+        buffer = ""
+        failed = False
+        while True:
+            chunk = _get(input_queue, cancelled)
+            if chunk is _END:
+                break
+            if failed:
+                continue
+            if isinstance(chunk, Exception):
+                _put(output_queue, chunk, cancelled)
+                failed = True
+                continue
+
+            # non-text chunks are whole outputs, so they always end a segment
+            buffer += chunk if isinstance(chunk, str) else result_to_payload(chunk) + " "
+            # everything before the last boundary is made of complete sentences
+            *sentences, buffer = _SENTENCE_BOUNDARY.split(buffer)
+            for sentence in sentences:
+                failed = not self._stream_segment(model_id, sentence, output_queue, cancelled)
+                if failed:
+                    break
+
+        if buffer.strip() and not failed and not cancelled.is_set():
+            self._stream_segment(model_id, buffer, output_queue, cancelled)
+        _put(output_queue, _END, cancelled)
+
+    def _stream_segment(self, model_id: str, text: str, output_queue: queue.Queue, cancelled: threading.Event):
+        chunks = self.model_control.inference_stream({
+            "model_id": model_id,
+            "data": {"payload": text.strip()},
+            "playground_request": True
+        })
+        try:
+            for chunk in chunks:
+                # separate consecutive text segments so sentence boundaries survive downstream
+                if not _put(output_queue, chunk + " " if isinstance(chunk, str) and not chunk.endswith(" ") else chunk,
+                            cancelled):
+                    return False
+            return True
+        except Exception as e:
+            logger.error(f"Chain stage {model_id} failed: {str(e)}")
+            _put(output_queue, e, cancelled)
+            return False
+        finally:
+            chunks.close()
+
+
+def _put(output_queue: queue.Queue, item, cancelled: threading.Event):
+    # returns False instead of blocking forever once the stream is abandoned
+    while not cancelled.is_set():
+        try:
+            output_queue.put(item, timeout=_CANCEL_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(input_queue: queue.Queue, cancelled: threading.Event):
+    # an abandoned stream ends like a finished one
+    while not cancelled.is_set():
+        try:
+            return input_queue.get(timeout=_CANCEL_POLL_INTERVAL)
+        except queue.Empty:
+            continue
+    return _END
+
+
+def _drain(stage_queue: queue.Queue):
+    while True:
+        try:
+            stage_queue.get_nowait()
+        except queue.Empty:
+            return
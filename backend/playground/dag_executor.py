@@ -0,0 +1,180 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.core.exceptions import ChainNotCompatibleError, ModelError
+from backend.playground.chain_executor import result_to_payload
+
+logger = logging.getLogger(__name__)
+
+
+def topological_order(dag: dict) -> list:
+    """
+    Orders the models of a DAG so that every model comes after all of its upstream models.
+
+    Args:
+        dag (dict): Maps each model ID to the list of model IDs it feeds its output to.
+
+    Returns:
+        list: The model IDs in execution order.
+
+    Raises:
+        ChainNotCompatibleError: If an edge points to a model missing from the DAG or the DAG contains a cycle.
+    """
+    upstream = get_upstream(dag)
+    remaining = {model_id: len(parents) for model_id, parents in upstream.items()}
+    # keep the declaration order among models that are ready at the same time
+    ready = [model_id for model_id in dag if remaining[model_id] == 0]
+    order = []
+    while ready:
+        model_id = ready.pop(0)
+        order.append(model_id)
+        for child in dag[model_id]:
+            remaining[child] -= 1
+            if remaining[child] == 0:
+                ready.append(child)
+
+    if len(order) != len(dag):
+        raise ChainNotCompatibleError("The chain contains a cycle, a model cannot consume its own output.")
+    return order
+
+
+def get_upstream(dag: dict) -> dict:
+    """
+    Inverts a DAG definition.
+
+    Args:
+        dag (dict): Maps each model ID to the list of model IDs it feeds its output to.
+
+    Returns:
+        dict: Maps each model ID to the list of model IDs feeding it, in declaration order.
+
+    Raises:
+        ChainNotCompatibleError: If an edge points to a model missing from the DAG.
+    """
+    upstream = {model_id: [] for model_id in dag}
+    for model_id, children in dag.items():
+        for child in children:
+            if child not in upstream:
+                raise ChainNotCompatibleError(f"Model {child} is fed by {model_id} but is not a node of the chain.")
+            if model_id not in upstream[child]:
+                upstream[child].append(model_id)
+    return upstream
+
+
+class DagExecutor:
+    """
+    The DagExecutor class runs a playground chain defined as a DAG.
+    Every model starts as soon as all of its upstream models have finished, so independent branches
+    run concurrently on their own workers and a request takes the time of the DAG's critical path.
+    """
+
+    def __init__(self, model_control, dag: dict):
+        """
+        Initializes the DagExecutor instance.
+
+        Args:
+            model_control: The model control instance holding the loaded models of the DAG.
+            dag (dict): Maps each model ID to the list of model IDs it feeds its output to.
+        """
+        self.model_control = model_control
+        self.dag = dag
+        self.order = topological_order(dag)
+        self.upstream = get_upstream(dag)
+        self.sinks = [model_id for model_id in self.order if not dag[model_id]]
+
+    def run(self, items: list):
+        """
+        Pushes a batch of requests through the DAG.
+
+        Args:
+            items (list): The request data of every item, sent to every root model of the DAG.
+
+        Returns:
+            list: For every item, a dict mapping each sink model ID to its output.
+
+        Raises:
+            Exception: The first error raised by a model.
+        """
+        # one thread per model, so a model waiting on its upstream futures never starves a runnable one
+        with ThreadPoolExecutor(max_workers=len(self.order)) as pool:
+            return [self._run_item(pool, data) for data in items]
+
+    def run_micro_batches(self, items, micro_batch_size: int, on_result, should_stop=None):
+        """
+        Pushes a large number of requests through the DAG in micro-batches.
+        Every model receives a whole micro-batch in one call, and independent branches run concurrently.
+
+        Args:
+            items: An iterable of (index, request data) pairs.
+            micro_batch_size (int): The number of items sent to a model at once.
+            on_result (callable): Called with (index, result) for each item, result is an Exception when the item failed.
+            should_stop (callable, optional): Polled before each micro-batch, returning True stops processing.
+        """
+        with ThreadPoolExecutor(max_workers=len(self.order)) as pool:
+            micro_batch = []
+            for entry in items:
+                micro_batch.append(entry)
+                if len(micro_batch) < micro_batch_size:
+                    continue
+                if should_stop and should_stop():
+                    return
+                self._run_micro_batch(pool, micro_batch, on_result)
+                micro_batch = []
+            if micro_batch and not (should_stop and should_stop()):
+                self._run_micro_batch(pool, micro_batch, on_result)
+
+    def _run_micro_batch(self, pool: ThreadPoolExecutor, micro_batch: list, on_result):
+        batch = [data for _, data in micro_batch]
+        futures = {}
+        for model_id in self.order:
+            parent_futures = [futures[parent] for parent in self.upstream[model_id]]
+            futures[model_id] = pool.submit(self._run_model_batch, model_id, batch, parent_futures)
+
+        sink_results = {model_id: futures[model_id].result() for model_id in self.sinks}
+        for position, (index, _) in enumerate(micro_batch):
+            outputs = {model_id: results[position] for model_id, results in sink_results.items()}
+            error = next((output for output in outputs.values() if isinstance(output, Exception)), None)
+            on_result(index, error if error is not None else outputs)
+
+    def _run_model_batch(self, model_id: str, batch: list, parent_futures: list):
+        if parent_futures:
+            parent_results = [future.result() for future in parent_futures]
+            inputs = []
+            for position in range(len(batch)):
+                upstream_outputs = [results[position] for results in parent_results]
+                error = next((output for output in upstream_outputs if isinstance(output, Exception)), None)
+                inputs.append(error if error is not None else {"payload": "\n".join(result_to_payload(output) for output in upstream_outputs)})
+        else:
+            inputs = batch
+
+        results = list(inputs)
+        pending = [position for position, data in enumerate(inputs) if not isinstance(data, Exception)]
+        if not pending:
+            return results
+        try:
+            outputs = self.model_control.inference_batch(model_id, [inputs[position] for position in pending])
+            for position, output in zip(pending, outputs):
+                results[position] = ModelError(output["error"]) if isinstance(output, dict) and "error" in output else output
+        except Exception as e:
+            logger.error(f"DAG node {model_id} failed on a micro-batch: {str(e)}")
+            for position in pending:
+                results[position] = e
+        return results
+
+    def _run_item(self, pool: ThreadPoolExecutor, data: dict):
+        futures = {}
+        for model_id in self.order:
+            parent_futures = [futures[parent] for parent in self.upstream[model_id]]
+            futures[model_id] = pool.submit(self._run_model, model_id, data, parent_futures)
+        return {model_id: futures[model_id].result() for model_id in self.sinks}
+
+    def _run_model(self, model_id: str, data: dict, parent_futures: list):
+        if parent_futures:
+            # fan-in: the text of every upstream output, in declaration order
+            data = {"payload": "\n".join(result_to_payload(future.result()) for future in parent_futures)}
+        logger.debug(f"Running DAG node {model_id}")
+        return self.model_control.inference({
+            "model_id": model_id,
+            "data": data,
+            "playground_request": True
+        })
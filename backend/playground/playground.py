@@ -8,6 +8,8 @@ class Playground:
         models (dict): A dictionary of models added to the playground, where the key is the model ID and 
         the value is another dictionary which indicates the input and output types.
         chain (list): A list representing the order of models to be executed.
+        dag (dict): For chains with parallel branches, maps each model ID to the list of model IDs it feeds.
+        None for linear chains, in which case chain alone describes the execution.
         active_chain (bool): A flag indicating whether the chain is currently active.
     """
 
@@ -17,6 +19,7 @@ class Playground:
         description: str = None,
         models: dict = None,
         chain: list = None,
+        dag: dict = None,
     ):
         """
         Initializes a new instance of the Playground class.
@@ -26,11 +29,13 @@ class Playground:
             description (str, optional): A description of the playground. Defaults to None.
             models (dict, optional): A dictionary of models added to the playground. Defaults to an empty dictionary.
             chain (list, optional): A list representing the chain of models to be executed. Defaults to an empty list.
+            dag (dict, optional): The DAG definition of the chain. Defaults to None (linear chain).
         """
         self.playground_id = playground_id
         self.description = description
         self.models = models if models is not None else {}
         self.chain = chain if chain is not None else []
+        self.dag = dag
         self.active_chain = False
 
     def to_dict(self):
@@ -38,11 +43,12 @@ class Playground:
         Creates a dictionary representation of the playground.
 
         Returns:
-            dict: A dictionary containing the playground's description, models, chain, and active chain status.
+            dict: A dictionary containing the playground's description, models, chain, DAG, and active chain status.
         """
         return {
             "description": self.description,
             "models": self.models,
             "chain": self.chain,
+            "dag": self.dag,
             "active_chain": self.active_chain,
         }
\ No newline at end of file
@@ -0,0 +1,69 @@
+import json
+import os
+import time
+
+import pytest
+
+from backend.playground.batch_job import ChainBatchJob, COMPLETED, read_batch_items
+from backend.playground.chain_executor import ChainExecutor
+
+
+class FakeModelControl:
+    """Upper-cases every payload, payloads containing "fail" raise an error."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def inference_batch(self, model_id, batch):
+        self.batch_sizes.append(len(batch))
+        return [
+            {"error": "bad item"} if "fail" in data["payload"] else {"translation_text": data["payload"].upper()}
+            for data in batch
+        ]
+
+
+def wait_for(job):
+    while job.is_active():
+        time.sleep(0.01)
+
+
+def read_results(job):
+    with open(job.output_path) as f:
+        return {line["index"]: line for line in map(json.loads, f)}
+
+
+def test_read_batch_items_from_csv(tmp_path):
+    dataset = tmp_path / "items.csv"
+    dataset.write_text("id,text\n1,hello\n2,world\n")
+    assert list(read_batch_items(str(dataset))) == [{"payload": "hello"}, {"payload": "world"}]
+
+
+def test_job_writes_results_in_micro_batches(tmp_path):
+    model_control = FakeModelControl()
+    job = ChainBatchJob.create("job", "playground", str(tmp_path / "job"), items=[f"item {i}" for i in range(10)],
+                               micro_batch_size=4)
+    job.start(ChainExecutor(model_control, ["a", "b"]))
+    wait_for(job)
+
+    assert job.status == COMPLETED
+    assert job.processed == 10
+    # two stages, each called once per micro-batch
+    assert sorted(model_control.batch_sizes) == [2, 2, 4, 4, 4, 4]
+    results = read_results(job)
+    assert results[3]["output"] == {"translation_text": "ITEM 3"}
+
+
+def test_resume_retries_only_failed_items(tmp_path):
+    job = ChainBatchJob.create("job", "playground", str(tmp_path / "job"), items=["ok", "fail", "ok too"])
+    job.start(ChainExecutor(FakeModelControl(), ["a"]))
+    wait_for(job)
+    assert job.failed == 1
+
+    restored = ChainBatchJob.from_state(job.job_dir)
+    model_control = FakeModelControl()
+    restored.start(ChainExecutor(model_control, ["a"]))
+    wait_for(restored)
+
+    assert model_control.batch_sizes == [1]
+    assert read_results(restored)[1]["error"] == "bad item"
+    assert os.path.exists(restored.state_path)
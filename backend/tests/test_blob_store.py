@@ -0,0 +1,98 @@
+import os
+import stat
+
+import pytest
+
+from backend.utils.blob_store import BlobStore, remove_tree
+
+
+@pytest.fixture(scope="function")
+def blob_store(tmp_path):
+    yield BlobStore(blobs_dir=str(tmp_path / "blobs"))
+
+def write_model(directory, weights: bytes):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "model.safetensors"), "wb") as f:
+        f.write(weights)
+    with open(os.path.join(directory, "config.json"), "w") as f:
+        f.write("{}")
+
+def test_identical_weights_share_one_inode(blob_store, tmp_path):
+    write_model(tmp_path / "base", b"weights")
+    write_model(tmp_path / "copy", b"weights")
+
+    assert blob_store.dedupe_directory(str(tmp_path / "base"))["deduplicated"] == 0
+    stats = blob_store.dedupe_directory(str(tmp_path / "copy"))
+
+    assert stats == {"files": 1, "deduplicated": 1, "saved_bytes": len(b"weights")}
+    assert os.path.samefile(tmp_path / "base" / "model.safetensors", tmp_path / "copy" / "model.safetensors")
+    assert (tmp_path / "copy" / "model.safetensors").read_bytes() == b"weights"
+
+def write_hf_cache_model(directory, weights: bytes):
+    # the layout huggingface_hub downloads into: hashed blobs and snapshots of symlinks to them
+    blobs = os.path.join(directory, "models--org--model", "blobs")
+    snapshot = os.path.join(directory, "models--org--model", "snapshots", "main")
+    os.makedirs(blobs, exist_ok=True)
+    os.makedirs(snapshot, exist_ok=True)
+    for name, content, blob in (("model.safetensors", weights, "a1b2"), ("config.json", b"{}", "c3d4")):
+        with open(os.path.join(blobs, blob), "wb") as f:
+            f.write(content)
+        os.symlink(os.path.join("..", "..", "blobs", blob), os.path.join(snapshot, name))
+    return os.path.join(snapshot, "model.safetensors")
+
+def test_hugging_face_cache_blobs_are_deduplicated(blob_store, tmp_path):
+    base = write_hf_cache_model(tmp_path / "base", b"weights")
+    copy = write_hf_cache_model(tmp_path / "copy", b"weights")
+
+    blob_store.dedupe_directory(str(tmp_path / "base"))
+    stats = blob_store.dedupe_directory(str(tmp_path / "copy"))
+
+    assert stats["files"] == 2 and stats["deduplicated"] == 2
+    assert os.path.samefile(base, copy)
+    with open(copy, "rb") as f:
+        assert f.read() == b"weights"
+
+def test_unreferenced_blobs_are_collected(blob_store, tmp_path):
+    write_model(tmp_path / "base", b"weights")
+    write_model(tmp_path / "other", b"other weights")
+    blob_store.dedupe_directory(str(tmp_path / "base"))
+    blob_store.dedupe_directory(str(tmp_path / "other"))
+
+    os.remove(tmp_path / "other" / "model.safetensors")
+    result = blob_store.collect_garbage()
+
+    assert result == {"removed": 1, "freed_bytes": len(b"other weights")}
+    assert (tmp_path / "base" / "model.safetensors").read_bytes() == b"weights"
+
+def test_linked_weights_are_read_only(blob_store, tmp_path):
+    write_model(tmp_path / "base", b"weights")
+    write_model(tmp_path / "copy", b"weights")
+    blob_store.dedupe_directory(str(tmp_path / "base"))
+    blob_store.dedupe_directory(str(tmp_path / "copy"))
+
+    assert not os.stat(tmp_path / "copy" / "model.safetensors").st_mode & stat.S_IWUSR
+    if os.geteuid() != 0:  # root ignores file modes
+        with pytest.raises(PermissionError):
+            open(tmp_path / "copy" / "model.safetensors", "wb")
+
+def test_rewriting_a_detached_copy_leaves_the_others_intact(blob_store, tmp_path):
+    for name in ("base", "copy", "other"):
+        write_model(tmp_path / name, b"weights")
+        blob_store.dedupe_directory(str(tmp_path / name))
+
+    assert blob_store.detach_directory(str(tmp_path / "copy")) == 1
+    with open(tmp_path / "copy" / "model.safetensors", "wb") as f:
+        f.write(b"new weights")
+
+    assert (tmp_path / "copy" / "model.safetensors").read_bytes() == b"new weights"
+    assert (tmp_path / "base" / "model.safetensors").read_bytes() == b"weights"
+    assert (tmp_path / "other" / "model.safetensors").read_bytes() == b"weights"
+    assert os.path.samefile(tmp_path / "base" / "model.safetensors", tmp_path / "other" / "model.safetensors")
+
+def test_directories_with_read_only_links_can_be_removed(blob_store, tmp_path):
+    write_model(tmp_path / "base", b"weights")
+    blob_store.dedupe_directory(str(tmp_path / "base"))
+
+    remove_tree(str(tmp_path / "base"))
+    assert not (tmp_path / "base").exists()
+    assert blob_store.collect_garbage() == {"removed": 1, "freed_bytes": len(b"weights")}
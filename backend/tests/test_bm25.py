@@ -0,0 +1,30 @@
+from backend.utils.bm25 import BM25Index, reciprocal_rank_fusion, tokenize
+
+
+TEXTS = [
+    "Order CX-4521 was shipped to Berlin on Monday",
+    "The weather in Berlin is mild in spring",
+    "Refund policy: orders can be returned within 30 days",
+    "Order CX-9000 is delayed",
+]
+
+
+def test_identifiers_are_kept_whole():
+    assert tokenize("Order CX-4521, version v1.2!") == ["order", "cx-4521", "version", "v1.2"]
+
+
+def test_exact_identifier_ranks_first(tmp_path):
+    path = tmp_path / "bm25_index.pkl"
+    BM25Index.build(TEXTS).save(path)
+    index = BM25Index.load(path)
+
+    matches = index.search("where is order CX-4521", top_k=2)
+    assert [doc_id for doc_id, _ in matches][0] == 0
+    assert len(matches) == 2
+    assert index.search("unknown terms only", top_k=5) == []
+
+
+def test_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([[1, 2, 3], [3, 1, 4]], k=60)
+    assert [doc_id for doc_id, _ in fused] == [1, 3, 2, 4]
+    assert fused[0][1] == 1 / 61 + 1 / 62
@@ -0,0 +1,105 @@
+import threading
+
+import pytest
+
+from backend.core.exceptions import ChainNotCompatibleError
+from backend.playground.chain_executor import ChainExecutor, result_to_payload
+from backend.playground.dag_executor import DagExecutor, topological_order
+
+
+class FakeModelControl:
+    """Stands in for ModelControl: "upper" upper-cases its payload, "stream" emits it word by word."""
+
+    def inference(self, request):
+        if request["model_id"] == "fail":
+            raise RuntimeError("model failed")
+        return {"translation_text": request["data"]["payload"].upper()}
+
+    def inference_stream(self, request):
+        if request["model_id"] == "stream":
+            for word in request["data"]["payload"].split(" "):
+                yield word + " "
+        else:
+            yield self.inference(request)["translation_text"]
+
+
+def test_result_to_payload_extracts_text():
+    assert result_to_payload("plain") == "plain"
+    assert result_to_payload({"generated_text": "hi"}) == "hi"
+    assert result_to_payload([{"translation_text": "a"}, {"translation_text": "b"}]) == "a b"
+    assert result_to_payload([{"label": "x"}]) == str([{"label": "x"}])
+
+
+def test_run_keeps_batch_order():
+    executor = ChainExecutor(FakeModelControl(), ["upper", "upper"])
+    results = executor.run([{"payload": f"item {i}"} for i in range(20)])
+    assert results == [{"translation_text": f"ITEM {i}"} for i in range(20)]
+
+
+def test_run_raises_stage_error():
+    executor = ChainExecutor(FakeModelControl(), ["upper", "fail"])
+    with pytest.raises(RuntimeError, match="model failed"):
+        executor.run([{"payload": "a"}, {"payload": "b"}])
+
+
+def test_stream_forwards_sentences():
+    executor = ChainExecutor(FakeModelControl(), ["stream", "upper"])
+    chunks = list(executor.stream({"payload": "Hello world. How are you?"}))
+    assert chunks == ["HELLO WORLD. ", "HOW ARE YOU? "]
+
+
+class LockingModelControl(FakeModelControl):
+    # like ModelControl, a model's stream holds its connection until it is exhausted or closed
+    def __init__(self):
+        self.locks = {"stream": threading.Lock(), "upper": threading.Lock()}
+
+    def inference(self, request):
+        with self.locks[request["model_id"]]:
+            return super().inference(request)
+
+    def inference_stream(self, request):
+        with self.locks[request["model_id"]]:
+            if request["model_id"] == "stream":
+                for word in request["data"]["payload"].split(" "):
+                    yield word + " "
+            else:
+                yield super().inference(request)["translation_text"]
+
+
+def test_stream_with_a_repeated_model_does_not_deadlock():
+    executor = ChainExecutor(LockingModelControl(), ["stream", "upper", "stream"], queue_size=1)
+    chunks = []
+    thread = threading.Thread(target=lambda: chunks.extend(executor.stream({"payload": "One. Two. Three. Four."})), daemon=True)
+    thread.start()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert "".join(chunks).split() == ["ONE.", "TWO.", "THREE.", "FOUR."]
+
+
+def test_abandoned_stream_releases_its_models():
+    model_control = LockingModelControl()
+    executor = ChainExecutor(model_control, ["stream", "upper"], queue_size=1)
+    stream = executor.stream({"payload": " ".join(f"Sentence {i}." for i in range(50))})
+    assert next(stream) == "SENTENCE 0. "
+    # like a client disconnecting mid-stream
+    stream.close()
+
+    results = []
+    thread = threading.Thread(target=lambda: results.extend(executor.run([{"payload": "again"}])), daemon=True)
+    thread.start()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert results == [{"translation_text": "AGAIN"}]
+
+
+def test_dag_fans_out_and_in():
+    dag = {"upper": ["branch_a", "branch_b"], "branch_a": ["merge"], "branch_b": ["merge"], "merge": []}
+    executor = DagExecutor(FakeModelControl(), dag)
+    assert executor.order == ["upper", "branch_a", "branch_b", "merge"]
+    results = executor.run([{"payload": "hi"}])
+    assert results == [{"merge": {"translation_text": "HI\nHI"}}]
+
+
+def test_dag_rejects_cycles():
+    with pytest.raises(ChainNotCompatibleError):
+        topological_order({"a": ["b"], "b": ["a"]})
@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+from backend.core.exceptions import ModelError
+from backend.utils import download_manager
+from backend.utils.download_manager import CANCELLED, COMPLETED, FAILED, DownloadManager, select_prefetch_files
+
+
+def test_downloads_run_concurrently():
+    started = threading.Barrier(2, timeout=5)
+
+    def download(model_id, auth_token):
+        # both downloads must be running at once to pass the barrier
+        started.wait()
+
+    manager = DownloadManager(download, max_concurrent_downloads=2)
+    jobs = [manager.submit("model-a"), manager.submit("model-b")]
+    for job in jobs:
+        assert job.done_event.wait(5)
+        assert job.status == COMPLETED
+
+
+def test_same_model_is_not_queued_twice():
+    release = threading.Event()
+    manager = DownloadManager(lambda model_id, auth_token: release.wait(5), max_concurrent_downloads=1)
+    first = manager.submit("model-a")
+    assert manager.submit("model-a") is first
+    release.set()
+    assert first.done_event.wait(5)
+
+
+def test_failed_and_cancelled_jobs():
+    release = threading.Event()
+
+    def download(model_id, auth_token):
+        release.wait(5)
+        raise ModelError("not available")
+
+    manager = DownloadManager(download, max_concurrent_downloads=1)
+    running = manager.submit("model-a", auth_token="secret")
+    queued = manager.submit("model-b")
+    manager.cancel(queued.job_id)
+    release.set()
+
+    assert running.done_event.wait(5)
+    assert running.status == FAILED
+    assert running.error == "not available"
+    assert running.auth_token is None
+    assert queued.status == CANCELLED
+    with pytest.raises(ModelError):
+        manager.cancel(running.job_id)
+
+
+def test_prefetch_selects_the_weights_from_pretrained_loads():
+    repo_files = [
+        "config.json", "tokenizer.json", "tokenizer.model", "README.md", ".gitattributes",
+        "model-00001-of-00002.safetensors", "model-00002-of-00002.safetensors", "model.safetensors.index.json",
+        "pytorch_model-00001-of-00002.bin", "pytorch_model-00002-of-00002.bin", "pytorch_model.bin.index.json",
+        "tf_model.h5", "flax_model.msgpack", "model-q4_k_m.gguf", "onnx/model.onnx", "onnx/config.json",
+        "openvino/openvino_model.bin", "1_Pooling/config.json", "2_Dense/pytorch_model.bin",
+    ]
+    assert select_prefetch_files(repo_files) == [
+        "config.json", "tokenizer.json", "tokenizer.model",
+        "model-00001-of-00002.safetensors", "model-00002-of-00002.safetensors", "model.safetensors.index.json",
+        "1_Pooling/config.json", "2_Dense/pytorch_model.bin",
+    ]
+
+
+def test_finished_jobs_are_pruned(monkeypatch):
+    monkeypatch.setattr(download_manager, "DOWNLOAD_MAX_FINISHED_JOBS", 2)
+    manager = DownloadManager(lambda model_id, auth_token: None, max_concurrent_downloads=1)
+    jobs = []
+    for i in range(4):
+        jobs.append(manager.submit(f"model-{i}"))
+        assert jobs[-1].done_event.wait(5)
+    manager.submit("model-4")
+    # the newest finished jobs and the new job are kept
+    assert set(manager.jobs) >= {jobs[2].job_id, jobs[3].job_id}
+    assert jobs[0].job_id not in manager.jobs and jobs[1].job_id not in manager.jobs
+
+    jobs[3].finished_at -= download_manager.DOWNLOAD_JOB_TTL_SECONDS + 1
+    manager.submit("model-5")
+    assert jobs[3].job_id not in manager.jobs
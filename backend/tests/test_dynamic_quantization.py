@@ -0,0 +1,24 @@
+import torch
+
+from backend.utils.dynamic_quantization import (
+    get_quantized_cache_path,
+    load_quantized_state_dict,
+    quantize_model,
+    save_quantized_state_dict,
+)
+
+
+def _build_model():
+    return torch.nn.Sequential(torch.nn.Linear(16, 32), torch.nn.ReLU(), torch.nn.Linear(32, 4))
+
+def test_cached_state_dict_restores_quantized_model(tmp_path):
+    torch.manual_seed(0)
+    quantized = quantize_model(_build_model())
+    cache_path = get_quantized_cache_path(str(tmp_path))
+    save_quantized_state_dict(quantized, cache_path)
+
+    restored = load_quantized_state_dict(_build_model(), cache_path)
+
+    inputs = torch.randn(2, 16)
+    assert not isinstance(restored[0], torch.nn.Linear)
+    assert torch.allclose(quantized(inputs), restored(inputs))
@@ -0,0 +1,55 @@
+import asyncio
+import threading
+
+import pytest
+
+from backend.core.exceptions import ServerBusyError
+from backend.utils.executors import IO, WorkloadExecutor, WorkloadExecutors, wait_for_event
+
+
+def test_calls_beyond_workers_and_pending_are_rejected():
+    executor = WorkloadExecutor("test", max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        waiting = asyncio.ensure_future(executor.run(lambda: "done"))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ServerBusyError):
+            await executor.run(lambda: "rejected")
+        release.set()
+        assert await running is True
+        assert await waiting == "done"
+        # the slots are free again once the calls finished
+        assert await executor.run(lambda: "accepted") == "accepted"
+
+    asyncio.run(scenario())
+    executor.shutdown()
+
+
+def test_exceptions_are_raised_to_the_caller():
+    executors = WorkloadExecutors({IO: (1, 0)})
+
+    def fail():
+        raise KeyError("missing")
+
+    with pytest.raises(KeyError):
+        asyncio.run(executors.run(IO, fail))
+    assert asyncio.run(executors.run(IO, sum, [1, 2])) == 3
+    executors.shutdown()
+
+
+def test_waiting_for_a_job_holds_no_executor_thread():
+    executor = WorkloadExecutor("test", max_workers=1, max_pending=0)
+    done = threading.Event()
+
+    async def scenario():
+        waiting = asyncio.ensure_future(wait_for_event(done, poll_interval=0.01))
+        await asyncio.sleep(0.05)
+        # the only worker is still free while the job is awaited
+        assert await executor.run(lambda: "free") == "free"
+        done.set()
+        await asyncio.wait_for(waiting, 1)
+
+    asyncio.run(scenario())
+    executor.shutdown()
@@ -0,0 +1,58 @@
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("docx")
+pytest.importorskip("PyPDF2")
+
+from backend.utils.file_type_manager import FileTypeManager, PDFHandler
+
+
+def test_multi_file_segments_keep_file_order(tmp_path):
+    for name, text in [("b.md", "second"), ("a.txt", "first"), ("c.txt", "third"), ("notes.bin", "skipped")]:
+        (tmp_path / name).write_text(text, encoding="utf-8")
+    manager = FileTypeManager()
+
+    files = manager.list_supported_files(tmp_path)
+    segments = list(manager.iter_segments(files))
+
+    assert [path.name for path in files] == ["a.txt", "b.md", "c.txt"]
+    assert [(segment["source"], segment["text"], segment["page"]) for segment in segments] == [
+        ("a.txt", "first", None), ("b.md", "second", None), ("c.txt", "third", None)
+    ]
+
+
+def test_large_pdfs_are_split_into_page_ranges(monkeypatch):
+    monkeypatch.setattr(PDFHandler, "count_pages", lambda self, file_path: 20)
+    tasks = list(FileTypeManager()._plan_tasks([Path("report.pdf"), Path("notes.txt")]))
+
+    assert tasks == [
+        (Path("report.pdf"), 0, 8), (Path("report.pdf"), 8, 16), (Path("report.pdf"), 16, 24), (Path("notes.txt"),)
+    ]
+
+
+def test_preview_reads_only_the_head_and_is_cached_until_the_file_changes(tmp_path, monkeypatch):
+    from backend.utils import dataset_management
+    from backend.utils.dataset_management import DatasetFileManagement
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(dataset_management, "DATASETS_DIR", str(tmp_path / "Datasets"))
+    dataset_file = tmp_path / "Datasets" / "notes" / "notes.txt"
+    dataset_file.parent.mkdir(parents=True)
+    dataset_file.write_text("x" * 5000, encoding="utf-8")
+
+    reads = []
+    original_preview_file = FileTypeManager.preview_file
+    monkeypatch.setattr(FileTypeManager, "preview_file",
+                        lambda self, *args: reads.append(args) or original_preview_file(self, *args))
+    manager = DatasetFileManagement()
+
+    preview = manager.preview_dataset("notes")
+    assert preview == {"file_type": ".txt", "content": ["x" * 1000]}
+    assert manager.preview_dataset("notes") == preview
+    assert len(reads) == 1
+
+    dataset_file.write_text("changed", encoding="utf-8")
+    assert manager.preview_dataset("notes")["content"] == ["changed"]
+    assert len(reads) == 2
@@ -0,0 +1,28 @@
+import os
+import time
+
+import pytest
+
+pytest.importorskip("psutil")
+
+from backend.utils.hardware_telemetry import HardwareTelemetry
+
+
+def test_samples_are_kept_in_a_bounded_history():
+    telemetry = HardwareTelemetry(interval=0.01, history_size=5)
+    telemetry.track("model-a", os.getpid())
+    try:
+        # the first sample is taken when the process is tracked
+        first = telemetry.latest("model-a")
+        assert first["memory_used_mb"] > 0
+        assert first["num_threads"] >= 1
+        time.sleep(0.2)
+        history = telemetry.history("model-a")
+        assert len(history) == 5
+        assert telemetry.history("model-a", since=history[-2]["timestamp"]) == history[-1:]
+    finally:
+        telemetry.stop()
+
+    telemetry.untrack("model-a")
+    assert telemetry.latest("model-a") is None
+    assert telemetry.history("model-a") is None
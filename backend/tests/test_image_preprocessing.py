@@ -0,0 +1,35 @@
+import pytest
+from PIL import Image
+
+from backend.utils.image_preprocessing import image_cache, load_image, preprocess_image, rescale_predictions
+
+
+@pytest.fixture(scope="function")
+def image_path(tmp_path):
+    path = tmp_path / "image.png"
+    Image.new("RGB", (1600, 800), (255, 0, 0)).save(path)
+    image_cache.clear()
+    yield str(path)
+
+def test_load_image_is_cached(image_path):
+    assert load_image(image_path) is load_image(image_path)
+
+def test_preprocess_image_downsizes_to_max_edge(image_path):
+    image = preprocess_image(image_path, max_edge=640)
+    assert image.original.size == (1600, 800)
+    assert image.resized.size == (640, 320)
+    assert image.scale == 2.5
+
+def test_preprocess_image_never_upsizes(image_path):
+    image = preprocess_image(image_path, max_edge=4000)
+    assert image.resized is image.original
+
+def test_rescale_predictions_maps_back_to_original(image_path):
+    image = preprocess_image(image_path, max_edge=640)
+    predictions = [
+        {"class": "cat", "confidence": 0.9, "coordinates": [10, 20, 30, 40]},
+        {"label": "dog", "score": 0.8, "box": {"xmin": 1, "ymin": 2, "xmax": 3, "ymax": 4}},
+    ]
+    predictions = rescale_predictions(predictions, image)
+    assert predictions[0]["coordinates"] == [25.0, 50.0, 75.0, 100.0]
+    assert predictions[1]["box"] == {"xmin": 2, "ymin": 5, "xmax": 8, "ymax": 10}
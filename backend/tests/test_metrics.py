@@ -0,0 +1,27 @@
+from backend.utils.metrics import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "Stage time", ["stage"], buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="forward")
+    histogram.observe(0.5, stage="forward")
+    histogram.observe(5, stage="forward")
+
+    lines = registry.render().splitlines()
+    assert "# TYPE stage_seconds histogram" in lines
+    assert 'stage_seconds_bucket{stage="forward",le="0.1"} 1' in lines
+    assert 'stage_seconds_bucket{stage="forward",le="1.0"} 2' in lines
+    assert 'stage_seconds_bucket{stage="forward",le="+Inf"} 3' in lines
+    assert 'stage_seconds_count{stage="forward"} 3' in lines
+
+
+def test_snapshots_of_other_processes_are_merged():
+    server, worker = MetricsRegistry(), MetricsRegistry()
+    for registry in (server, worker):
+        registry.counter("cache_requests_total", "Cache lookups", ["result"]).inc(result="hit")
+    worker_snapshot = worker.snapshot()
+    worker.reset()
+
+    assert worker.snapshot() == {}
+    assert 'cache_requests_total{result="hit"} 2' in server.render([worker_snapshot]).splitlines()
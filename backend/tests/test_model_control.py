@@ -43,3 +43,21 @@ def test_model_delete_model(model_control, model_id):
 
     # reinstall the model
     model_control.download_model(model_id)
+
+def test_download_process_reports_unexpected_errors():
+    import multiprocessing
+
+    from backend.controlers.model_control import ModelControl
+    from backend.core.exceptions import ModelError
+
+    class FailingModel:
+        @staticmethod
+        def download(model_id, model_info):
+            raise OSError("disk full")
+
+    parent_conn, child_conn = multiprocessing.Pipe()
+    ModelControl._download_process(child_conn, FailingModel, "org/model", {}, None)
+
+    response = parent_conn.recv()
+    assert isinstance(response["error"], ModelError)
+    assert "disk full" in str(response["error"])
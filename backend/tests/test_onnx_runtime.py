@@ -0,0 +1,105 @@
+import os
+import sys
+import types
+
+import pytest
+import transformers
+
+from backend.models import transformer_model
+from backend.models.transformer_model import TransformerModel
+
+
+class FakeAccelerator:
+    def __init__(self, cpu=False):
+        pass
+
+    def prepare(self, obj):
+        return obj
+
+
+class FakeModelClass:
+    loads = []
+
+    @classmethod
+    def from_pretrained(cls, *args, **kwargs):
+        cls.loads.append(args)
+        return cls()
+
+
+class FakeORTModel:
+    """Stands in for an optimum ORTModel class, saving a model writes its config like optimum does."""
+    loads = []
+
+    @classmethod
+    def from_pretrained(cls, path, export=False, **kwargs):
+        cls.loads.append((path, export))
+        return cls()
+
+    def save_pretrained(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "config.json"), "w") as f:
+            f.write("{}")
+
+
+@pytest.fixture
+def fake_transformers(monkeypatch):
+    FakeModelClass.loads = []
+    FakeORTModel.loads = []
+    monkeypatch.setattr(transformer_model, "Accelerator", FakeAccelerator)
+    monkeypatch.setattr(transformers, "FakeModelClass", FakeModelClass, raising=False)
+    monkeypatch.setattr(transformer_model.transformers, "pipeline",
+                        lambda task, **kwargs: types.SimpleNamespace(task=task, image_processor=None))
+    optimum = types.ModuleType("optimum")
+    optimum.onnxruntime = types.ModuleType("optimum.onnxruntime")
+    for ort_class in set(transformer_model.ONNX_RUNTIME_CLASSES.values()):
+        setattr(optimum.onnxruntime, ort_class, FakeORTModel)
+    monkeypatch.setitem(sys.modules, "optimum", optimum)
+    monkeypatch.setitem(sys.modules, "optimum.onnxruntime", optimum.onnxruntime)
+
+
+def _model_info(model_dir, pipeline_tag, runtime, **extra):
+    return {
+        "dir": str(model_dir),
+        "pipeline_tag": pipeline_tag,
+        "config": {"runtime": runtime},
+        "requirements": {"required_classes": {"model": "FakeModelClass"}},
+        **extra,
+    }
+
+
+def test_unsupported_runtime_is_rejected(fake_transformers, tmp_path):
+    model = TransformerModel("org/model")
+    with pytest.raises(ValueError, match="Unsupported runtime: tensorrt"):
+        model.load("cpu", _model_info(tmp_path, "text-classification", "tensorrt"))
+
+
+def test_pipelines_onnxruntime_cannot_serve_fall_back_to_torch(fake_transformers, tmp_path):
+    model = TransformerModel("org/model")
+    model.load("cpu", _model_info(tmp_path, "text-generation", "onnxruntime"))
+
+    assert model.runtime == "torch"
+    assert FakeModelClass.loads and not FakeORTModel.loads
+
+
+def test_adapter_models_fall_back_to_torch(fake_transformers, monkeypatch, tmp_path):
+    monkeypatch.setattr(transformer_model, "is_adapter_dir", lambda directory: True)
+    monkeypatch.setattr(transformer_model, "attach_adapter", lambda model, directory: model)
+    model = TransformerModel("org/model-adapter")
+    base_model_info = {"model_id": "org/model", "dir": str(tmp_path / "base")}
+    model.load("cpu", _model_info(tmp_path, "text-classification", "onnxruntime", adapter_of=base_model_info))
+
+    assert model.runtime == "torch"
+    assert FakeModelClass.loads == [("org/model",)]
+    assert not FakeORTModel.loads
+
+
+def test_onnx_export_is_cached_in_the_model_directory(fake_transformers, tmp_path):
+    model = TransformerModel("org/model")
+    model.load("cpu", _model_info(tmp_path, "text-classification", "onnxruntime"))
+    assert model.runtime == "onnxruntime"
+    assert FakeORTModel.loads == [("org/model", True)]
+
+    # later loads reuse the exported graph instead of exporting again
+    TransformerModel("org/model").load("cpu", _model_info(tmp_path, "text-classification", "onnxruntime"))
+    assert FakeORTModel.loads == [("org/model", True), (str(tmp_path / "onnx"), False)]
+    assert not FakeModelClass.loads
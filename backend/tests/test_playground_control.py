@@ -0,0 +1,83 @@
+import threading
+
+import pytest
+
+from backend.controlers import playground_control
+from backend.controlers.playground_control import PlaygroundControl
+from backend.core.exceptions import ModelError
+from backend.playground.playground import Playground
+
+
+class FakeModelControl:
+    """Loads models concurrently, models named "fail" raise an error."""
+
+    def __init__(self, model_count):
+        # every load waits for the others, so the test only passes if they all run at the same time
+        self.barrier = threading.Barrier(model_count, timeout=5)
+        self.loads = []
+        self.unloads = []
+        self.loaded = set()
+
+    def is_model_loaded(self, model_id):
+        return model_id in self.loaded
+
+    def load_model(self, model_id):
+        self.loads.append(model_id)
+        self.barrier.wait()
+        if model_id == "fail":
+            raise ModelError("model failed to load")
+        self.loaded.add(model_id)
+        return True
+
+    def unload_model(self, model_id):
+        self.unloads.append(model_id)
+        self.loaded.discard(model_id)
+        return True
+
+
+@pytest.fixture
+def runtime_data(monkeypatch):
+    data = {}
+    monkeypatch.setattr(playground_control.RuntimeControl, "get_runtime_data", staticmethod(lambda info_type: data))
+    monkeypatch.setattr(playground_control.RuntimeControl, "update_runtime_data", staticmethod(lambda info_type, new: True))
+    return data
+
+
+def _control(model_control, chain):
+    # skips reading the playground files from disk
+    control = PlaygroundControl.__new__(PlaygroundControl)
+    control.model_control = model_control
+    control.playgrounds = {"playground": Playground("playground", chain=chain)}
+    control.batch_jobs = {}
+    return control
+
+
+def test_chain_models_load_in_parallel_and_once(runtime_data):
+    model_control = FakeModelControl(2)
+    control = _control(model_control, ["a", "b", "a"])
+
+    assert control.load_playground_chain("playground") == {"playground_id": "playground", "chain": ["a", "b", "a"]}
+    assert sorted(model_control.loads) == ["a", "b"]
+    assert control.playgrounds["playground"].active_chain
+
+
+def test_progress_is_reported_per_model(runtime_data):
+    control = _control(FakeModelControl(3), ["a", "b", "c"])
+    events = []
+    control.load_playground_chain("playground", on_progress=events.append)
+
+    assert sorted(event["model_id"] for event in events) == ["a", "b", "c"]
+    assert [event["completed"] for event in events] == [1, 2, 3]
+    assert all(event["status"] == "loaded" and event["total"] == 3 for event in events)
+
+
+def test_failed_chain_unloads_only_the_models_it_loaded(runtime_data):
+    model_control = FakeModelControl(3)
+    model_control.loaded.add("already")
+    control = _control(model_control, ["already", "a", "fail"])
+
+    with pytest.raises(ModelError, match="fail: model failed to load"):
+        control.load_playground_chain("playground")
+    assert model_control.unloads == ["a"]
+    assert model_control.loaded == {"already"}
+    assert not control.playgrounds["playground"].active_chain
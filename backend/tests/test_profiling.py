@@ -0,0 +1,42 @@
+import threading
+import time
+
+import pytest
+
+from backend.core.exceptions import ModelError
+from backend.utils.profiling import StackSampler, WorkerProfiler
+
+
+def _busy_loop(seconds):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        sum(range(1000))
+
+
+def test_sampler_collects_collapsed_stacks_of_the_target_thread():
+    sampler = StackSampler(threading.get_ident(), interval=0.001)
+    sampler.start()
+    _busy_loop(0.3)
+    sampler.stop()
+
+    assert sum(sampler.stacks.values()) > 0
+    assert any("_busy_loop" in line for line in sampler.collapsed().splitlines())
+    assert any("_busy_loop" in entry["function"] for entry in sampler.top_functions())
+
+
+def test_worker_profiler_reports_idle_time_and_rejects_a_second_profile(tmp_path):
+    profiler = WorkerProfiler("org/model", profiles_dir=str(tmp_path))
+    profiler.start(duration=1)
+    with pytest.raises(ModelError):
+        profiler.start(duration=1)
+    with profiler.waiting():
+        time.sleep(0.1)
+    _busy_loop(0.1)
+    profile = profiler.stop()
+
+    assert profile["idle_samples"] > 0
+    assert profile["samples"] > 0
+    with open(profile["collapsed_stacks_path"], encoding="utf-8") as f:
+        assert f.read() == profile["collapsed_stacks"]
+    with pytest.raises(ModelError):
+        profiler.stop()
@@ -0,0 +1,31 @@
+from backend.utils.reranker import CrossEncoderReranker
+
+
+class FakeCrossEncoder:
+    # scores an entry by the number of query words it contains
+    def predict(self, pairs, batch_size, show_progress_bar):
+        return [sum(word in entry.split() for word in query.split()) for query, entry in pairs]
+
+
+def _reranker():
+    reranker = CrossEncoderReranker("fake")
+    reranker._model = FakeCrossEncoder()
+    return reranker
+
+
+def test_entries_are_ordered_by_cross_encoder_score():
+    entries = ["nothing here", "red apple pie", "apple"]
+    assert _reranker().rerank("red apple pie", entries, top_k=2) == ["red apple pie", "apple"]
+
+
+def test_token_budget_skips_entries_that_do_not_fit():
+    entries = ["apple " * 50, "apple pie", "pie"]
+    kept = _reranker().rerank("apple pie", entries, top_k=3, token_budget=10,
+                              count_tokens=lambda text: len(text.split()))
+    assert kept == ["apple pie", "pie"]
+
+
+def test_provenance_entries_are_scored_by_their_text():
+    entries = [{"text": "pie", "provenance": None}, {"text": "apple pie", "provenance": {"source": "a.txt"}}]
+    kept = _reranker().rerank("apple pie", entries, top_k=1)
+    assert kept == [entries[1]]
@@ -0,0 +1,43 @@
+import os
+import time
+
+import pytest
+
+from backend.utils.results_store import ResultsStore
+
+
+@pytest.fixture(scope="function")
+def results_store(tmp_path):
+    yield ResultsStore(results_dir=str(tmp_path), max_bytes=1024, max_age_seconds=60)
+
+def test_identical_content_is_stored_once(results_store):
+    first = results_store.save(b"result", "png")
+    second = results_store.save(b"result", "png")
+    assert first == second
+    assert len(os.listdir(results_store.results_dir)) == 1
+
+def test_inline_delivery_does_not_write(results_store):
+    result = results_store.deliver(b"result", "wav", "inline")
+    assert "content" in result and "url" not in result
+    assert os.listdir(results_store.results_dir) == []
+
+def test_url_delivery_resolves_path(results_store):
+    result = results_store.deliver(b"result", "wav", "url")
+    filename = result["url"].rsplit("/", 1)[-1]
+    assert results_store.get_path(filename) == result["path"]
+
+def test_get_path_rejects_traversal(results_store):
+    with pytest.raises(ValueError):
+        results_store.get_path("../library.json")
+
+def test_garbage_collection_enforces_age_and_size(results_store):
+    old = results_store.save(b"old", "png")
+    old_path = os.path.join(results_store.results_dir, old)
+    stale = time.time() - 120
+    os.utime(old_path, (stale, stale))
+    results_store.save(b"a" * 600, "png")
+    results_store.save(b"b" * 600, "png")
+
+    result = results_store.collect_garbage()
+    assert result["removed"] == 2
+    assert len(os.listdir(results_store.results_dir)) == 1
@@ -0,0 +1,34 @@
+import numpy as np
+
+from backend.utils.semantic_cache import SemanticResponseCache
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_close_queries_of_the_same_scope_hit():
+    cache = SemanticResponseCache()
+    cache.store("scope", "what are your opening hours", _unit([1.0, 0.0, 0.0]), "9 to 5")
+
+    assert cache.lookup("scope", _unit([1.0, 0.05, 0.0]), max_distance=0.01) == "9 to 5"
+    assert cache.lookup("scope", _unit([1.0, 1.0, 0.0]), max_distance=0.01) is None
+    # a new dataset version or model config is another scope
+    assert cache.lookup("other scope", _unit([1.0, 0.0, 0.0]), max_distance=0.01) is None
+
+
+def test_least_recently_used_entries_and_scopes_are_evicted():
+    cache = SemanticResponseCache(max_entries=2, max_scopes=2)
+    cache.store("a", "q1", _unit([1.0, 0.0]), "first")
+    cache.store("a", "q2", _unit([0.0, 1.0]), "second")
+    assert cache.lookup("a", _unit([1.0, 0.0])) == "first"
+    cache.store("a", "q3", _unit([-1.0, 0.0]), "third")
+
+    assert cache.lookup("a", _unit([0.0, 1.0])) is None
+    assert cache.lookup("a", _unit([1.0, 0.0])) == "first"
+
+    cache.store("b", "q", _unit([1.0, 0.0]), "b")
+    cache.store("c", "q", _unit([1.0, 0.0]), "c")
+    assert cache.lookup("a", _unit([1.0, 0.0])) is None
+    assert cache.lookup("c", _unit([1.0, 0.0])) == "c"
@@ -0,0 +1,100 @@
+import pytest
+
+from backend.core.exceptions import ModelError
+from backend.utils.training_jobs import CANCELLED, COMPLETED, QUEUED, RUNNING, TrainingJobManager, training_model_info
+from backend.utils.training_telemetry import read_metrics_log
+
+
+class FakeModel:
+    def __init__(self, model_id):
+        self.model_id = model_id
+
+    def load(self, device, model_info):
+        pass
+
+    def train(self, data, reporter=None):
+        for step in range(1, data["steps"] + 1):
+            reporter({"event": "epoch", "epoch": step, "loss": 1 / step})
+        return {"message": "Training completed successfully", "data": {"new_model_info": {"model_id": f"{self.model_id}_1"}}}
+
+
+def test_completed_job_reports_metrics_and_registers(tmp_path):
+    pytest.importorskip("torch")
+    registered = []
+    manager = TrainingJobManager(lambda model_id, result: registered.append((model_id, result)), runs_dir=str(tmp_path))
+
+    job = manager.submit("model-a", FakeModel, {}, {"steps": 3}, "cpu")
+    assert job.done_event.wait(30)
+
+    assert job.status == COMPLETED
+    assert [event["seq"] for event in job.metrics] == [1, 2, 3]
+    assert job.metrics[-1]["loss"] == pytest.approx(1 / 3)
+    assert registered == [("model-a", job.result)]
+    # the run's metrics are persisted with the hardware utilisation of the training process
+    logged = read_metrics_log(job.metrics_log_path)
+    assert [event["epoch"] for event in logged] == [1, 2, 3]
+    assert "cpu_percent" in logged[0]
+
+
+def test_jobs_wait_for_the_budget_and_can_be_cancelled(monkeypatch, tmp_path):
+    manager = TrainingJobManager(max_concurrent_jobs=1, runs_dir=str(tmp_path))
+    started = []
+    # only the scheduling is checked, no training process is spawned
+    monkeypatch.setattr(manager, "_start", lambda job: (setattr(job, "status", RUNNING), started.append(job)))
+
+    running = manager.submit("model-a", FakeModel, {}, {"steps": 1}, "cpu")
+    queued = manager.submit("model-b", FakeModel, {}, {"steps": 1}, "cpu")
+    assert started == [running]
+    assert queued.status == QUEUED
+
+    manager.cancel(queued.job_id)
+    assert queued.status == CANCELLED
+    assert queued.done_event.is_set()
+    with pytest.raises(ModelError):
+        manager.cancel(queued.job_id)
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(text)
+
+    async def close(self):
+        pass
+
+
+def test_console_stream_ends_with_the_message_the_terminal_waits_for(tmp_path):
+    pytest.importorskip("fastapi")
+    import asyncio
+
+    from backend.utils.console_train_stream import TASK_COMPLETED_MESSAGE, stream_training_job
+    from backend.utils.training_jobs import TrainingJob
+
+    job = TrainingJob("model-a", FakeModel, {}, {}, "cpu", runs_dir=str(tmp_path))
+    job.metrics = [{"type": "metrics", "event": "epoch", "time": 0, "seq": 1, "epoch": 1, "loss": 0.5}]
+    job.status = COMPLETED
+    websocket = FakeWebSocket()
+    asyncio.run(stream_training_job(websocket, job, as_text=True))
+
+    assert websocket.sent == ["[epoch] epoch: 1, loss: 0.5", f"Training job {job.job_id} completed", TASK_COMPLETED_MESSAGE]
+
+    job.status, job.error = "failed", "out of memory"
+    websocket = FakeWebSocket()
+    asyncio.run(stream_training_job(websocket, job, as_text=True))
+    assert websocket.sent[-1] == "Error: Training failed: out of memory"
+
+
+def test_models_are_trained_without_their_serving_runtime_and_quantization():
+    model_info = {"dir": "model", "config": {
+        "runtime": "onnxruntime",
+        "quantization_config": {"current_mode": "dynamic-int8"},
+        "model_config": {"trust_remote_code": True},
+    }}
+    training_info = training_model_info(model_info)
+
+    assert training_info["config"] == {"runtime": "torch", "model_config": {"trust_remote_code": True}}
+    # the served entry is left untouched
+    assert model_info["config"]["runtime"] == "onnxruntime"
+    assert model_info["config"]["quantization_config"] == {"current_mode": "dynamic-int8"}
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+pytest.importorskip("ultralytics")
+
+from backend.models import ultralytics_model
+from backend.models.ultralytics_model import UltralyticsModel
+
+
+class FakeYOLO:
+    exports = []
+
+    def __init__(self, path, task=None):
+        self.path = path
+
+    def export(self, format, **kwargs):
+        # like ultralytics, the artefact is named after the weights file only
+        FakeYOLO.exports.append((format, kwargs))
+        base_path = os.path.splitext(self.path)[0]
+        if format == "onnx":
+            exported = f"{base_path}.onnx"
+            open(exported, "w").close()
+        else:
+            exported = f"{base_path}_openvino_model"
+            os.makedirs(exported)
+        return exported
+
+
+@pytest.fixture
+def weights(tmp_path, monkeypatch):
+    FakeYOLO.exports = []
+    monkeypatch.setattr(ultralytics_model, "YOLO", FakeYOLO)
+    path = tmp_path / "yolov8n.pt"
+    path.touch()
+    return str(path)
+
+
+def test_exports_are_named_after_their_arguments(weights):
+    base_path = os.path.splitext(weights)[0]
+    assert UltralyticsModel.export(weights, "onnx") == f"{base_path}.onnx"
+    assert UltralyticsModel.export(weights, "onnx", {"imgsz": 320, "half": True}) == f"{base_path}_half-True_imgsz-320.onnx"
+    openvino_path = UltralyticsModel.export(weights, "openvino", {"int8": True, "imgsz": [640, 480]})
+    assert openvino_path == f"{base_path}_imgsz-640480_int8-True_openvino_model"
+    assert os.path.isdir(openvino_path)
+
+
+def test_cached_export_is_reused_only_for_the_same_arguments(weights):
+    first = UltralyticsModel.export(weights, "onnx", {"imgsz": 640})
+    assert UltralyticsModel.export(weights, "onnx", {"imgsz": 640}) == first
+    assert len(FakeYOLO.exports) == 1
+
+    assert UltralyticsModel.export(weights, "onnx", {"imgsz": 320}) != first
+    assert FakeYOLO.exports[-1] == ("onnx", {"imgsz": 320})
+    assert os.path.exists(first)
@@ -0,0 +1,72 @@
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+ADAPTER_CONFIG_FILE = "adapter_config.json"
+
+# LoRA settings used unless the training request overrides them
+DEFAULT_LORA_CONFIG = {
+    "r": 8,
+    "lora_alpha": 16,
+    "lora_dropout": 0.1,
+}
+
+
+def is_adapter_dir(model_dir: str) -> bool:
+    return os.path.exists(os.path.join(model_dir, ADAPTER_CONFIG_FILE))
+
+
+def add_lora_adapter(model, lora_config: dict = None, task_type: str = "SEQ_CLS"):
+    """
+    Wraps a model with trainable LoRA adapters and freezes its base weights.
+
+    Args:
+        model (transformers.PreTrainedModel): The model to fine-tune.
+        lora_config (dict, optional): peft.LoraConfig arguments overriding DEFAULT_LORA_CONFIG.
+        task_type (str): The peft task type, it decides which heads stay trainable and are saved with the adapter.
+
+    Returns:
+        peft.PeftModel: The model with LoRA adapters.
+    """
+    from peft import LoraConfig, get_peft_model
+
+    config = {**DEFAULT_LORA_CONFIG, **(lora_config or {}), "task_type": task_type}
+    model = get_peft_model(model, LoraConfig(**config))
+    trainable, total = model.get_nb_trainable_parameters()
+    logger.info(f"LoRA adapters added, training {trainable} of {total} parameters")
+    return model
+
+
+def save_adapter(model, adapter_dir: str):
+    """
+    Saves only the adapter weights of a PEFT model, the base weights stay shared with the base model.
+
+    Args:
+        model (peft.PeftModel): The model with trained adapters.
+        adapter_dir (str): The directory the adapter is written to.
+    """
+    model.save_pretrained(adapter_dir)
+    logger.info(f"Adapter saved to {adapter_dir}")
+
+
+def attach_adapter(base_model, adapter_dir: str, merge: bool = True):
+    """
+    Attaches a saved adapter to a base model.
+
+    Args:
+        base_model (transformers.PreTrainedModel): The base model loaded from the shared base files.
+        adapter_dir (str): The directory written by save_adapter.
+        merge (bool): Whether to fold the adapter into the base weights. Merged models run at the speed
+            of the base model and are accepted by every pipeline.
+
+    Returns:
+        The model with the adapter applied.
+    """
+    from peft import PeftModel
+
+    model = PeftModel.from_pretrained(base_model, adapter_dir, is_trainable=False)
+    if merge:
+        model = model.merge_and_unload()
+    logger.info(f"Adapter from {adapter_dir} attached to the base model")
+    return model
@@ -0,0 +1,223 @@
+import hashlib
+import logging
+import os
+import shutil
+import stat
+import threading
+
+from backend.core.config import BLOBS_DIR
+
+logger = logging.getLogger(__name__)
+
+# files holding model weights, the only files large enough to be worth deduplicating
+WEIGHT_EXTENSIONS = (".safetensors", ".bin", ".pt", ".pth", ".onnx")
+
+_HASH_CHUNK_SIZE = 8 * 1024 * 1024
+
+# blobs are read-only, so an in-place write to one linked copy fails instead of changing every model sharing it
+_READ_ONLY = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+
+
+def _is_weight_file(path: str):
+    # the Hugging Face cache keeps the downloaded files under blobs/, named by their hash without an extension,
+    # its snapshots/ only hold symlinks to them
+    if os.path.islink(path):
+        return False
+    if os.path.basename(os.path.dirname(path)) == "blobs":
+        return not path.endswith((".incomplete", ".lock"))
+    return path.endswith(WEIGHT_EXTENSIONS)
+
+
+def make_writable(path: str):
+    """
+    Makes a file writable again, e.g. before deleting it on Windows, where read-only files cannot be removed.
+
+    Args:
+        path (str): The file.
+    """
+    os.chmod(path, os.stat(path).st_mode | stat.S_IWUSR)
+
+
+def remove_tree(directory: str):
+    """
+    Removes a directory like shutil.rmtree, including the read-only links to blobs it holds.
+
+    Args:
+        directory (str): The directory to remove.
+    """
+    def _retry_writable(function, path, _):
+        make_writable(path)
+        function(path)
+
+    shutil.rmtree(directory, onerror=_retry_writable)
+
+
+class BlobStore:
+    """
+    The BlobStore class deduplicates model weight files across model directories.
+    Every weight file is hashed and hard-linked to a single content-addressed blob, so base models,
+    fine-tuned variants and re-downloads sharing a shard use one copy on disk and in the page cache.
+    Model directories keep their layout, loaders see ordinary files. Linked files must never be
+    rewritten in place, or every model sharing the blob would change: they are read-only, and code about
+    to write into a deduplicated directory detaches it first.
+    """
+
+    def __init__(self, blobs_dir: str = BLOBS_DIR):
+        """
+        Initializes the BlobStore instance.
+
+        Args:
+            blobs_dir (str): The directory holding the blobs, it must be on the same filesystem as the models.
+        """
+        self.blobs_dir = blobs_dir
+        self._lock = threading.Lock()
+
+    def dedupe_directory(self, directory: str):
+        """
+        Replaces every weight file of a directory by a hard link to its blob, adding new blobs to the store.
+        In a Hugging Face cache, every file under blobs/ is linked, whatever its name. Files already linked into the store are skipped without being hashed again.
+
+        Args:
+            directory (str): The model directory.
+
+        Returns:
+            dict: The number of weight files seen, the number linked to an existing blob and the bytes saved.
+        """
+        stats = {"files": 0, "deduplicated": 0, "saved_bytes": 0}
+        if not os.path.isdir(directory):
+            return stats
+
+        for root, _, files in os.walk(directory):
+            for name in files:
+                path = os.path.join(root, name)
+                if not _is_weight_file(path):
+                    continue
+                stats["files"] += 1
+                try:
+                    saved_bytes = self._link_file(path)
+                except OSError as e:
+                    # e.g. a filesystem without hard links or a model directory on another device
+                    logger.warning(f"Could not deduplicate {path}: {str(e)}")
+                    continue
+                if saved_bytes:
+                    stats["deduplicated"] += 1
+                    stats["saved_bytes"] += saved_bytes
+
+        if stats["deduplicated"]:
+            logger.info(f"Deduplicated {stats['deduplicated']} weight files in {directory}, {stats['saved_bytes']} bytes saved")
+        return stats
+
+    def detach_directory(self, directory: str):
+        """
+        Replaces every weight file of a directory that is linked to a blob by a private, writable copy, so the
+        directory can be written to in place without touching the other models (copy on write).
+
+        Args:
+            directory (str): The model directory.
+
+        Returns:
+            int: The number of files detached.
+        """
+        detached = 0
+        if not os.path.isdir(directory):
+            return detached
+
+        for root, _, files in os.walk(directory):
+            for name in files:
+                path = os.path.join(root, name)
+                if not _is_weight_file(path) or os.stat(path).st_nlink < 2:
+                    continue
+                temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.copy"
+                shutil.copyfile(path, temp_path)
+                os.chmod(temp_path, os.stat(temp_path).st_mode | stat.S_IWUSR)
+                if os.name == "nt":
+                    # Windows cannot replace a read-only file, the mode shared with the blob is restored afterwards
+                    make_writable(path)
+                    os.replace(temp_path, path)
+                    self._protect_blob(path)
+                else:
+                    os.replace(temp_path, path)
+                detached += 1
+
+        if detached:
+            logger.info(f"Detached {detached} weight files of {directory} from the blob store")
+        return detached
+
+    def _protect_blob(self, path: str):
+        # restores the read-only mode of the blob a detached file was linked to, if it is still in the store
+        try:
+            blob_path = self.get_blob_path(self._hash_file(path))
+            if os.path.exists(blob_path):
+                os.chmod(blob_path, _READ_ONLY)
+        except OSError as e:
+            logger.warning(f"Could not protect the blob of {path}: {str(e)}")
+
+    def collect_garbage(self):
+        """
+        Removes the blobs no model directory links to anymore.
+
+        Returns:
+            dict: The number of removed blobs and the bytes freed.
+        """
+        removed, freed_bytes = 0, 0
+        if not os.path.isdir(self.blobs_dir):
+            return {"removed": removed, "freed_bytes": freed_bytes}
+
+        with self._lock:
+            for root, _, files in os.walk(self.blobs_dir):
+                for name in files:
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    # the store's own link is the only one left
+                    if stat.st_nlink > 1:
+                        continue
+                    try:
+                        make_writable(path)
+                        os.remove(path)
+                    except OSError as e:
+                        logger.warning(f"Failed to remove blob {path}: {str(e)}")
+                        continue
+                    removed += 1
+                    freed_bytes += stat.st_size
+
+        if removed:
+            logger.info(f"Removed {removed} unreferenced blobs ({freed_bytes} bytes)")
+        return {"removed": removed, "freed_bytes": freed_bytes}
+
+    def get_blob_path(self, digest: str):
+        return os.path.join(self.blobs_dir, digest[:2], digest)
+
+    def _link_file(self, path: str):
+        # a file with several links was linked into the store by an earlier pass
+        if os.stat(path).st_nlink > 1:
+            return 0
+
+        digest = self._hash_file(path)
+        blob_path = self.get_blob_path(digest)
+        with self._lock:
+            if not os.path.exists(blob_path):
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                os.link(path, blob_path)
+                # the mode belongs to the inode, so the model's file becomes read-only as well
+                os.chmod(blob_path, _READ_ONLY)
+                return 0
+
+            if os.path.samefile(path, blob_path):
+                return 0
+            # swap the duplicate for a link to the blob, the temporary link keeps the swap atomic
+            size = os.path.getsize(path)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.link"
+            os.link(blob_path, temp_path)
+            os.replace(temp_path, path)
+            return size
+
+    @staticmethod
+    def _hash_file(path: str):
+        sha256 = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+                sha256.update(chunk)
+        return sha256.hexdigest()
+
+
+blob_store = BlobStore()
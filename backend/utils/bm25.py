@@ -0,0 +1,126 @@
+import logging
+import math
+import pickle
+import re
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from backend.core.config import RAG_RRF_K
+
+logger = logging.getLogger(__name__)
+
+# words, and identifiers such as "CX-4521" or "v1.2" kept whole so exact ID lookups match
+TOKEN_PATTERN = re.compile(r"\w+(?:[-_./]\w+)*")
+
+
+def tokenize(text: str):
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+class BM25Index:
+    """
+    The BM25Index class is an inverted index scoring entries with Okapi BM25. It complements the
+    embedding search with exact keyword matches, e.g. names and IDs a sentence embedding blurs.
+    """
+
+    def __init__(self, postings: dict, doc_lengths: np.ndarray, k1: float = 1.5, b: float = 0.75):
+        """
+        Initializes the BM25Index instance. Use build to index texts.
+
+        Args:
+            postings (dict): The entry indices and term frequencies of every term, as numpy arrays.
+            doc_lengths (np.ndarray): The number of tokens of every entry.
+            k1 (float): The term frequency saturation.
+            b (float): The strength of the length normalisation.
+        """
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        self.avg_doc_length = float(doc_lengths.mean()) if len(doc_lengths) else 0.0
+
+    @classmethod
+    def build(cls, texts, **kwargs):
+        """
+        Indexes texts.
+
+        Args:
+            texts (list): The entries of the dataset, in the order of the FAISS index.
+            **kwargs: The BM25 parameters k1 and b.
+
+        Returns:
+            BM25Index: The index.
+        """
+        doc_ids = defaultdict(list)
+        frequencies = defaultdict(list)
+        doc_lengths = np.zeros(len(texts), dtype=np.float32)
+        for doc_id, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths[doc_id] = len(tokens)
+            for term, count in Counter(tokens).items():
+                doc_ids[term].append(doc_id)
+                frequencies[term].append(count)
+        postings = {
+            term: (np.asarray(ids, dtype=np.int64), np.asarray(frequencies[term], dtype=np.float32))
+            for term, ids in doc_ids.items()
+        }
+        logger.info(f"Built BM25 index of {len(postings)} terms over {len(texts)} entries")
+        return cls(postings, doc_lengths, **kwargs)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump({"postings": self.postings, "doc_lengths": self.doc_lengths, "k1": self.k1, "b": self.b}, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        return cls(data["postings"], data["doc_lengths"], k1=data["k1"], b=data["b"])
+
+    def search(self, query: str, top_k: int):
+        """
+        Scores the entries containing any query term.
+
+        Args:
+            query (str): The query.
+            top_k (int): The number of entries to return.
+
+        Returns:
+            list: The (entry index, score) pairs of the best entries, best first.
+        """
+        doc_count = len(self.doc_lengths)
+        if not doc_count:
+            return []
+        scores = np.zeros(doc_count, dtype=np.float32)
+        length_norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / (self.avg_doc_length or 1.0))
+        for term in set(tokenize(query)):
+            if term not in self.postings:
+                continue
+            ids, tf = self.postings[term]
+            idf = math.log(1 + (doc_count - len(ids) + 0.5) / (len(ids) + 0.5))
+            scores[ids] += idf * tf * (self.k1 + 1) / (tf + length_norm[ids])
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > top_k:
+            matched = matched[np.argpartition(scores[matched], -top_k)[-top_k:]]
+        return sorted(((int(i), float(scores[i])) for i in matched), key=lambda pair: pair[1], reverse=True)
+
+
+def reciprocal_rank_fusion(rankings, k: int = RAG_RRF_K):
+    """
+    Fuses rankings by reciprocal rank: every entry scores the sum of 1 / (k + rank) over the rankings it
+    appears in. Ranks are comparable across retrievers whose scores are not, e.g. BM25 and cosine similarity.
+
+    Args:
+        rankings (list): The rankings to fuse, each a list of entry indices, best first.
+        k (int): Damps the weight of the top ranks.
+
+    Returns:
+        list: The (entry index, fused score) pairs, best first.
+    """
+    fused = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[int(doc_id)] += 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda pair: pair[1], reverse=True)
@@ -1,47 +1,91 @@
 import asyncio
-import subprocess
 import logging
-from fastapi import WebSocket
+from fastapi import WebSocket, WebSocketDisconnect
+
+from backend.utils.executors import IO, executors
+from backend.utils.training_jobs import COMPLETED
 
 logger = logging.getLogger(__name__)
 
-async def start_console_stream_server(websocket: WebSocket, model_id: str, action: str, epochs: int, batch_size: int, learning_rate: float, dataset_id: str, imgsz: int):
-    await websocket.accept()
+# the final message the terminal of the frontend waits for
+TASK_COMPLETED_MESSAGE = "Task Completed and Model Updated in Library"
 
-    try:
-        command = f"python backend/utils/train_vis.py --model_id {model_id} --action {action} --epochs {epochs} --batch_size {batch_size} --learning_rate {learning_rate} --dataset_id {dataset_id} --imgsz {imgsz}"
-        
-        process = subprocess.Popen(
-            command,
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,  # Combine stdout and stderr
-            text=True,
-            encoding='utf-8',  # Using UTF-8 encoding
-            errors='replace',  # Replace characters that can't be decoded
-            bufsize=1
-        )
+def _format_metrics(event: dict):
+    values = ", ".join(f"{key}: {value}" for key, value in event.items() if key not in ("type", "event", "time", "seq"))
+    return f"[{event.get('event', 'step')}] {values}"
 
+async def stream_training_job(websocket: WebSocket, job, as_text: bool = False):
+    """
+    Streams the telemetry of a training job over an accepted WebSocket: the metric events reported so far,
+    then new ones and every status change until the job finishes.
+
+    Args:
+        websocket (WebSocket): The accepted WebSocket.
+        job (TrainingJob): The training job to follow.
+        as_text (bool): Whether to send readable console lines ending with TASK_COMPLETED_MESSAGE, or an
+            "Error: ..." line if the job did not complete, rather than JSON events.
+    """
+    try:
+        last_seq, last_status = 0, None
         while True:
-            output = process.stdout.readline()
-            if output:
-                await websocket.send_text(output)
-            elif process.poll() is not None:  # If the process has finished
+            for event in [event for event in job.metrics if event["seq"] > last_seq]:
+                if as_text:
+                    await websocket.send_text(_format_metrics(event))
+                else:
+                    await websocket.send_json(event)
+                last_seq = event["seq"]
+            finished = job.is_finished()
+            if job.status != last_status or finished:
+                last_status = job.status
+                if as_text:
+                    await websocket.send_text(f"Training job {job.job_id} {job.status}")
+                else:
+                    await websocket.send_json({"type": "status", **job.to_dict()})
+            if finished:
                 break
+            await asyncio.sleep(0.5)
+        if as_text:
+            if job.status == COMPLETED:
+                await websocket.send_text(TASK_COMPLETED_MESSAGE)
+            else:
+                await websocket.send_text(f"Error: Training {job.status}" + (f": {job.error}" if job.error else ""))
+    except WebSocketDisconnect:
+        logger.info(f"Training telemetry WebSocket disconnected for job: {job.job_id}")
+        return
+    try:
+        await websocket.close()
+    except RuntimeError:
+        pass
 
-        await websocket.send_text("Task Completed and Model Updated in Library")
+async def start_console_stream_server(websocket: WebSocket, model_control, model_id: str, action: str, epochs: int, batch_size: int, learning_rate: float, dataset_id: str, imgsz: int):
+    await websocket.accept()
+
+    try:
+        if action != "fine_tune":
+            raise ValueError(f"Unsupported action: {action}")
 
+        train_request = {
+            "model_id": model_id,
+            "data": {
+                "epochs": epochs,
+                "batch_size": batch_size,
+                "learning_rate": learning_rate,
+                "dataset_id": dataset_id,
+                "imgsz": imgsz
+            }
+        }
+        submitted = await executors.run(IO, model_control.submit_training, train_request)
+        job = model_control.training_manager.get_job(submitted["job_id"])
     except Exception as e:
         await websocket.send_text(f"Error: {str(e)}")
-    finally:
         try:
             await websocket.close()
         except RuntimeError:
             pass
+        return
 
+    await stream_training_job(websocket, job, as_text=True)
 
-
-        
 async def start_load_model_server(websocket: WebSocket, model_id: str):
     await websocket.accept()
 
@@ -1,12 +1,23 @@
 import logging
 import shutil
+import threading
+from collections import OrderedDict
 from pathlib import Path
 import json
 from backend.core.config import DATASETS_DIR
 from backend.utils.file_type_manager import FileTypeManager
+from backend.utils.metrics import record_cache_lookup
 
 logger = logging.getLogger(__name__)
 
+# the number of dataset previews kept in memory, shared by all DatasetFileManagement instances
+PREVIEW_CACHE_SIZE = 128
+PREVIEW_MAX_ENTRIES = 10
+PREVIEW_MAX_CHARS = 1000
+
+_preview_cache = OrderedDict()
+_preview_cache_lock = threading.Lock()
+
 class DatasetFileManagement:
     def __init__(self):
         self.file_type_manager = FileTypeManager()
@@ -22,12 +33,21 @@ class DatasetFileManagement:
             if not source_path.exists():
                 raise FileNotFoundError(f"File not found: {file_path}")
 
-            dataset_name = source_path.stem
+            # a directory is uploaded as one multi-file dataset made of its supported files
+            dataset_name = source_path.name if source_path.is_dir() else source_path.stem
             dataset_folder = Path(DATASETS_DIR) / dataset_name
             dataset_folder.mkdir(parents=True, exist_ok=True)
 
-            destination_path = dataset_folder / source_path.name
-            shutil.copy2(source_path, destination_path)
+            if source_path.is_dir():
+                source_files = self.file_type_manager.list_supported_files(source_path)
+                if not source_files:
+                    raise ValueError(f"No supported files found in {file_path}")
+                for source_file in source_files:
+                    shutil.copy2(source_file, dataset_folder / source_file.name)
+                destination_path = dataset_folder
+            else:
+                destination_path = dataset_folder / source_path.name
+                shutil.copy2(source_path, destination_path)
 
             # Update metadata
             self.update_dataset_metadata(dataset_name, {"default": False, "chunked": False})
@@ -44,23 +64,36 @@ class DatasetFileManagement:
             if not dataset_path.exists():
                 raise FileNotFoundError(f"Dataset file not found: {dataset_path}")
 
-            for file in dataset_path.iterdir():
-                if file.is_file():
-                    preview_content = self.file_type_manager.read_file(file)
-                    file_type = file.suffix.lower()
-                    if file_type == '.csv' and preview_content:
-                        # Preserve CSV formatting without processing
-                        preview_content = preview_content[:10]
-                    return {
-                        "file_type": file_type,
-                        "content": preview_content[:10] if isinstance(preview_content, list) else [preview_content[:1000]]
-                    }
+            for file in self.file_type_manager.list_supported_files(dataset_path):
+                return self._preview_file(file)
 
             raise FileNotFoundError(f"No files found in dataset directory: {dataset_path}")
         except Exception as e:
             logger.error(f"Error previewing dataset: {str(e)}")
             raise
 
+    def _preview_file(self, file: Path):
+        # only the head of the file is read, and the preview is reused until the file changes
+        stat = file.stat()
+        key = (str(file), stat.st_mtime_ns, stat.st_size)
+        with _preview_cache_lock:
+            preview = _preview_cache.get(key)
+            if preview is not None:
+                _preview_cache.move_to_end(key)
+        record_cache_lookup("dataset_preview", preview is not None)
+        if preview is not None:
+            return preview
+
+        preview = {
+            "file_type": file.suffix.lower(),
+            "content": self.file_type_manager.preview_file(file, PREVIEW_MAX_ENTRIES, PREVIEW_MAX_CHARS)
+        }
+        with _preview_cache_lock:
+            _preview_cache[key] = preview
+            while len(_preview_cache) > PREVIEW_CACHE_SIZE:
+                _preview_cache.popitem(last=False)
+        return preview
+
     def get_dataset_processing_status(self, dataset_name: str):
         try:
             dataset_path = Path(DATASETS_DIR) / dataset_name
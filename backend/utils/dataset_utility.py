@@ -15,14 +15,22 @@ from backend.utils.watson_settings_manager import watson_settings
 import shutil
 from backend.utils.file_type_manager import FileTypeManager
 from backend.data_utils.json_handler import JSONHandler
-from backend.core.config import CONFIG_PATH
+from backend.core.config import (
+    CONFIG_PATH, QUERY_EMBEDDING_CACHE_SIZE, RAG_CONTEXT_TOKEN_BUDGET, RAG_HYBRID_CANDIDATES, RAG_HYBRID_TOP_K,
+    RAG_RERANK_CANDIDATES, RAG_RERANK_TOP_K, RAG_RERANKER_MODEL,
+)
 from backend.utils.dataset_management import DatasetFileManagement
 import datetime
+import threading
+from collections import OrderedDict
 from jinja2 import Template
 import base64
 import matplotlib.pyplot as plt
 import io
 from backend.core.exceptions import ModelError
+from backend.utils.metrics import observe_stage, record_cache_lookup
+from backend.utils.bm25 import BM25Index, reciprocal_rank_fusion
+from backend.utils.reranker import get_reranker
 
 load_dotenv()
 
@@ -30,6 +38,10 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# normalised query embeddings keyed by (embedding model type, embedding model name, query)
+_query_embedding_cache = OrderedDict()
+_query_embedding_cache_lock = threading.Lock()
+
 class DatasetManagement:
     SENTENCE_TRANSFORMER_MODELS = [
         'all-MiniLM-L6-v2',
@@ -241,10 +253,11 @@ class DatasetManagement:
         # logger.info(f"Generated embeddings with shape: {embeddings.shape}")
         # return embeddings
         try:
-            if isinstance(self.embeddings, WatsonxEmbeddings):
-                embeddings = self.embeddings.embed_documents(texts)
-            else:  # SentenceTransformer
-                embeddings = self.embeddings.encode(texts, show_progress_bar=True)
+            with observe_stage(self.model_name, "embed"):
+                if isinstance(self.embeddings, WatsonxEmbeddings):
+                    embeddings = self.embeddings.embed_documents(texts)
+                else:  # SentenceTransformer
+                    embeddings = self.embeddings.encode(texts, show_progress_bar=True)
             
             embeddings = np.array(embeddings).astype('float32')
             logger.info(f"Generated embeddings with shape: {embeddings.shape}")
@@ -256,16 +269,96 @@ class DatasetManagement:
             raise ModelError(f"Unexpected error generating embeddings: {str(e)}")
 
 
+    def embed_query(self, query, model_info):
+        """
+        Embeds a query for searching, reusing the embedding of a repeated query.
+
+        Args:
+            query (str): The query.
+            model_info (dict): The embedding model the dataset was processed with.
+
+        Returns:
+            np.ndarray: The L2-normalised embedding, of shape (1, dimensions). It is a copy the caller may modify.
+        """
+        key = (model_info.get('model_type'), model_info.get('model_name'), query)
+        with _query_embedding_cache_lock:
+            query_vector = _query_embedding_cache.get(key)
+            if query_vector is not None:
+                _query_embedding_cache.move_to_end(key)
+        record_cache_lookup("query_embedding", query_vector is not None)
+        if query_vector is not None:
+            return query_vector.copy()
+
+        query_vector = self.generate_embeddings([query], model_info)
+        faiss.normalize_L2(query_vector)
+        with _query_embedding_cache_lock:
+            _query_embedding_cache[key] = query_vector
+            while len(_query_embedding_cache) > QUERY_EMBEDDING_CACHE_SIZE:
+                _query_embedding_cache.popitem(last=False)
+        return query_vector.copy()
+
+    def query_embedding(self, query, dataset_name, use_chunking=False):
+        """
+        Embeds a query with the embedding model a dataset was processed with.
+
+        Args:
+            query (str): The query.
+            dataset_name (str): The name of the dataset.
+            use_chunking (bool): Whether the chunked or the default processing of the dataset is searched.
+
+        Returns:
+            np.ndarray: The L2-normalised embedding, of shape (1, dimensions).
+        """
+        model_info_path = Path("Datasets") / dataset_name / ("chunked" if use_chunking else "default") / "embedding_model_info.json"
+        with open(model_info_path, 'r') as f:
+            model_info = json.load(f)
+        return self.embed_query(query, model_info)
+
+    @staticmethod
+    def dataset_version(dataset_name, use_chunking=False):
+        """
+        Identifies the processed version of a dataset, which changes whenever the dataset is processed again.
+
+        Args:
+            dataset_name (str): The name of the dataset.
+            use_chunking (bool): Whether the chunked or the default processing is meant.
+
+        Returns:
+            int: The modification time of its FAISS index in nanoseconds, or None if it is not processed.
+        """
+        faiss_index_path = Path("Datasets") / dataset_name / ("chunked" if use_chunking else "default") / "faiss_index.bin"
+        try:
+            return faiss_index_path.stat().st_mtime_ns
+        except OSError:
+            return None
+
     def process_dataset(self, file_path: Path):
+        """
+        Processes a dataset into a FAISS index. A dataset is a single file, or a directory whose supported
+        files together form one multi-file dataset named after the directory.
+
+        Args:
+            file_path (Path): The dataset file or directory.
+
+        Returns:
+            dict: The processing result with the embedding model info.
+
+        Raises:
+            ModelError: If the dataset cannot be processed.
+        """
         logger.info(f"Processing dataset: {file_path}")
         try:
-            filename = file_path.stem
+            filename = file_path.stem if file_path.is_file() else file_path.name
             dataset_dir = Path("Datasets") / filename
             dataset_dir.mkdir(parents=True, exist_ok=True)
 
-            original_file_path = dataset_dir / file_path.name
-            if not original_file_path.exists():
-                shutil.copy2(file_path, original_file_path)
+            source_files = self.file_type_manager.list_supported_files(file_path) if file_path.is_dir() else [file_path]
+            if not source_files:
+                raise ValueError(f"No supported files found in {file_path}")
+            for source_file in source_files:
+                original_file_path = dataset_dir / source_file.name
+                if not original_file_path.exists():
+                    shutil.copy2(source_file, original_file_path)
 
             method_folder = "chunked" if self.chunking_settings["use_chunking"] else "default"
             processing_dir = dataset_dir / method_folder
@@ -286,12 +379,14 @@ class DatasetManagement:
                     with open(chunks_pickle_path, 'wb') as f:
                         pickle.dump(texts, f)
                     logger.info(f"Saved chunks to {chunks_pickle_path}")
+                    rows_per_chunk = self.chunking_settings.get('rows_per_chunk', 1)
+                    provenance = [{"source": file_path.name, "row": i * rows_per_chunk} for i in range(len(texts))]
                 else:
                     texts = df.apply(lambda row: ', '.join([f"{col}: {val}" for col, val in row.items()]), axis=1).tolist()
+                    provenance = [{"source": file_path.name, "row": i} for i in range(len(texts))]
             else:
-                texts = self.file_type_manager.read_file(file_path)
+                texts, provenance = self._extract_chunks(source_files)
                 if self.chunking_settings["use_chunking"]:
-                    texts = self._create_chunks(texts)
                     # Save chunks separately
                     chunks_pickle_path = processing_dir / "chunks.pkl"
                     with open(chunks_pickle_path, 'wb') as f:
@@ -300,6 +395,11 @@ class DatasetManagement:
 
             logger.info(f"Processed dataset with {len(texts)} chunks/rows")
 
+            # where every entry comes from, aligned with data.pkl and chunks.pkl
+            provenance_pickle_path = processing_dir / "provenance.pkl"
+            with open(provenance_pickle_path, 'wb') as f:
+                pickle.dump(provenance, f)
+
             model_info = {
                 "model_type": 'watson' if self.model_name in self.WATSON_MODELS else 'sentence_transformer',
                 "model_name": self.model_name
@@ -326,6 +426,12 @@ class DatasetManagement:
                 pickle.dump(texts, f)
             logger.info(f"Saved processed data to {data_pickle_path}")
 
+            # keyword index for hybrid retrieval, aligned with the FAISS index
+            bm25_index_path = processing_dir / "bm25_index.pkl"
+            with observe_stage(self.model_name, "bm25_index"):
+                BM25Index.build(texts).save(bm25_index_path)
+            logger.info(f"Saved BM25 index to {bm25_index_path}")
+
             model_info = {
                 "model_type": 'watson' if isinstance(self.embeddings, WatsonxEmbeddings) else 'sentence_transformer',
                 "model_name": self.model_name,
@@ -341,7 +447,7 @@ class DatasetManagement:
             # process metadata too!
             manage_dataset_metadata = DatasetFileManagement()
             processing_type = "chunked" if self.chunking_settings["use_chunking"] else "default"
-            manage_dataset_metadata.update_dataset_metadata(file_path.stem, {processing_type: True})
+            manage_dataset_metadata.update_dataset_metadata(filename, {processing_type: True})
             # return to the function...
 
 
@@ -362,27 +468,71 @@ class DatasetManagement:
         #     logger.error(f"Error processing dataset: {e}", exc_info=True)
         #     return {"message": "Error processing dataset", "error": str(e)}
 
-    def _create_chunks(self, texts):
+    def _extract_chunks(self, source_files):
+        """
+        Extracts the texts of the source files in parallel and chunks them as they arrive. PDFs are chunked
+        page by page, so every chunk keeps the file, page and character offset it comes from.
+
+        Args:
+            source_files (list): The files of the dataset.
+
+        Returns:
+            tuple: The chunks (or whole segments without chunking) and their provenance.
+        """
+        use_chunking = self.chunking_settings["use_chunking"]
+        if use_chunking:
+            logger.info(f"Creating chunks with method: {self.chunking_settings.get('chunk_method', 'fixed_length')}")
+
+        texts, provenance = [], []
+        segment_count = 0
+        for segment in self.file_type_manager.iter_segments(source_files):
+            segment_count += 1
+            if not segment["text"].strip():
+                continue
+            chunks = self._chunk_text(segment["text"]) if use_chunking else [segment["text"]]
+            for offset, chunk in zip(self._locate_chunks(segment["text"], chunks), chunks):
+                texts.append(chunk)
+                provenance.append({"source": segment["source"], "page": segment["page"], "offset": offset})
+
+        logger.info(f"Extracted {segment_count} segments from {len(source_files)} files into {len(texts)} entries")
+        return texts, provenance
+
+    @staticmethod
+    def _locate_chunks(text, chunks):
+        # chunkers normalise separators, so each chunk is found by its first sentence or paragraph
+        offsets = []
+        cursor = 0
+        for chunk in chunks:
+            probe = chunk.split('\n\n')[0].split('. ')[0][:64]
+            position = text.find(probe, cursor) if probe else -1
+            offset = position if position >= 0 else cursor
+            offsets.append(offset)
+            cursor = offset + 1
+        return offsets
+
+    def _chunk_text(self, text):
         chunk_method = self.chunking_settings.get('chunk_method', 'fixed_length')
         chunk_size = self.chunking_settings.get('chunk_size', 500)
         chunk_overlap = self.chunking_settings.get('chunk_overlap', 50)
-        
+
+        if chunk_method == 'csv_row':
+            return [text]  # For CSV, each row is already a separate item
+        if chunk_method == 'fixed_length':
+            return self._fixed_length_chunks(text, chunk_size, chunk_overlap)
+        if chunk_method == 'sentence':
+            return self._sentence_chunks(text, chunk_size, chunk_overlap)
+        if chunk_method == 'paragraph':
+            return self._paragraph_chunks(text, chunk_size, chunk_overlap)
+        logger.warning(f"Unknown chunking method: {chunk_method}. Falling back to fixed_length.")
+        return self._fixed_length_chunks(text, chunk_size, chunk_overlap)
+
+    def _create_chunks(self, texts):
+        chunk_method = self.chunking_settings.get('chunk_method', 'fixed_length')
         logger.info(f"Creating chunks with method: {chunk_method}")
-        
+
         chunks = []
-        if chunk_method == 'csv_row':
-            chunks = texts  # For CSV, each row is already a separate item
-        else:
-            for text in texts:
-                if chunk_method == 'fixed_length':
-                    chunks.extend(self._fixed_length_chunks(text, chunk_size, chunk_overlap))
-                elif chunk_method == 'sentence':
-                    chunks.extend(self._sentence_chunks(text, chunk_size, chunk_overlap))
-                elif chunk_method == 'paragraph':
-                    chunks.extend(self._paragraph_chunks(text, chunk_size, chunk_overlap))
-                else:
-                    logger.warning(f"Unknown chunking method: {chunk_method}. Falling back to fixed_length.")
-                    chunks.extend(self._fixed_length_chunks(text, chunk_size, chunk_overlap))
+        for text in texts:
+            chunks.extend(self._chunk_text(text))
         
         logger.info(f"Created {len(chunks)} total chunks from {len(texts)} original texts")
         logger.info(f"Sample chunks:")
@@ -547,12 +697,13 @@ class DatasetManagement:
         html_content = self._render_html_template(report_data)
 
         # Determine the appropriate folder for saving the report
-        dataset_dir = Path("Datasets") / file_path.stem
+        dataset_name = file_path.stem if file_path.is_file() else file_path.name
+        dataset_dir = Path("Datasets") / dataset_name
         method_folder = "chunked" if chunks else "default"
         processing_dir = dataset_dir / method_folder
 
         # Save the report
-        report_filename = f"{file_path.stem}_processing_report.html"
+        report_filename = f"{dataset_name}_processing_report.html"
         report_path = processing_dir / report_filename
         report_path.parent.mkdir(parents=True, exist_ok=True)
         with open(report_path, 'w', encoding='utf-8') as f:
@@ -671,7 +822,28 @@ class DatasetManagement:
         
         return template.render(data)
 
-    def find_relevant_entries(self, query, dataset_name, use_chunking=False, similarity_threshold=0.5):
+    def find_relevant_entries(self, query, dataset_name, use_chunking=False, similarity_threshold=0.5, with_provenance=False,
+                              retrieval_mode="vector", top_k=RAG_HYBRID_TOP_K, max_candidates=None):
+        """
+        Finds the entries of a processed dataset most similar to a query.
+
+        Args:
+            query (str): The query.
+            dataset_name (str): The name of the dataset.
+            use_chunking (bool): Whether to search the chunked or the default processing of the dataset.
+            similarity_threshold (float): The minimum cosine similarity of a vector search result.
+            with_provenance (bool): Whether to return each entry with the file, page and offset it comes from.
+            retrieval_mode (str): "vector" returns every entry above the similarity threshold. "hybrid" fuses the
+                best vector results with the best BM25 keyword matches by reciprocal rank fusion, so entries matching
+                exact names or IDs are found even when their embedding is not similar enough.
+            top_k (int): The number of entries returned in hybrid mode.
+            max_candidates (int, optional): The maximum number of entries returned in vector mode, all entries above
+                the similarity threshold by default.
+
+        Returns:
+            list: The entries, most relevant first, as strings or, with provenance, as dicts with "text" and
+                "provenance" keys. Provenance is None for datasets processed before it was recorded.
+        """
         logger.info(f"Finding relevant entries for query: '{query}' in dataset: {dataset_name}")
         try:
             dataset_dir = Path("Datasets") / dataset_name
@@ -696,31 +868,42 @@ class DatasetManagement:
                     logger.error(f"Required file not found: {file}")
                     return []
 
-            with open(model_info_path, 'r') as f:
-                model_info = json.load(f)
-            logger.info(f"Loaded model info: {model_info}")
+            with observe_stage(self.model_name, "index_load"):
+                with open(model_info_path, 'r') as f:
+                    model_info = json.load(f)
+                logger.info(f"Loaded model info: {model_info}")
 
-            with open(embedding_pickle_path, 'rb') as f:
-                stored_embeddings = pickle.load(f)
-            logger.info(f"Loaded stored embeddings with shape: {stored_embeddings.shape}")
+                with open(embedding_pickle_path, 'rb') as f:
+                    stored_embeddings = pickle.load(f)
+                logger.info(f"Loaded stored embeddings with shape: {stored_embeddings.shape}")
 
-            index = faiss.read_index(str(faiss_index_path))
-            logger.info(f"Loaded FAISS index with {index.ntotal} vectors")
+                index = faiss.read_index(str(faiss_index_path))
+                logger.info(f"Loaded FAISS index with {index.ntotal} vectors")
 
-            original_data = pd.read_pickle(data_pickle_path)
-            logger.info(f"Loaded original data with {len(original_data)} rows")
+                original_data = pd.read_pickle(data_pickle_path)
+                logger.info(f"Loaded original data with {len(original_data)} rows")
 
-            query_vector = self.generate_embeddings([query], model_info)
+            query_vector = self.embed_query(query, model_info)
             logger.info(f"Generated query embedding with shape: {query_vector.shape}")
 
-            faiss.normalize_L2(query_vector)
-            D, I = index.search(query_vector, index.ntotal)  # Search all vectors
+            hybrid = retrieval_mode == "hybrid"
+            with observe_stage(self.model_name, "search"):
+                if hybrid:
+                    D, I = index.search(query_vector, min(RAG_HYBRID_CANDIDATES, index.ntotal))
+                elif max_candidates:
+                    D, I = index.search(query_vector, min(max_candidates, index.ntotal))
+                else:
+                    D, I = index.search(query_vector, index.ntotal)  # Search all vectors
             logger.info(f"Searched all {index.ntotal} vectors")
 
             relevant_indices = I[0][D[0] > similarity_threshold]
             relevant_similarities = D[0][D[0] > similarity_threshold]
             logger.info(f"Found {len(relevant_indices)} entries above similarity threshold {similarity_threshold}")
 
+            if hybrid:
+                relevant_indices, relevant_similarities = self._fuse_lexical(query, processing_dir, relevant_indices,
+                                                                            relevant_similarities, top_k)
+
             if len(relevant_indices) == 0:
                 logger.info("No relevant entries found above the similarity threshold")
                 return []
@@ -740,16 +923,90 @@ class DatasetManagement:
                 logger.info(f"Using full entries. Relevant entries: {len(relevant_entries)}")
 
             # Sort entries by similarity (highest to lowest)
-            sorted_entries = sorted(zip(relevant_entries, relevant_similarities), key=lambda x: x[1], reverse=True)
-            relevant_entries = [entry for entry, _ in sorted_entries]
+            sorted_entries = sorted(zip(relevant_entries, relevant_similarities, relevant_indices), key=lambda x: x[1], reverse=True)
+            relevant_entries = [entry for entry, _, _ in sorted_entries]
 
             formatted_entries = [self.format_entry(entry) for entry in relevant_entries]
             logger.info(f"Returning {len(formatted_entries)} formatted entries")
+            if with_provenance:
+                provenance = self._load_provenance(processing_dir)
+                return [
+                    {"text": entry, "provenance": provenance[index] if provenance and index < len(provenance) else None}
+                    for entry, (_, _, index) in zip(formatted_entries, sorted_entries)
+                ]
             return formatted_entries
         except Exception as e:
             logger.error(f"Error in find_relevant_entries: {str(e)}", exc_info=True)
             return []
 
+    def retrieve_context(self, query, rag_settings, count_tokens=None):
+        """
+        Retrieves the entries of a model's RAG dataset to put into its prompt, as configured by its rag_settings.
+        With "rerank" enabled, the best "rerank_candidates" entries are re-scored by a cross-encoder and only
+        the best "rerank_top_k" that fit in "context_token_budget" tokens are kept, so broad queries do not
+        flood the prompt.
+
+        Args:
+            query (str): The user's query.
+            rag_settings (dict): The RAG settings of the model.
+            count_tokens (callable, optional): Counts the tokens of a text for the token budget.
+
+        Returns:
+            list: The entries, most relevant first.
+        """
+        rerank = rag_settings.get("rerank", False)
+        candidates = rag_settings.get("rerank_candidates", RAG_RERANK_CANDIDATES) if rerank else None
+        entries = self.find_relevant_entries(
+            query,
+            rag_settings.get("dataset_name"),
+            use_chunking=rag_settings.get("use_chunking", False),
+            similarity_threshold=rag_settings.get("similarity_threshold", 0.5),
+            retrieval_mode=rag_settings.get("retrieval_mode", "vector"),
+            top_k=candidates or rag_settings.get("top_k", RAG_HYBRID_TOP_K),
+            max_candidates=candidates
+        )
+        if not rerank or not entries:
+            return entries
+
+        top_k = rag_settings.get("rerank_top_k", RAG_RERANK_TOP_K)
+        try:
+            reranker = get_reranker(rag_settings.get("reranker_model", RAG_RERANKER_MODEL))
+            with observe_stage(self.model_name, "rerank"):
+                return reranker.rerank(query, entries, top_k,
+                                       token_budget=rag_settings.get("context_token_budget", RAG_CONTEXT_TOKEN_BUDGET),
+                                       count_tokens=count_tokens)
+        except Exception as e:
+            logger.warning(f"Re-ranking failed, using the first {top_k} retrieved entries: {str(e)}")
+            return entries[:top_k]
+
+    def _fuse_lexical(self, query, processing_dir, vector_indices, vector_similarities, top_k):
+        """
+        Fuses the vector search results with the BM25 matches of the query.
+
+        Returns:
+            tuple: The indices of the top_k fused entries and their fused scores, or the vector results
+                unchanged for datasets processed before the BM25 index was built.
+        """
+        bm25_index_path = processing_dir / "bm25_index.pkl"
+        if not bm25_index_path.exists():
+            logger.warning(f"BM25 index not found: {bm25_index_path}. Falling back to vector retrieval, reprocess the dataset to enable hybrid retrieval.")
+            return vector_indices, vector_similarities
+
+        with observe_stage(self.model_name, "lexical_search"):
+            lexical_matches = BM25Index.load(bm25_index_path).search(query, RAG_HYBRID_CANDIDATES)
+        vector_ranking = [index for _, index in sorted(zip(vector_similarities, vector_indices), key=lambda x: x[0], reverse=True)]
+        fused = reciprocal_rank_fusion([vector_ranking, [index for index, _ in lexical_matches]])[:top_k]
+        logger.info(f"Fused {len(vector_ranking)} vector results and {len(lexical_matches)} BM25 matches into {len(fused)} entries")
+        return [index for index, _ in fused], [score for _, score in fused]
+
+    @staticmethod
+    def _load_provenance(processing_dir):
+        provenance_pickle_path = processing_dir / "provenance.pkl"
+        if not provenance_pickle_path.exists():
+            return None
+        with open(provenance_pickle_path, 'rb') as f:
+            return pickle.load(f)
+
     def format_entry(self, entry):
         if isinstance(entry, str):  # It's a chunk or a string entry
             return entry
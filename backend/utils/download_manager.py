@@ -0,0 +1,285 @@
+import logging
+import os
+import posixpath
+import queue
+import threading
+import time
+import uuid
+
+from backend.core.config import (
+    DOWNLOAD_FILE_WORKERS, DOWNLOAD_JOB_TTL_SECONDS, DOWNLOAD_MAX_FINISHED_JOBS, DOWNLOAD_MIRROR_ENDPOINT,
+    MAX_CONCURRENT_DOWNLOADS,
+)
+from backend.core.exceptions import ModelError
+
+logger = logging.getLogger(__name__)
+
+# job statuses
+QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED = "queued", "running", "completed", "failed", "cancelled"
+
+# configs, tokenizer files and remote code, i.e. the small files from_pretrained reads next to the weights
+PREFETCH_CONFIG_EXTENSIONS = (".json", ".txt", ".model", ".py", ".tiktoken", ".spm")
+# directories of exported formats (ONNX, OpenVINO, Core ML, ...) that from_pretrained never reads
+PREFETCH_SKIPPED_DIRS = ("onnx", "openvino", "coreml", "tflite", "gguf", "mlx")
+
+
+def select_prefetch_files(repo_files):
+    """
+    Selects the files of a Hugging Face repository that from_pretrained loads: configs and tokenizer files,
+    and per directory the safetensors weights, or the PyTorch .bin weights where there are no safetensors.
+    Other formats and quantised variants (ONNX, OpenVINO, GGUF, TensorFlow, Flax, ...) are left out. A file
+    missed here is not lost, from_pretrained fetches it itself when building the library entry.
+
+    Args:
+        repo_files (list): The paths of the files of the repository.
+
+    Returns:
+        list: The paths of the files to prefetch.
+    """
+    files = [path for path in repo_files if path.split("/")[0] not in PREFETCH_SKIPPED_DIRS]
+    safetensors_dirs = {posixpath.dirname(path) for path in files if path.endswith(".safetensors")}
+    selected = []
+    for path in files:
+        name = posixpath.basename(path)
+        if name.startswith("pytorch_model") and (name.endswith(".bin") or name.endswith(".bin.index.json")):
+            if posixpath.dirname(path) not in safetensors_dirs:
+                selected.append(path)
+        elif name.endswith(".safetensors") or name.endswith(PREFETCH_CONFIG_EXTENSIONS):
+            selected.append(path)
+    return selected
+
+
+class DownloadJob:
+    """
+    The DownloadJob class tracks the status and progress of one model download.
+
+    Attributes:
+        job_id (str): The unique identifier of the job.
+        model_id (str): The ID of the model being downloaded.
+        status (str): One of queued, running, completed, failed or cancelled.
+        phase (str): The current step of a running job, "fetching" files or "finalising" the library entry.
+        files_total (int): The number of files fetched in parallel, 0 when the model has no prefetch step.
+        files_done (int): The number of files already fetched.
+        error (str): The error of a failed job.
+        exception (Exception): The exception of a failed job, re-raised by callers waiting on the job.
+    """
+
+    def __init__(self, model_id: str, auth_token: str = None):
+        self.job_id = str(uuid.uuid4())
+        self.model_id = model_id
+        self.auth_token = auth_token
+        self.status = QUEUED
+        self.phase = None
+        self.files_total = 0
+        self.files_done = 0
+        self.error = None
+        self.exception = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done_event = threading.Event()
+
+    def is_finished(self):
+        return self.status in (COMPLETED, FAILED, CANCELLED)
+
+    def to_dict(self):
+        """
+        Creates a dictionary representation of the job. The auth token is never included.
+
+        Returns:
+            dict: The job status and progress.
+        """
+        return {
+            "job_id": self.job_id,
+            "model_id": self.model_id,
+            "status": self.status,
+            "phase": self.phase,
+            "files_total": self.files_total,
+            "files_done": self.files_done,
+            "progress": round(self.files_done / self.files_total, 4) if self.files_total else None,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class DownloadManager:
+    """
+    The DownloadManager class runs model downloads in the background, a few at a time.
+    Hugging Face repositories are first fetched file by file in parallel into the model's cache directory,
+    where partially downloaded files are resumed; the model class then builds the library entry from that cache.
+    """
+
+    def __init__(self, download_fn, max_concurrent_downloads: int = MAX_CONCURRENT_DOWNLOADS,
+                 file_workers: int = DOWNLOAD_FILE_WORKERS, mirror_endpoint: str = DOWNLOAD_MIRROR_ENDPOINT):
+        """
+        Initializes the DownloadManager instance.
+
+        Args:
+            download_fn (callable): Downloads a model and registers it in the library, called as download_fn(model_id, auth_token).
+            max_concurrent_downloads (int): The number of models downloaded at the same time.
+            file_workers (int): The number of files of one model fetched in parallel.
+            mirror_endpoint (str): The URL of a Hugging Face mirror, None for the Hugging Face Hub.
+        """
+        self.download_fn = download_fn
+        self.max_concurrent_downloads = max_concurrent_downloads
+        self.file_workers = file_workers
+        self.mirror_endpoint = mirror_endpoint
+        self.jobs = {}
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = []
+
+    def submit(self, model_id: str, auth_token: str = None, prefetch_repo: bool = False, cache_dir: str = None):
+        """
+        Queues a model download. A model already queued or downloading is not queued again.
+
+        Args:
+            model_id (str): The ID of the model.
+            auth_token (str, optional): The token for gated repositories.
+            prefetch_repo (bool, optional): Whether the model is a Hugging Face repository to fetch in parallel first.
+            cache_dir (str, optional): The cache directory the repository files are fetched into.
+
+        Returns:
+            DownloadJob: The job of the download.
+        """
+        with self._lock:
+            for job in self.jobs.values():
+                if job.model_id == model_id and not job.is_finished():
+                    logger.info(f"Model {model_id} is already being downloaded by job {job.job_id}")
+                    return job
+
+            self._prune_jobs()
+            job = DownloadJob(model_id, auth_token)
+            self.jobs[job.job_id] = job
+            self._start_workers()
+        self._queue.put((job, prefetch_repo, cache_dir))
+        logger.info(f"Download of model {model_id} queued as job {job.job_id}")
+        return job
+
+    def get_job(self, job_id: str):
+        """
+        Retrieves a download job.
+
+        Args:
+            job_id (str): The ID of the job.
+
+        Returns:
+            DownloadJob: The job.
+
+        Raises:
+            KeyError: If the job does not exist.
+        """
+        if job_id not in self.jobs:
+            raise KeyError(f"Download job {job_id} not found")
+        return self.jobs[job_id]
+
+    def list_jobs(self):
+        return [job.to_dict() for job in self.jobs.values()]
+
+    def cancel(self, job_id: str):
+        """
+        Cancels a queued download job. Running downloads are not interrupted, their files would be resumed anyway.
+
+        Args:
+            job_id (str): The ID of the job.
+
+        Returns:
+            DownloadJob: The job.
+
+        Raises:
+            KeyError: If the job does not exist.
+            ModelError: If the job is not queued anymore.
+        """
+        job = self.get_job(job_id)
+        with self._lock:
+            if job.status != QUEUED:
+                raise ModelError(f"Download job {job_id} is {job.status} and cannot be cancelled")
+            self._finish(job, CANCELLED)
+        return job
+
+    def _prune_jobs(self):
+        # finished jobs are kept a while for clients polling them, then forgotten so the history stays bounded
+        now = time.time()
+        finished = sorted((job for job in self.jobs.values() if job.is_finished()), key=lambda job: job.finished_at)
+        expired = [job for job in finished if now - job.finished_at > DOWNLOAD_JOB_TTL_SECONDS]
+        expired += finished[len(expired):max(len(expired), len(finished) - DOWNLOAD_MAX_FINISHED_JOBS)]
+        for job in expired:
+            del self.jobs[job.job_id]
+
+    def _start_workers(self):
+        # workers are started lazily, so an idle server does not hold download threads
+        self._workers = [worker for worker in self._workers if worker.is_alive()]
+        while len(self._workers) < self.max_concurrent_downloads:
+            worker = threading.Thread(target=self._work, daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _work(self):
+        while True:
+            job, prefetch_repo, cache_dir = self._queue.get()
+            with self._lock:
+                if job.status != QUEUED:
+                    continue
+                job.status = RUNNING
+                job.started_at = time.time()
+            try:
+                if prefetch_repo:
+                    job.phase = "fetching"
+                    self._prefetch_repo(job, cache_dir)
+                job.phase = "finalising"
+                self.download_fn(job.model_id, job.auth_token)
+                self._finish(job, COMPLETED)
+                logger.info(f"Download job {job.job_id} for model {job.model_id} completed in {job.finished_at - job.started_at:.2f} seconds")
+            except Exception as e:
+                job.error = str(e)
+                job.exception = e
+                self._finish(job, FAILED)
+                logger.error(f"Download job {job.job_id} for model {job.model_id} failed: {str(e)}")
+
+    def _prefetch_repo(self, job: DownloadJob, cache_dir: str):
+        from huggingface_hub import HfApi, snapshot_download
+        from tqdm.auto import tqdm
+
+        class _FileProgress(tqdm):
+            # snapshot_download iterates one step per fetched file, the bar is silenced and
+            # refreshed on every step so the job sees each file as it completes
+            def __init__(self, *args, **kwargs):
+                kwargs.update({"file": open(os.devnull, "w"), "mininterval": 0, "miniters": 1})
+                super().__init__(*args, **kwargs)
+                job.files_total = self.total or 0
+
+            def refresh(self, *args, **kwargs):
+                job.files_done = self.n
+                return super().refresh(*args, **kwargs)
+
+            def close(self):
+                job.files_done = self.n
+                super().close()
+                self.fp.close()
+
+        repo_files = HfApi(endpoint=self.mirror_endpoint).list_repo_files(job.model_id, token=job.auth_token)
+        allow_patterns = select_prefetch_files(repo_files)
+        logger.info(f"Prefetching {len(allow_patterns)} of the {len(repo_files)} files of {job.model_id}")
+
+        os.makedirs(cache_dir, exist_ok=True)
+        snapshot_download(
+            repo_id=job.model_id,
+            cache_dir=cache_dir,
+            token=job.auth_token,
+            endpoint=self.mirror_endpoint,
+            max_workers=self.file_workers,
+            allow_patterns=allow_patterns,
+            tqdm_class=_FileProgress,
+        )
+        job.files_done = job.files_total
+
+    @staticmethod
+    def _finish(job: DownloadJob, status: str):
+        job.status = status
+        job.phase = None
+        job.finished_at = time.time()
+        # never keep tokens around longer than needed
+        job.auth_token = None
+        job.done_event.set()
@@ -0,0 +1,68 @@
+import logging
+import os
+
+import torch
+from torch.ao.nn.quantized.dynamic import Linear as DynamicQuantizedLinear
+from torch.ao.quantization import quantize_dynamic
+
+logger = logging.getLogger(__name__)
+
+# quantization_config.current_mode value selecting CPU dynamic int8 quantisation
+DYNAMIC_INT8_MODE = "dynamic-int8"
+
+
+def get_quantized_cache_path(model_dir: str) -> str:
+    # the packed int8 weights are only guaranteed to load on the torch version that wrote them
+    return os.path.join(model_dir, "quantized", f"{DYNAMIC_INT8_MODE}_torch-{torch.__version__}.pt")
+
+
+def quantize_model(model: torch.nn.Module) -> torch.nn.Module:
+    """
+    Quantizes the weights of every Linear layer to int8, activations are quantized on the fly at inference.
+
+    Args:
+        model (torch.nn.Module): The float model, it is quantized in place.
+
+    Returns:
+        torch.nn.Module: The quantized model.
+    """
+    model.eval()
+    quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    logger.info("Model quantized with dynamic int8 quantization")
+    return model
+
+
+def save_quantized_state_dict(model: torch.nn.Module, cache_path: str):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    torch.save(model.state_dict(), cache_path)
+    logger.info(f"Quantized state dict saved to {cache_path}")
+
+
+def load_quantized_state_dict(model: torch.nn.Module, cache_path: str) -> torch.nn.Module:
+    """
+    Restores a cached quantized state dict into an unquantized model skeleton.
+    Linear layers are replaced by empty quantized layers first, so nothing is re-quantized.
+
+    Args:
+        model (torch.nn.Module): The model skeleton, its weights do not need to be initialised.
+        cache_path (str): The path of the state dict written by save_quantized_state_dict.
+
+    Returns:
+        torch.nn.Module: The quantized model.
+    """
+    _swap_linear_for_quantized(model)
+    state_dict = torch.load(cache_path, map_location="cpu")
+    model.load_state_dict(state_dict)
+    model.eval()
+    logger.info(f"Quantized state dict loaded from {cache_path}")
+    return model
+
+
+def _swap_linear_for_quantized(module: torch.nn.Module):
+    for name, child in module.named_children():
+        if type(child) is torch.nn.Linear:
+            setattr(module, name, DynamicQuantizedLinear(
+                child.in_features, child.out_features, bias_=child.bias is not None, dtype=torch.qint8
+            ))
+        else:
+            _swap_linear_for_quantized(child)
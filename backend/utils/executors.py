@@ -0,0 +1,144 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from backend.core.config import EXECUTOR_LIMITS, INGEST_PROCESS_WORKERS
+from backend.core.exceptions import ServerBusyError
+from backend.utils.metrics import EXECUTOR_REJECTIONS
+
+logger = logging.getLogger(__name__)
+
+# workload classes: file and JSON I/O, CPU-heavy work such as dataset ingest (parsing, embedding, FAISS builds)
+# and visualisation, and requests to model processes
+IO, CPU, MODEL_IPC = "io", "cpu", "model_ipc"
+
+
+class WorkloadExecutor:
+    """
+    The WorkloadExecutor class runs blocking calls of one workload class on a bounded thread pool.
+    At most max_workers calls run at once and max_pending more may wait; further calls are rejected
+    right away, so a burst of slow work cannot pile up behind the event loop.
+    """
+
+    def __init__(self, workload: str, max_workers: int, max_pending: int):
+        """
+        Initializes the WorkloadExecutor instance.
+
+        Args:
+            workload (str): The name of the workload class.
+            max_workers (int): The number of calls running at the same time.
+            max_pending (int): The number of calls allowed to wait for a worker.
+        """
+        self.workload = workload
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{workload}-executor")
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Runs a blocking call in the pool and waits for it without blocking the event loop.
+
+        Args:
+            func (callable): The blocking function.
+            *args: The positional arguments of the function.
+            **kwargs: The keyword arguments of the function.
+
+        Returns:
+            The return value of the function. Its exceptions are raised to the caller.
+
+        Raises:
+            ServerBusyError: If the executor has no worker free and its waiting list is full.
+        """
+        if not self._slots.acquire(blocking=False):
+            EXECUTOR_REJECTIONS.inc(workload=self.workload)
+            logger.warning(f"Rejected a {self.workload} call, {self.max_workers + self.max_pending} calls already running or waiting")
+            raise ServerBusyError(f"The server is busy with {self.workload} work, please retry shortly")
+        try:
+            future = self._executor.submit(functools.partial(func, *args, **kwargs))
+        except Exception:
+            self._slots.release()
+            raise
+        # the slot is held until the call finishes, even if the waiting request is cancelled
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class WorkloadExecutors:
+    """
+    The WorkloadExecutors class holds one bounded executor per workload class.
+    """
+
+    def __init__(self, limits: dict = EXECUTOR_LIMITS):
+        """
+        Initializes the WorkloadExecutors instance.
+
+        Args:
+            limits (dict): The (max_workers, max_pending) limits keyed by workload class.
+        """
+        self._executors = {workload: WorkloadExecutor(workload, *limit) for workload, limit in limits.items()}
+
+    async def run(self, workload: str, func, *args, **kwargs):
+        """
+        Runs a blocking call on the executor of its workload class.
+
+        Args:
+            workload (str): The workload class, IO, CPU or MODEL_IPC.
+            func (callable): The blocking function.
+            *args: The positional arguments of the function.
+            **kwargs: The keyword arguments of the function.
+
+        Returns:
+            The return value of the function.
+
+        Raises:
+            KeyError: If the workload class is unknown.
+            ServerBusyError: If the executor of the workload class is full.
+        """
+        return await self._executors[workload].run(func, *args, **kwargs)
+
+    def shutdown(self):
+        for executor in self._executors.values():
+            executor.shutdown()
+
+
+executors = WorkloadExecutors()
+
+
+async def wait_for_event(event: threading.Event, poll_interval: float = 0.2):
+    """
+    Waits for a threading event set by a background job, e.g. a download or training job finishing.
+    The event is polled from the event loop, so a long job does not pin an executor thread.
+
+    Args:
+        event (threading.Event): The event to wait for.
+        poll_interval (float): The number of seconds between two polls.
+    """
+    while not event.is_set():
+        await asyncio.sleep(poll_interval)
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool():
+    """
+    Retrieves the process pool for pure Python CPU work that the GIL would serialise, e.g. extracting
+    the text of documents. It is created on first use and shared by all callers.
+
+    Returns:
+        ProcessPoolExecutor: The pool of INGEST_PROCESS_WORKERS processes.
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            # spawned rather than forked, forking the multi-threaded server could copy a held lock
+            _process_pool = ProcessPoolExecutor(max_workers=INGEST_PROCESS_WORKERS,
+                                                mp_context=multiprocessing.get_context("spawn"))
+        return _process_pool
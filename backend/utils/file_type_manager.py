@@ -1,11 +1,15 @@
 from abc import ABC, abstractmethod
+from collections import deque
 from pathlib import Path
-from typing import List
+from typing import Iterable, Iterator, List
 import pandas as pd
 import docx
 import logging
 import PyPDF2
 
+from backend.core.config import INGEST_PROCESS_WORKERS, PDF_PAGES_PER_TASK, PDF_PARALLEL_MIN_PAGES
+from backend.utils.executors import get_process_pool
+
 logger = logging.getLogger(__name__)
 
 class FileHandler(ABC):
@@ -13,9 +17,43 @@ class FileHandler(ABC):
     def read_file(self, file_path: Path) -> List[str]:
         pass
 
+    def extract_segments(self, file_path: Path) -> List[dict]:
+        """
+        Extracts the texts of a file with their provenance.
+
+        Args:
+            file_path (Path): The file to extract.
+
+        Returns:
+            List[dict]: One segment per text, with the text, the source file name and the 1-based page number (None
+                for files without pages).
+        """
+        return [{"text": text, "source": file_path.name, "page": None} for text in self.read_file(file_path)]
+
+    def preview(self, file_path: Path, max_entries: int, max_chars: int) -> List[str]:
+        """
+        Reads the head of a file. Handlers override it to stop reading as early as their format allows.
+
+        Args:
+            file_path (Path): The file to preview.
+            max_entries (int): The number of entries (e.g. CSV rows) to return.
+            max_chars (int): The number of characters to return of files without entries.
+
+        Returns:
+            List[str]: The first entries, or the first characters as a single entry.
+        """
+        return [text[:max_chars] for text in self.read_file(file_path)[:max_entries]]
+
 class CSVHandler(FileHandler):
     def read_file(self, file_path: Path) -> List[str]:
         df = pd.read_csv(file_path)
+        return self._rows_to_texts(df)
+
+    def preview(self, file_path: Path, max_entries: int, max_chars: int) -> List[str]:
+        return self._rows_to_texts(pd.read_csv(file_path, nrows=max_entries))
+
+    @staticmethod
+    def _rows_to_texts(df) -> List[str]:
         return df.apply(lambda row: ' '.join([f"{col}: {val}" for col, val in row.items()]), axis=1).tolist()
 
 class TXTHandler(FileHandler):
@@ -23,16 +61,68 @@ class TXTHandler(FileHandler):
         with open(file_path, 'r', encoding='utf-8') as file:
             return [file.read()]
 
+    def preview(self, file_path: Path, max_entries: int, max_chars: int) -> List[str]:
+        # a character cut short at the end of the read is dropped rather than failing the preview
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
+            return [file.read(max_chars)]
+
 class DOCXHandler(FileHandler):
     def read_file(self, file_path: Path) -> List[str]:
         doc = docx.Document(file_path)
         return ['\n'.join([paragraph.text for paragraph in doc.paragraphs])]
 
+    def preview(self, file_path: Path, max_entries: int, max_chars: int) -> List[str]:
+        # the document XML is parsed as a whole, but only the paragraphs of the preview are joined
+        texts, length = [], 0
+        for paragraph in docx.Document(file_path).paragraphs:
+            if length >= max_chars:
+                break
+            texts.append(paragraph.text)
+            length += len(paragraph.text) + 1
+        return ['\n'.join(texts)[:max_chars]]
+
 class PDFHandler(FileHandler):
     def read_file(self, file_path: Path) -> List[str]:
+        return [' '.join(segment["text"] for segment in self.extract_segments(file_path))]
+
+    def preview(self, file_path: Path, max_entries: int, max_chars: int) -> List[str]:
+        with open(file_path, 'rb') as file:
+            reader = PyPDF2.PdfReader(file)
+            text = (reader.pages[0].extract_text() or "") if len(reader.pages) else ""
+        return [text[:max_chars]]
+
+    def count_pages(self, file_path: Path) -> int:
+        with open(file_path, 'rb') as file:
+            return len(PyPDF2.PdfReader(file).pages)
+
+    def extract_segments(self, file_path: Path, start: int = 0, end: int = None) -> List[dict]:
+        """
+        Extracts the text of a range of pages, one segment per page.
+
+        Args:
+            file_path (Path): The PDF file.
+            start (int): The index of the first page.
+            end (int, optional): The index after the last page, the last page of the file by default.
+
+        Returns:
+            List[dict]: The segments of the pages.
+        """
         with open(file_path, 'rb') as file:
             reader = PyPDF2.PdfReader(file)
-            return [' '.join([page.extract_text() for page in reader.pages])]
+            end = len(reader.pages) if end is None else min(end, len(reader.pages))
+            return [
+                {"text": reader.pages[index].extract_text() or "", "source": file_path.name, "page": index + 1}
+                for index in range(start, end)
+            ]
+
+
+def _extract_task(file_path: Path, start: int = None, end: int = None) -> List[dict]:
+    # runs in the process pool, so it is a module level function
+    handler = FileTypeManager().get_handler(file_path.suffix[1:])
+    if start is None:
+        return handler.extract_segments(file_path)
+    return handler.extract_segments(file_path, start, end)
+
 
 class FileTypeManager:
     def __init__(self):
@@ -54,4 +144,71 @@ class FileTypeManager:
     def read_file(self, file_path: Path) -> List[str]:
         file_extension = file_path.suffix[1:].lower()
         handler = self.get_handler(file_extension)
-        return handler.read_file(file_path)
\ No newline at end of file
+        return handler.read_file(file_path)
+
+    def preview_file(self, file_path: Path, max_entries: int = 10, max_chars: int = 1000) -> List[str]:
+        """
+        Reads only the head of a file: the first rows of a CSV, the first page of a PDF, the first characters of a text file.
+
+        Args:
+            file_path (Path): The file to preview.
+            max_entries (int): The number of CSV rows to return.
+            max_chars (int): The number of characters to return of other files.
+
+        Returns:
+            List[str]: The preview entries.
+        """
+        return self.get_handler(file_path.suffix[1:]).preview(file_path, max_entries, max_chars)
+
+    def list_supported_files(self, directory: Path) -> List[Path]:
+        """
+        Lists the files of a multi-file dataset, i.e. the files of a directory this manager can read.
+
+        Args:
+            directory (Path): The dataset directory. Subdirectories are not searched.
+
+        Returns:
+            List[Path]: The supported files, sorted by name.
+        """
+        return sorted(path for path in directory.iterdir() if path.is_file() and path.suffix[1:].lower() in self.handlers)
+
+    def iter_segments(self, file_paths: Iterable[Path]) -> Iterator[dict]:
+        """
+        Extracts the texts of files in parallel and yields them in file and page order. Large PDFs are split into
+        page ranges, other files are extracted whole, and every task runs in the shared process pool. Only a few
+        tasks are in flight at a time, so the extracted text of a large document set is never held at once.
+
+        Args:
+            file_paths (Iterable[Path]): The files to extract.
+
+        Yields:
+            dict: The segments, with their text, source file name and page number.
+
+        Raises:
+            ValueError: If a file type is not supported.
+        """
+        tasks = list(self._plan_tasks(file_paths))
+        if len(tasks) == 1:
+            yield from _extract_task(*tasks[0])
+            return
+
+        pool = get_process_pool()
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(_extract_task, *task))
+            if len(pending) >= 2 * INGEST_PROCESS_WORKERS:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+    def _plan_tasks(self, file_paths: Iterable[Path]):
+        for file_path in file_paths:
+            handler = self.get_handler(file_path.suffix[1:])
+            if isinstance(handler, PDFHandler):
+                page_count = handler.count_pages(file_path)
+                if page_count >= PDF_PARALLEL_MIN_PAGES:
+                    logger.info(f"Extracting {page_count} pages of {file_path.name} in ranges of {PDF_PAGES_PER_TASK} pages")
+                    for start in range(0, page_count, PDF_PAGES_PER_TASK):
+                        yield (file_path, start, start + PDF_PAGES_PER_TASK)
+                    continue
+            yield (file_path,)
@@ -0,0 +1,190 @@
+import logging
+import threading
+import time
+from collections import deque
+
+import psutil
+
+from backend.core.config import HARDWARE_HISTORY_SIZE, HARDWARE_SAMPLE_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+
+class _GPUReader:
+    """
+    Reads per process GPU memory and device utilisation through NVML. Without NVML (no NVIDIA driver,
+    or nvidia-ml-py not installed) every reading is empty.
+    """
+
+    def __init__(self):
+        self.available = False
+        self._handles = []
+        try:
+            import pynvml
+
+            pynvml.nvmlInit()
+            self._nvml = pynvml
+            self._handles = [pynvml.nvmlDeviceGetHandleByIndex(i) for i in range(pynvml.nvmlDeviceGetCount())]
+            self.available = bool(self._handles)
+        except Exception as e:
+            logger.info(f"NVML is not available, GPU usage will not be sampled: {str(e)}")
+
+    def read(self):
+        """
+        Returns:
+            dict: For every process using a GPU, its GPU memory in MB, the total memory of its GPU in MB
+                and the utilisation of that GPU in percent.
+        """
+        usage = {}
+        for handle in self._handles:
+            try:
+                memory = self._nvml.nvmlDeviceGetMemoryInfo(handle)
+                utilization = self._nvml.nvmlDeviceGetUtilizationRates(handle).gpu
+                for process in self._nvml.nvmlDeviceGetComputeRunningProcesses(handle):
+                    used = (process.usedGpuMemory or 0) / (1024 * 1024)
+                    current = usage.setdefault(process.pid, {"memory_mb": 0.0, "total_mb": 0.0, "utilization": 0})
+                    current["memory_mb"] += used
+                    current["total_mb"] += memory.total / (1024 * 1024)
+                    # NVML has no reliable per process utilisation, a process is assigned the load of its GPU
+                    current["utilization"] = max(current["utilization"], utilization)
+            except Exception as e:
+                logger.debug(f"Failed to read NVML device: {str(e)}")
+        return usage
+
+
+class HardwareTelemetry:
+    """
+    The HardwareTelemetry class samples the CPU, memory, thread and GPU usage of the model processes in a
+    background thread and keeps the latest samples of every process in a ring buffer. Readers get the
+    latest sample or the history instantly, without measuring anything themselves.
+    """
+
+    def __init__(self, interval: float = HARDWARE_SAMPLE_INTERVAL, history_size: int = HARDWARE_HISTORY_SIZE):
+        """
+        Initializes the HardwareTelemetry instance. The sampling thread starts with the first tracked process.
+
+        Args:
+            interval (float): The number of seconds between two samples.
+            history_size (int): The number of samples kept per process.
+        """
+        self.interval = interval
+        self.history_size = history_size
+        self._processes = {}
+        self._history = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._gpu_reader = None
+
+    def track(self, model_id: str, pid: int):
+        """
+        Starts sampling a model process.
+
+        Args:
+            model_id (str): The ID of the model.
+            pid (int): The PID of the model process.
+        """
+        process = psutil.Process(pid)
+        with self._lock:
+            self._history[model_id] = deque(maxlen=self.history_size)
+        # a first sample right away, its CPU usage is 0 as cpu_percent only starts measuring here
+        self._sample_process(model_id, process, {}, time.time())
+        with self._lock:
+            self._processes[model_id] = process
+            if self._thread is None or not self._thread.is_alive():
+                self._stop_event.clear()
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        logger.debug(f"Tracking hardware usage of model {model_id} (pid {pid})")
+
+    def untrack(self, model_id: str):
+        with self._lock:
+            self._processes.pop(model_id, None)
+            self._history.pop(model_id, None)
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def latest(self, model_id: str):
+        """
+        Retrieves the latest sample of a model process.
+
+        Args:
+            model_id (str): The ID of the model.
+
+        Returns:
+            dict: The sample, or None if the model is not tracked or not sampled yet.
+        """
+        with self._lock:
+            history = self._history.get(model_id)
+            return history[-1] if history else None
+
+    def history(self, model_id: str, since: float = None):
+        """
+        Retrieves the sampled history of a model process.
+
+        Args:
+            model_id (str): The ID of the model.
+            since (float, optional): Only samples taken after this Unix timestamp are returned.
+
+        Returns:
+            list: The samples, oldest first, or None if the model is not tracked.
+        """
+        with self._lock:
+            history = self._history.get(model_id)
+            if history is None:
+                return None
+            return [sample for sample in history if since is None or sample["timestamp"] > since]
+
+    def _run(self):
+        # NVML is initialised in the sampling thread so importing this module stays cheap
+        if self._gpu_reader is None:
+            self._gpu_reader = _GPUReader()
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(f"Failed to sample hardware usage: {str(e)}")
+            self._stop_event.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def sample(self):
+        """
+        Takes one sample of every tracked process and appends it to their history.
+        """
+        with self._lock:
+            processes = list(self._processes.items())
+        gpu_usage = self._gpu_reader.read() if self._gpu_reader is not None and self._gpu_reader.available else {}
+        now = time.time()
+
+        for model_id, process in processes:
+            self._sample_process(model_id, process, gpu_usage, now)
+
+    def _sample_process(self, model_id, process, gpu_usage, now):
+        try:
+            with process.oneshot():
+                memory_info = process.memory_info()
+                sample = {
+                    "timestamp": now,
+                    "cpu_percent": round(process.cpu_percent(None), 2),
+                    "memory_used_mb": round(memory_info.rss / (1024 * 1024), 2),
+                    "memory_percent": round(process.memory_percent(), 2),
+                    "num_threads": process.num_threads(),
+                }
+        except psutil.NoSuchProcess:
+            logger.warning(f"Process of model {model_id} (pid {process.pid}) is gone, no longer tracked")
+            self.untrack(model_id)
+            return
+
+        gpu_available = self._gpu_reader is not None and self._gpu_reader.available
+        gpu = gpu_usage.get(process.pid)
+        sample["gpu_memory_used_mb"] = round(gpu["memory_mb"], 2) if gpu else None
+        sample["gpu_memory_percent"] = round(100 * gpu["memory_mb"] / gpu["total_mb"], 2) if gpu and gpu["total_mb"] else None
+        sample["gpu_utilization_percent"] = gpu["utilization"] if gpu else (0 if gpu_available else None)
+
+        with self._lock:
+            history = self._history.get(model_id)
+            if history is not None:
+                history.append(sample)
@@ -0,0 +1,169 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+
+class ImageCache:
+    """
+    The ImageCache class is a small LRU cache of decoded images keyed by file path and mtime,
+    so an image that changes on disk is decoded again while repeated requests reuse the decode.
+    """
+
+    def __init__(self, capacity: int = 16):
+        """
+        Initializes the ImageCache instance.
+
+        Args:
+            capacity (int): The maximum number of decoded images kept in memory.
+        """
+        self.capacity = capacity
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+            return image
+
+    def put(self, key, image):
+        with self._lock:
+            self._images[key] = image
+            self._images.move_to_end(key)
+            while len(self._images) > self.capacity:
+                self._images.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+
+
+image_cache = ImageCache()
+
+
+class PreprocessedImage:
+    """
+    The PreprocessedImage class holds a decoded image together with the downsized copy handed to the model.
+
+    Attributes:
+        original (PIL.Image.Image): The decoded image at full resolution, used for visualisation.
+        resized (PIL.Image.Image): The image downsized to the model's expected resolution, used for inference.
+        scale (float): The factor mapping coordinates of the resized image back to the original image.
+    """
+
+    def __init__(self, original: Image.Image, resized: Image.Image):
+        self.original = original
+        self.resized = resized
+        self.scale = original.size[0] / resized.size[0]
+
+
+def load_image(image_path: str) -> Image.Image:
+    """
+    Decodes an image file into an RGB PIL image, reusing the cached decode when the file is unchanged.
+
+    Args:
+        image_path (str): The path of the image file.
+
+    Returns:
+        PIL.Image.Image: The decoded image. It is shared between callers and must not be modified in place.
+
+    Raises:
+        FileNotFoundError: If the image file does not exist.
+    """
+    abs_path = os.path.abspath(image_path)
+    key = (abs_path, os.stat(abs_path).st_mtime_ns)
+
+    image = image_cache.get(key)
+    if image is not None:
+        logger.debug(f"Image cache hit: {abs_path}")
+        return image
+
+    with Image.open(abs_path) as img:
+        image = img.convert("RGB")
+    image_cache.put(key, image)
+    logger.debug(f"Image decoded and cached: {abs_path}")
+    return image
+
+
+def preprocess_image(image_path: str, max_edge: int = None, min_edge: int = None) -> PreprocessedImage:
+    """
+    Decodes an image once and downsizes it to the resolution the model expects.
+    Images are only ever downsized, the aspect ratio is preserved.
+
+    Args:
+        image_path (str): The path of the image file.
+        max_edge (int, optional): The longest edge the model accepts.
+        min_edge (int, optional): The shortest edge the model resizes to.
+
+    Returns:
+        PreprocessedImage: The original and resized images.
+    """
+    original = load_image(image_path)
+    width, height = original.size
+
+    # same rule the image processors apply: short edge to min_edge, capped so the long edge stays within max_edge
+    ratio = 1.0
+    if min_edge:
+        ratio = min(ratio, min_edge / min(width, height))
+    if max_edge:
+        ratio = min(ratio, max_edge / max(width, height))
+
+    if ratio >= 1.0:
+        return PreprocessedImage(original, original)
+
+    new_size = (max(1, round(width * ratio)), max(1, round(height * ratio)))
+    logger.info(f"Downsizing image from {original.size} to {new_size}")
+    return PreprocessedImage(original, original.resize(new_size, Image.BILINEAR))
+
+
+def get_processor_target_size(processor):
+    """
+    Reads the resolution an image processor resizes its inputs to.
+
+    Args:
+        processor: A transformers image processor (or a processor wrapping one).
+
+    Returns:
+        tuple: (max_edge, min_edge), either of which may be None when unknown.
+    """
+    image_processor = getattr(processor, "image_processor", processor)
+    size = getattr(image_processor, "size", None)
+    if not isinstance(size, dict):
+        return None, None
+
+    if size.get("height") and size.get("width"):
+        return max(size["height"], size["width"]), None
+    return size.get("longest_edge"), size.get("shortest_edge")
+
+
+def rescale_predictions(predictions, preprocessed: PreprocessedImage):
+    """
+    Maps predictions made on the resized image back to the coordinates of the original image.
+
+    Args:
+        predictions (list): Detection or segmentation outputs in the transformers or YOLO format.
+        preprocessed (PreprocessedImage): The image the predictions were made on.
+
+    Returns:
+        list: The predictions in original image coordinates.
+    """
+    if preprocessed.scale == 1.0 or not isinstance(predictions, list):
+        return predictions
+
+    scale = preprocessed.scale
+    for item in predictions:
+        if not isinstance(item, dict):
+            continue
+        if isinstance(item.get("box"), dict):  # transformers detection format
+            item["box"] = {key: round(value * scale) for key, value in item["box"].items()}
+        if isinstance(item.get("coordinates"), list):  # YOLO format
+            item["coordinates"] = [value * scale for value in item["coordinates"]]
+        if isinstance(item.get("mask"), Image.Image):  # segmentation format
+            item["mask"] = item["mask"].resize(preprocessed.original.size, Image.NEAREST)
+    return predictions
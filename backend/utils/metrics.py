@@ -0,0 +1,216 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# latency buckets in seconds, from fast JSON reads to long generations
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _format_labels(labelnames, labelvalues, extra: dict = None):
+    pairs = list(zip(labelnames, labelvalues)) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects the labels {', '.join(self.labelnames)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def snapshot(self):
+        """
+        Creates a picklable copy of the metric, so metrics recorded in a model process can be exposed by the server.
+
+        Returns:
+            dict: The metric definition and its values keyed by label values.
+        """
+        with self._lock:
+            values = {key: (list(value) if isinstance(value, list) else value) for key, value in self._values.items()}
+        return {"type": self.type, "documentation": self.documentation, "labelnames": self.labelnames,
+                "buckets": getattr(self, "buckets", None), "values": values}
+
+
+class Counter(_Metric):
+    """
+    A monotonically increasing count, e.g. of errors or cache hits.
+    """
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Histogram(_Metric):
+    """
+    A distribution of observed durations over fixed buckets, with their sum and count.
+    """
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            # per bucket counts followed by the sum and the count of all observations
+            values = self._values.setdefault(key, [0] * (len(self.buckets) + 2))
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                values[index] += 1
+            values[-2] += value
+            values[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+
+class MetricsRegistry:
+    """
+    The MetricsRegistry class holds the metrics of a process and renders them in the Prometheus text format.
+    Model processes keep their own registry, the server merges their snapshots into its exposition.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric: _Metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def reset(self):
+        """
+        Clears every value. Model processes call it on start, a forked process would otherwise
+        report the values it inherited from the server a second time.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            with metric._lock:
+                metric._values.clear()
+
+    def snapshot(self):
+        """
+        Creates a picklable copy of every metric with at least one value.
+
+        Returns:
+            dict: The metric snapshots keyed by name.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: snapshot for metric in metrics if (snapshot := metric.snapshot())["values"]}
+
+    def render(self, extra_snapshots: list = None):
+        """
+        Renders the metrics of this process and of other processes in the Prometheus text format.
+
+        Args:
+            extra_snapshots (list, optional): Snapshots taken in other processes. Values under the same
+                name and labels are added up.
+
+        Returns:
+            str: The exposition.
+        """
+        merged = {}
+        for snapshot in [self.snapshot()] + list(extra_snapshots or []):
+            for name, metric in snapshot.items():
+                target = merged.setdefault(name, {**metric, "values": {}})
+                for key, value in metric["values"].items():
+                    if isinstance(value, list):
+                        current = target["values"].get(key, [0] * len(value))
+                        target["values"][key] = [a + b for a, b in zip(current, value)]
+                    else:
+                        target["values"][key] = target["values"].get(key, 0) + value
+
+        lines = []
+        for name in sorted(merged):
+            metric = merged[name]
+            lines.append(f"# HELP {name} {metric['documentation']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for key, value in sorted(metric["values"].items()):
+                if metric["type"] == "counter":
+                    lines.append(f"{name}{_format_labels(metric['labelnames'], key)} {_format_value(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric["buckets"], value[:-2]):
+                    cumulative += count
+                    labels = _format_labels(metric["labelnames"], key, {"le": _format_value(bound)})
+                    lines.append(f"{name}_bucket{labels} {cumulative}")
+                labels = _format_labels(metric["labelnames"], key, {"le": "+Inf"})
+                lines.append(f"{name}_bucket{labels} {value[-1]}")
+                lines.append(f"{name}_sum{_format_labels(metric['labelnames'], key)} {_format_value(value[-2])}")
+                lines.append(f"{name}_count{_format_labels(metric['labelnames'], key)} {value[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "Time spent serving HTTP requests", ["method", "route", "status"]
+)
+HTTP_REQUEST_ERRORS = registry.counter(
+    "http_request_errors_total", "HTTP requests answered with a server error", ["method", "route", "status"]
+)
+STAGE_SECONDS = registry.histogram(
+    "stage_duration_seconds",
+    "Time spent per model and stage (queue_wait, ipc, worker, preprocess, forward, postprocess, retrieval, ...)",
+    ["model_id", "stage"]
+)
+MODEL_ERRORS = registry.counter("model_errors_total", "Failed model requests", ["model_id", "task"])
+JSON_IO_SECONDS = registry.histogram("json_io_duration_seconds", "Time spent reading and writing JSON files", ["operation"])
+CACHE_REQUESTS = registry.counter("cache_requests_total", "Cache lookups by cache and result (hit or miss)", ["cache", "result"])
+EXECUTOR_REJECTIONS = registry.counter(
+    "executor_rejections_total", "Requests rejected because their workload executor was full", ["workload"]
+)
+
+
+def observe_stage(model_id: str, stage: str):
+    """
+    Times a stage of a model request.
+
+    Args:
+        model_id (str): The ID of the model, or of the embedding model for retrieval stages.
+        stage (str): The name of the stage.
+
+    Returns:
+        A context manager recording the duration of its block.
+    """
+    return STAGE_SECONDS.time(model_id=model_id, stage=stage)
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
@@ -6,18 +6,17 @@ import cv2
 import json
 import colorsys
 import os
-import uuid
 import matplotlib.pyplot as plt
 import io
 import base64
 from io import BytesIO
-from backend.core.config import ROOT_DIR
+from backend.utils.results_store import results_store
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def process_vision_output(image, output, task):
+def process_vision_output(image, output, task, delivery="url"):
     logger.info(f"Image type: {type(image)}")
     logger.info(f"Output type: {type(output)}")
     logger.info(f"Task: {task}")
@@ -44,16 +43,19 @@ def process_vision_output(image, output, task):
         logger.error(f"Error in visualise_output: {str(e)}")
         raise ValueError(f"Error visualizing output: {str(e)}")
 
-    image_filename = f"image_result_{uuid.uuid4().hex}.png"
-    output_dir = os.path.join(ROOT_DIR, "static", "results")
-    image_path = os.path.join(output_dir, image_filename)
+    # encode in memory so that identical visualisations map to the same stored file
+    buffer = io.BytesIO()
+    result_image.save(buffer, format="PNG")
 
-    os.makedirs(output_dir, exist_ok=True)
-    result_image.save(image_path)
+    delivered = results_store.deliver(buffer.getvalue(), "png", delivery)
 
-    return {
-        "image_url": image_path
-    }
+    result = {}
+    if "content" in delivered:
+        result["image_content"] = delivered["content"]
+    if "path" in delivered:
+        result["image_url"] = delivered["path"]
+        result["result_url"] = delivered["url"]
+    return result
 
 def _ensure_json_serializable(obj):
     try:
@@ -0,0 +1,234 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from backend.core.config import PROFILE_SAMPLE_INTERVAL, PROFILES_DIR
+from backend.core.exceptions import ModelError
+
+logger = logging.getLogger(__name__)
+
+# the number of functions and torch operators listed in a profile summary
+TOP_ENTRIES = 20
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    The StackSampler class is a sampling profiler for one thread: a background thread reads the stack of
+    the target thread every interval and counts identical stacks. Unlike cProfile it does not hook every
+    call, so profiling a model process barely slows it down.
+    """
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_SAMPLE_INTERVAL):
+        """
+        Initializes the StackSampler instance.
+
+        Args:
+            thread_id (int): The ident of the thread to sample.
+            interval (float): The number of seconds between two samples.
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.idle_samples = 0
+        # set while the target thread waits for work, such samples are only counted
+        self.idle = False
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self, max_duration: float = None):
+        """
+        Starts sampling in a background thread.
+
+        Args:
+            max_duration (float, optional): Sampling stops by itself after this many seconds,
+                so a profile that is never stopped does not run forever.
+        """
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, args=(max_duration,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self, max_duration):
+        deadline = time.monotonic() + max_duration if max_duration else None
+        while not self._stop_event.wait(self.interval):
+            if deadline and time.monotonic() > deadline:
+                break
+            if self.idle:
+                self.idle_samples += 1
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(labels))] += 1
+
+    def collapsed(self):
+        """
+        Renders the samples in the collapsed stack format read by flamegraph.pl, speedscope and inferno.
+
+        Returns:
+            str: One "root;...;leaf count" line per distinct stack.
+        """
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, limit: int = TOP_ENTRIES):
+        """
+        Summarises the samples per function.
+
+        Args:
+            limit (int): The number of functions to list.
+
+        Returns:
+            list: The functions with the most samples on top of the stack (self) and anywhere in it (total).
+        """
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for label in set(frames):
+                total[label] += count
+        samples = sum(self.stacks.values()) or 1
+        return [
+            {"function": label, "self_samples": count, "total_samples": total[label],
+             "self_percent": round(100 * count / samples, 2)}
+            for label, count in own.most_common(limit)
+        ]
+
+
+class WorkerProfiler:
+    """
+    The WorkerProfiler class profiles a model process on request of the server. Between a start and a stop
+    command the thread serving the pipe is sampled, and optionally the torch profiler records the operators
+    of the forward passes run in the meantime.
+    """
+
+    def __init__(self, model_id: str, profiles_dir: str = PROFILES_DIR):
+        """
+        Initializes the WorkerProfiler instance in the thread serving the model's requests.
+
+        Args:
+            model_id (str): The ID of the profiled model.
+            profiles_dir (str): The directory the stacks and torch traces are written to.
+        """
+        self.model_id = model_id
+        self.profiles_dir = profiles_dir
+        self.thread_id = threading.get_ident()
+        self._sampler = None
+        self._torch_profiler = None
+        self._started_at = None
+
+    @contextmanager
+    def waiting(self):
+        """
+        Marks the time the model process waits for its next request, which is reported as idle.
+        """
+        if self._sampler is not None:
+            self._sampler.idle = True
+        try:
+            yield
+        finally:
+            if self._sampler is not None:
+                self._sampler.idle = False
+
+    def start(self, duration: float, torch_trace: bool = False):
+        """
+        Starts profiling.
+
+        Args:
+            duration (float): The planned duration in seconds. Sampling stops by itself shortly after it.
+            torch_trace (bool): Whether to record the torch operators of forward passes as well.
+
+        Returns:
+            dict: The profiling status.
+
+        Raises:
+            ModelError: If the model is already being profiled.
+        """
+        if self._sampler is not None:
+            raise ModelError(f"Model {self.model_id} is already being profiled")
+        if torch_trace:
+            from torch.profiler import ProfilerActivity, profile
+            import torch
+
+            activities = [ProfilerActivity.CPU]
+            if torch.cuda.is_available():
+                activities.append(ProfilerActivity.CUDA)
+            self._torch_profiler = profile(activities=activities, record_shapes=True)
+            self._torch_profiler.start()
+
+        self._sampler = StackSampler(self.thread_id)
+        # a grace period covers a stop command queued behind a long request
+        self._sampler.start(max_duration=duration * 2 + 10)
+        self._started_at = time.time()
+        logger.info(f"Profiling model {self.model_id} for {duration} seconds")
+        return {"profiling": True, "torch_trace": torch_trace}
+
+    def stop(self):
+        """
+        Stops profiling and writes the collapsed stacks, and the torch trace if recorded, to the profiles directory.
+
+        Returns:
+            dict: The profile with its flamegraph-ready stacks, the top functions and the top torch operators.
+
+        Raises:
+            ModelError: If the model is not being profiled.
+        """
+        if self._sampler is None:
+            raise ModelError(f"Model {self.model_id} is not being profiled")
+        sampler, self._sampler = self._sampler, None
+        sampler.stop()
+        duration = time.time() - self._started_at
+
+        os.makedirs(self.profiles_dir, exist_ok=True)
+        name = f"{self.model_id.replace('/', '_')}_{int(self._started_at)}"
+        collapsed = sampler.collapsed()
+        stacks_path = os.path.join(self.profiles_dir, f"{name}.collapsed.txt")
+        with open(stacks_path, "w", encoding="utf-8") as f:
+            f.write(collapsed)
+
+        profile = {
+            "model_id": self.model_id,
+            "duration_seconds": round(duration, 2),
+            "sample_interval": sampler.interval,
+            "samples": sum(sampler.stacks.values()),
+            "idle_samples": sampler.idle_samples,
+            "top_functions": sampler.top_functions(),
+            "collapsed_stacks": collapsed,
+            "collapsed_stacks_path": stacks_path,
+            "torch_trace_path": None,
+            "torch_top_ops": None,
+        }
+
+        if self._torch_profiler is not None:
+            torch_profiler, self._torch_profiler = self._torch_profiler, None
+            torch_profiler.stop()
+            # the Chrome trace format opens in chrome://tracing and Perfetto
+            trace_path = os.path.join(self.profiles_dir, f"{name}.torch_trace.json")
+            torch_profiler.export_chrome_trace(trace_path)
+            profile["torch_trace_path"] = trace_path
+            events = sorted(torch_profiler.key_averages(), key=lambda event: event.self_cpu_time_total, reverse=True)
+            profile["torch_top_ops"] = [
+                {"name": event.key, "calls": event.count,
+                 "self_cpu_ms": round(event.self_cpu_time_total / 1000, 3),
+                 "cpu_total_ms": round(event.cpu_time_total / 1000, 3)}
+                for event in events[:TOP_ENTRIES]
+            ]
+
+        logger.info(f"Profiled model {self.model_id}: {profile['samples']} samples written to {stacks_path}")
+        return profile
@@ -0,0 +1,102 @@
+import logging
+import threading
+
+from backend.core.config import RAG_RERANK_BATCH_SIZE, RAG_RERANKER_MODEL
+
+logger = logging.getLogger(__name__)
+
+
+def _entry_text(entry):
+    # entries retrieved with provenance are dicts
+    return entry["text"] if isinstance(entry, dict) else entry
+
+
+class CrossEncoderReranker:
+    """
+    The CrossEncoderReranker class re-scores retrieved entries with a cross-encoder, which reads the query and
+    an entry together and ranks far better than the similarity of separately computed embeddings. It is too slow
+    to run over a whole dataset, so it only re-ranks the few candidates the vector search returned.
+    """
+
+    def __init__(self, model_name: str = RAG_RERANKER_MODEL, batch_size: int = RAG_RERANK_BATCH_SIZE):
+        """
+        Initializes the CrossEncoderReranker instance. The model is loaded on the first re-ranking.
+
+        Args:
+            model_name (str): The Hugging Face ID of the cross-encoder.
+            batch_size (int): The number of (query, entry) pairs scored per forward pass.
+        """
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        with self._lock:
+            if self._model is None:
+                from sentence_transformers import CrossEncoder
+
+                logger.info(f"Loading cross-encoder: {self.model_name}")
+                self._model = CrossEncoder(self.model_name)
+            return self._model
+
+    def count_tokens(self, text: str):
+        return len(self._get_model().tokenizer.tokenize(text))
+
+    def rerank(self, query: str, entries: list, top_k: int, token_budget: int = None, count_tokens=None):
+        """
+        Orders entries by relevance to the query and keeps the best that fit in the token budget.
+
+        Args:
+            query (str): The query.
+            entries (list): The candidate entries, as strings or dicts with a "text" key.
+            top_k (int): The maximum number of entries to keep.
+            token_budget (int, optional): The maximum number of tokens of the kept entries together. Entries that
+                do not fit are skipped in favour of shorter, lower ranked ones.
+            count_tokens (callable, optional): Counts the tokens of a text, by default with the cross-encoder's
+                tokenizer. Pass the tokenizer of the generating model to budget its prompt exactly.
+
+        Returns:
+            list: The kept entries, most relevant first.
+        """
+        if not entries:
+            return []
+        model = self._get_model()
+        scores = model.predict([(query, _entry_text(entry)) for entry in entries], batch_size=self.batch_size,
+                               show_progress_bar=False)
+        ranked = [entry for _, entry in sorted(zip(scores, entries), key=lambda pair: pair[0], reverse=True)]
+
+        count_tokens = count_tokens or self.count_tokens
+        kept, used_tokens = [], 0
+        for entry in ranked:
+            if len(kept) >= top_k:
+                break
+            if token_budget is not None:
+                tokens = count_tokens(_entry_text(entry))
+                if used_tokens + tokens > token_budget:
+                    continue
+                used_tokens += tokens
+            kept.append(entry)
+        logger.info(f"Re-ranked {len(entries)} candidates, kept {len(kept)}"
+                    + (f" using {used_tokens} of {token_budget} tokens" if token_budget is not None else ""))
+        return kept
+
+
+_rerankers = {}
+_rerankers_lock = threading.Lock()
+
+
+def get_reranker(model_name: str = RAG_RERANKER_MODEL):
+    """
+    Retrieves the re-ranker of a cross-encoder, shared by every model of the process so it is loaded once.
+
+    Args:
+        model_name (str): The Hugging Face ID of the cross-encoder.
+
+    Returns:
+        CrossEncoderReranker: The re-ranker.
+    """
+    with _rerankers_lock:
+        if model_name not in _rerankers:
+            _rerankers[model_name] = CrossEncoderReranker(model_name)
+        return _rerankers[model_name]
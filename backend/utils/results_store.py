@@ -0,0 +1,171 @@
+import base64
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+
+from backend.core.config import RESULTS_DIR, RESULTS_MAX_AGE_SECONDS, RESULTS_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+# "inline" returns the artefact bytes base64 encoded in the response body,
+# "url" persists the artefact and returns where to fetch it, "both" does both
+DELIVERY_MODES = ("inline", "url", "both")
+
+RESULTS_ROUTE = "/model/results"
+
+_FILENAME_PATTERN = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]+$")
+
+
+class ResultsStore:
+    """
+    The ResultsStore class persists generated artefacts under content-addressed filenames.
+    Identical outputs map to the same file, so repeated requests do not write to disk again,
+    and the directory is kept within a size and age budget by a garbage collector.
+    """
+
+    def __init__(self, results_dir: str = RESULTS_DIR, max_bytes: int = RESULTS_MAX_BYTES,
+                 max_age_seconds: int = RESULTS_MAX_AGE_SECONDS, gc_interval_seconds: int = 60):
+        """
+        Initializes the ResultsStore instance.
+
+        Args:
+            results_dir (str): The directory the artefacts are written to.
+            max_bytes (int): The maximum total size of the directory before old artefacts are evicted.
+            max_age_seconds (int): The age after which an artefact is evicted.
+            gc_interval_seconds (int): The minimum time between two automatic garbage collections.
+        """
+        self.results_dir = results_dir
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.gc_interval_seconds = gc_interval_seconds
+        self._last_gc = 0.0
+        self._lock = threading.Lock()
+
+    def save(self, data: bytes, extension: str) -> str:
+        """
+        Writes the artefact to the results directory unless an identical one already exists.
+
+        Args:
+            data (bytes): The content of the artefact.
+            extension (str): The file extension without the leading dot, e.g. "png".
+
+        Returns:
+            str: The content-addressed filename of the artefact.
+        """
+        filename = f"{hashlib.sha256(data).hexdigest()}.{extension.lower()}"
+        file_path = os.path.join(self.results_dir, filename)
+
+        if os.path.exists(file_path):
+            # refresh the mtime so the garbage collector treats the artefact as recently used
+            os.utime(file_path, None)
+            logger.debug(f"Result artefact already stored: {file_path}")
+        else:
+            os.makedirs(self.results_dir, exist_ok=True)
+            temp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, file_path)
+            logger.info(f"Result artefact saved to {file_path}")
+
+        self._maybe_collect_garbage()
+        return filename
+
+    def get_path(self, filename: str) -> str:
+        """
+        Resolves a filename previously returned by save to its path on disk.
+
+        Args:
+            filename (str): The content-addressed filename.
+
+        Returns:
+            str: The absolute path of the artefact.
+
+        Raises:
+            ValueError: If the filename is not a valid content-addressed filename.
+            FileNotFoundError: If the artefact does not exist (or has been collected).
+        """
+        if not _FILENAME_PATTERN.match(filename):
+            raise ValueError(f"Invalid result filename: {filename}")
+        file_path = os.path.join(self.results_dir, filename)
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Result not found: {filename}")
+        return file_path
+
+    def deliver(self, data: bytes, extension: str, delivery: str) -> dict:
+        """
+        Packages an artefact for an API response according to the requested delivery mode.
+
+        Args:
+            data (bytes): The content of the artefact.
+            extension (str): The file extension without the leading dot.
+            delivery (str): One of DELIVERY_MODES.
+
+        Returns:
+            dict: "content" holds the base64 encoded artefact for inline delivery,
+            "path" and "url" hold the local file path and the streaming URL for url delivery.
+
+        Raises:
+            ValueError: If the delivery mode is not supported.
+        """
+        if delivery not in DELIVERY_MODES:
+            raise ValueError(f"Invalid delivery mode: {delivery}. Use one of {', '.join(DELIVERY_MODES)}.")
+
+        result = {}
+        if delivery in ("inline", "both"):
+            result["content"] = base64.b64encode(data).decode("utf-8")
+        if delivery in ("url", "both"):
+            filename = self.save(data, extension)
+            result["path"] = os.path.join(self.results_dir, filename)
+            result["url"] = f"{RESULTS_ROUTE}/{filename}"
+        return result
+
+    def collect_garbage(self):
+        """
+        Evicts artefacts older than max_age_seconds, then the least recently used ones
+        until the directory fits within max_bytes.
+
+        Returns:
+            dict: The number of removed files and the bytes freed.
+        """
+        with self._lock:
+            self._last_gc = time.time()
+            if not os.path.isdir(self.results_dir):
+                return {"removed": 0, "freed_bytes": 0}
+
+            entries = []
+            for entry in os.scandir(self.results_dir):
+                if entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            # oldest first
+            entries.sort()
+
+            now = time.time()
+            total_bytes = sum(size for _, size, _ in entries)
+            removed = 0
+            freed_bytes = 0
+            for mtime, size, path in entries:
+                if now - mtime <= self.max_age_seconds and total_bytes <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning(f"Failed to remove result artefact {path}: {str(e)}")
+                    continue
+                total_bytes -= size
+                freed_bytes += size
+                removed += 1
+
+            if removed:
+                logger.info(f"Removed {removed} result artefacts ({freed_bytes} bytes) from {self.results_dir}")
+            return {"removed": removed, "freed_bytes": freed_bytes}
+
+    def _maybe_collect_garbage(self):
+        if time.time() - self._last_gc >= self.gc_interval_seconds:
+            self.collect_garbage()
+
+
+results_store = ResultsStore()
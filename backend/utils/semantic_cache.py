@@ -0,0 +1,87 @@
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from backend.core.config import SEMANTIC_CACHE_MAX_DISTANCE, SEMANTIC_CACHE_MAX_SCOPES, SEMANTIC_CACHE_SIZE
+from backend.utils.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticResponseCache:
+    """
+    The SemanticResponseCache class keeps generated answers with the embeddings of their queries. A new query
+    whose embedding is close enough to a cached one is answered from the cache, so repeated and rephrased
+    FAQ-style questions skip retrieval and generation. Answers are only shared within a scope, e.g. the same
+    model config and dataset version; scopes and the answers within them are evicted least recently used first.
+    """
+
+    def __init__(self, max_entries: int = SEMANTIC_CACHE_SIZE, max_scopes: int = SEMANTIC_CACHE_MAX_SCOPES):
+        """
+        Initializes the SemanticResponseCache instance.
+
+        Args:
+            max_entries (int): The number of answers kept per scope.
+            max_scopes (int): The number of scopes kept.
+        """
+        self.max_entries = max_entries
+        self.max_scopes = max_scopes
+        self._scopes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, scope, query_vector: np.ndarray, max_distance: float = SEMANTIC_CACHE_MAX_DISTANCE):
+        """
+        Finds the cached answer of the most similar query of a scope.
+
+        Args:
+            scope (hashable): The scope of the query.
+            query_vector (np.ndarray): The L2-normalised embedding of the query.
+            max_distance (float): The maximum cosine distance between the query and a cached query.
+
+        Returns:
+            The cached answer, or None if no cached query is close enough.
+        """
+        query_vector = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+        answer = None
+        with self._lock:
+            entries = self._scopes.get(scope)
+            if entries:
+                self._scopes.move_to_end(scope)
+                queries = list(entries)
+                similarities = np.stack([entries[query][0] for query in queries]) @ query_vector
+                best = int(np.argmax(similarities))
+                if 1.0 - similarities[best] <= max_distance:
+                    entries.move_to_end(queries[best])
+                    answer = entries[queries[best]][1]
+                    logger.info(f"Semantic cache hit at cosine distance {1.0 - similarities[best]:.4f}")
+        record_cache_lookup("semantic_response", answer is not None)
+        return answer
+
+    def store(self, scope, query: str, query_vector: np.ndarray, answer):
+        """
+        Caches the answer to a query.
+
+        Args:
+            scope (hashable): The scope of the query.
+            query (str): The query.
+            query_vector (np.ndarray): The L2-normalised embedding of the query.
+            answer: The generated answer.
+        """
+        with self._lock:
+            entries = self._scopes.setdefault(scope, OrderedDict())
+            self._scopes.move_to_end(scope)
+            entries[query] = (np.asarray(query_vector, dtype=np.float32).reshape(-1), answer)
+            entries.move_to_end(query)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+            while len(self._scopes) > self.max_scopes:
+                self._scopes.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._scopes.clear()
+
+
+semantic_response_cache = SemanticResponseCache()
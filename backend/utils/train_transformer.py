@@ -1,32 +1,90 @@
 import os
 import shutil
+import time
 import numpy as np
 from datasets import load_dataset
-from transformers import DataCollatorWithPadding, Trainer, TrainingArguments
+from transformers import DataCollatorWithPadding, Trainer, TrainerCallback, TrainingArguments
 import evaluate
-from backend.core.config import ROOT_DIR
-from backend.utils.helpers import get_next_suffix
-from backend.models.transformer_model import TransformerModel
-import json
-import torch
+from backend.core.config import ROOT_DIR, TOKENIZATION_NUM_PROC, TOKENIZATION_PARALLEL_MIN_ROWS
+from backend.utils.adapters import add_lora_adapter, save_adapter
 
-def train_transformer(transformer_model, dataset_path, tokenizer_args, training_args, trained_model_dir):
+
+class ProgressCallback(TrainerCallback):
+    """
+    Reports structured training telemetry to a reporter callable: a "step" event with the loss,
+    throughput and estimated time left for every training log, and an "epoch" event with the
+    evaluation metrics after every evaluation.
+    """
+
+    def __init__(self, reporter):
+        self.reporter = reporter
+        self.start_time = None
+
+    def on_train_begin(self, args, state, control, **kwargs):
+        self.start_time = time.time()
+
+    def on_log(self, args, state, control, logs=None, **kwargs):
+        # evaluation logs are reported by on_evaluate
+        if not logs or "loss" not in logs or not state.global_step:
+            return
+        self.reporter({
+            "event": "step",
+            **self._progress(args, state),
+            "loss": logs.get("loss"),
+            "learning_rate": logs.get("learning_rate"),
+            "grad_norm": logs.get("grad_norm"),
+        })
+
+    def on_evaluate(self, args, state, control, metrics=None, **kwargs):
+        self.reporter({
+            "event": "epoch",
+            **self._progress(args, state),
+            **{key: value for key, value in (metrics or {}).items() if isinstance(value, (int, float))},
+        })
+
+    def _progress(self, args, state):
+        elapsed = time.time() - self.start_time
+        steps_per_second = state.global_step / elapsed if elapsed and state.global_step else None
+        remaining_steps = max(state.max_steps - state.global_step, 0)
+        return {
+            "step": state.global_step,
+            "max_steps": state.max_steps,
+            "epoch": state.epoch,
+            "samples_per_second": round(steps_per_second * args.train_batch_size, 2) if steps_per_second else None,
+            "elapsed_seconds": round(elapsed, 2),
+            "eta_seconds": round(remaining_steps / steps_per_second, 2) if steps_per_second else None,
+        }
+
+
+def train_transformer(transformer_model, dataset_path, tokenizer_args, training_args, trained_model_dir, reporter=None, lora_config=None):
     dataset = load_dataset('csv', data_files=dataset_path)
     dataset = dataset["train"]
 
     model = transformer_model.pipeline_args.get("model")
     tokenizer = transformer_model.pipeline_args.get("tokenizer")
-    
-    def _preprocess_function(data_entry):
-        tokenizer_params = {
-            "padding": "max_length",
-            "truncation": True,
-            "max_length": 128
-        }
-        tokenizer_params.update(tokenizer_args)
-        return tokenizer(data_entry['text'], **tokenizer_params)
+    if lora_config is not None:
+        # only the adapters and the classification head are trained, the base weights stay frozen
+        model = add_lora_adapter(model, lora_config)
 
-    dataset = dataset.map(_preprocess_function)
+    group_by_length = training_args.get("group_by_length", False)
+    tokenizer_params = {
+        "truncation": True,
+        "max_length": 128
+    }
+    tokenizer_params.update(tokenizer_args)
+
+    def _preprocess_function(data_entries):
+        # no padding here, the data collator pads each batch to its longest text
+        encodings = tokenizer(data_entries['text'], **tokenizer_params)
+        if group_by_length:
+            # precomputed lengths spare the length-grouped sampler a pass over the dataset
+            encodings["length"] = [len(input_ids) for input_ids in encodings["input_ids"]]
+        return encodings
+
+    # tokenising in several processes only pays off once the dataset outweighs their start-up cost;
+    # the tokenised dataset is cached as Arrow files next to the loaded CSV and reused by later runs
+    num_proc = TOKENIZATION_NUM_PROC if len(dataset) >= TOKENIZATION_PARALLEL_MIN_ROWS else None
+    dataset = dataset.map(_preprocess_function, batched=True, num_proc=num_proc)
     dataset = dataset.train_test_split(test_size=0.2)
 
     data_collator = DataCollatorWithPadding(tokenizer=tokenizer)
@@ -37,9 +95,8 @@ def train_transformer(transformer_model, dataset_path, tokenizer_args, training_
         predictions = np.argmax(predictions, axis=1)
         return accuracy.compute(predictions=predictions, references=labels)
 
-    suffix = get_next_suffix(model_id)
-    trained_model_dir = os.path.join(f"{transformer_model.model_dir}_{suffix}")
-    temp_output_dir = os.path.join(ROOT_DIR, "temp")
+    # one output directory per run, so concurrent training jobs do not share checkpoints
+    temp_output_dir = os.path.join(ROOT_DIR, "temp", f"train_{os.getpid()}")
 
     os.makedirs(temp_output_dir, exist_ok=True)
 
@@ -52,9 +109,15 @@ def train_transformer(transformer_model, dataset_path, tokenizer_args, training_
         "eval_strategy": "epoch",
         "save_strategy": "epoch",
         "save_total_limit": 3,
-        "load_best_model_at_end": True
+        "load_best_model_at_end": True,
+        "logging_steps": 10,
+        "disable_tqdm": True
     }
 
+    if lora_config is not None:
+        # adapters start from zero and need a far larger learning rate than full fine-tuning
+        default_training_args["learning_rate"] = 2e-4
+
     default_training_args.update(training_args)
     training_args = TrainingArguments(**default_training_args)
 
@@ -66,32 +129,14 @@ def train_transformer(transformer_model, dataset_path, tokenizer_args, training_
         tokenizer=tokenizer,
         data_collator=data_collator,
         compute_metrics=compute_metrics,
+        callbacks=[ProgressCallback(reporter)] if reporter else None,
     )
 
-    trainer.train()
-    trainer.save_model(trained_model_dir)
-
-    shutil.rmtree(temp_output_dir, ignore_errors=True)
-
-if __name__ == "__main__":
-
-    train_args_path = "data/temp_train_args.json"
-    with open(train_args_path, 'r') as f:
-        args = json.load(f)
-    
-    shutil.rmtree(train_args_path, ignore_errors=True)
-    
-    model_id = args.pop('model_id')
-    hardware_preference = args.pop('hardware_preference')
-    model_info = args.pop('model_info')
-    
-    device = torch.device("cuda" if hardware_preference == "gpu" and torch.cuda.is_available() else "cpu")
-    
-    transformer_model = TransformerModel(model_id=model_id)
-    transformer_model.load(device=device, model_info=model_info)
-    
-    train_transformer(transformer_model, **args)
-    print("=====training complete=====")
-
-    # Delete the temp_train_args.json file
-    os.remove("data/temp_train_args.json")
+    try:
+        trainer.train()
+        if lora_config is not None:
+            save_adapter(trainer.model, trained_model_dir)
+        else:
+            trainer.save_model(trained_model_dir)
+    finally:
+        shutil.rmtree(temp_output_dir, ignore_errors=True)
@@ -0,0 +1,293 @@
+import copy
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+
+from backend.core.config import TRAINING_MAX_CONCURRENT_JOBS, TRAINING_RUNS_DIR
+from backend.core.exceptions import ModelError
+from backend.utils.training_telemetry import TrainingTelemetry
+
+logger = logging.getLogger(__name__)
+
+# job statuses
+QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED = "queued", "running", "completed", "failed", "cancelled"
+
+# the number of metric events kept per job for clients connecting late
+MAX_METRICS_HISTORY = 1000
+
+
+def training_model_info(model_info: dict):
+    """
+    Derives the library entry a model is loaded with for training from the one it is served with.
+    Serving options such as an onnxruntime session or a quantized model produce a model the Trainer cannot
+    train, so training always loads the torch model in its stored precision.
+
+    Args:
+        model_info (dict): The library entry of the model.
+
+    Returns:
+        dict: A copy of the entry without the serving runtime and quantization.
+    """
+    model_info = copy.deepcopy(model_info)
+    config = model_info.setdefault("config", {})
+    config["runtime"] = "torch"
+    config.pop("quantization_config", None)
+    return model_info
+
+
+def _training_process(model_class, model_id, model_info, data, device, events, num_threads, log_path):
+    """
+    Runs one training job in its own process and reports to the parent through the events queue.
+
+    Args:
+        model_class (class): The class of the model to train.
+        model_id (str): The ID of the model to train.
+        model_info (dict): The library entry of the model.
+        data (dict): The training request data.
+        device (torch.device): The device to train on.
+        events (multiprocessing.Queue): Receives metrics events, then a result or error event.
+        num_threads (int): The CPU threads this job may use, so concurrent jobs do not oversubscribe the CPU.
+        log_path (str): The JSON lines file the metric events of the run are persisted to.
+    """
+    import torch
+
+    torch.set_num_threads(num_threads)
+
+    report = TrainingTelemetry(events.put, log_path)
+
+    try:
+        model = model_class(model_id=model_id)
+        model.load(device=device, model_info=training_model_info(model_info))
+        result = model.train(data, reporter=report)
+        if isinstance(result, dict) and "error" in result:
+            events.put({"type": "error", "error": str(result["error"])})
+        else:
+            events.put({"type": "result", "result": result})
+    except Exception as e:
+        logger.error(f"Training process for model {model_id} failed: {str(e)}")
+        events.put({"type": "error", "error": str(e)})
+
+
+class TrainingJob:
+    """
+    The TrainingJob class tracks the status and live metrics of one training run.
+
+    Attributes:
+        job_id (str): The unique identifier of the job.
+        model_id (str): The ID of the model being trained.
+        status (str): One of queued, running, completed, failed or cancelled.
+        metrics (list): The latest metric events, numbered by a seq key, the latest last.
+        metrics_log_path (str): The JSON lines file holding every metric event of the run.
+        result (dict): The result returned by the model's train method once completed.
+        error (str): The error of a failed job.
+    """
+
+    def __init__(self, model_id: str, model_class, model_info: dict, data: dict, device, runs_dir: str = TRAINING_RUNS_DIR):
+        self.job_id = str(uuid.uuid4())
+        self.metrics_log_path = os.path.join(runs_dir, f"{self.job_id}.jsonl")
+        self.model_id = model_id
+        self.model_class = model_class
+        self.model_info = model_info
+        self.data = data
+        self.device = device
+        self.status = QUEUED
+        self.metrics = []
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.process = None
+        self.done_event = threading.Event()
+
+    def is_finished(self):
+        return self.status in (COMPLETED, FAILED, CANCELLED)
+
+    def to_dict(self):
+        """
+        Creates a dictionary representation of the job with its latest metrics.
+
+        Returns:
+            dict: The job status.
+        """
+        return {
+            "job_id": self.job_id,
+            "model_id": self.model_id,
+            "status": self.status,
+            "latest_metrics": self.metrics[-1] if self.metrics else None,
+            "metrics_log_path": self.metrics_log_path,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class TrainingJobManager:
+    """
+    The TrainingJobManager class runs training jobs in managed subprocesses under a resource budget.
+    Jobs beyond max_concurrent_jobs wait in a queue, running jobs share the CPU threads evenly,
+    and every job can be cancelled and followed through its metric events.
+    """
+
+    def __init__(self, on_complete=None, max_concurrent_jobs: int = TRAINING_MAX_CONCURRENT_JOBS,
+                 runs_dir: str = TRAINING_RUNS_DIR):
+        """
+        Initializes the TrainingJobManager instance.
+
+        Args:
+            on_complete (callable, optional): Called with (model_id, result) in the parent process when a job completes,
+                e.g. to register the trained model in the library. An exception fails the job.
+            max_concurrent_jobs (int): The number of jobs training at the same time.
+            runs_dir (str): The directory the metric logs of the runs are persisted to.
+        """
+        self.on_complete = on_complete
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.runs_dir = runs_dir
+        self.jobs = {}
+        self._pending = []
+        self._running = 0
+        self._lock = threading.Lock()
+
+    def submit(self, model_id: str, model_class, model_info: dict, data: dict, device):
+        """
+        Queues a training job.
+
+        Args:
+            model_id (str): The ID of the model to train.
+            model_class (class): The class of the model to train.
+            model_info (dict): The library entry of the model.
+            data (dict): The training request data.
+            device (torch.device): The device to train on.
+
+        Returns:
+            TrainingJob: The job.
+        """
+        job = TrainingJob(model_id, model_class, model_info, data, device, self.runs_dir)
+        with self._lock:
+            self.jobs[job.job_id] = job
+            self._pending.append(job)
+        logger.info(f"Training of model {model_id} queued as job {job.job_id}")
+        self._schedule()
+        return job
+
+    def get_job(self, job_id: str):
+        """
+        Retrieves a training job.
+
+        Args:
+            job_id (str): The ID of the job.
+
+        Returns:
+            TrainingJob: The job.
+
+        Raises:
+            KeyError: If the job does not exist.
+        """
+        if job_id not in self.jobs:
+            raise KeyError(f"Training job {job_id} not found")
+        return self.jobs[job_id]
+
+    def list_jobs(self):
+        return [job.to_dict() for job in self.jobs.values()]
+
+    def cancel(self, job_id: str):
+        """
+        Cancels a queued job, or terminates the process of a running one.
+
+        Args:
+            job_id (str): The ID of the job.
+
+        Returns:
+            TrainingJob: The job.
+
+        Raises:
+            KeyError: If the job does not exist.
+            ModelError: If the job has already finished.
+        """
+        job = self.get_job(job_id)
+        with self._lock:
+            if job.is_finished():
+                raise ModelError(f"Training job {job_id} is {job.status} and cannot be cancelled")
+            if job.status == QUEUED:
+                self._pending.remove(job)
+                self._finish(job, CANCELLED)
+                return job
+            job.status = CANCELLED
+        # the monitor thread sees the process exit and releases the job's budget
+        job.process.terminate()
+        logger.info(f"Training job {job_id} cancelled")
+        return job
+
+    def _schedule(self):
+        with self._lock:
+            while self._pending and self._running < self.max_concurrent_jobs:
+                job = self._pending.pop(0)
+                self._running += 1
+                self._start(job)
+
+    def _start(self, job: TrainingJob):
+        num_threads = max(1, (os.cpu_count() or 1) // self.max_concurrent_jobs)
+        events = multiprocessing.Queue()
+        job.process = multiprocessing.Process(
+            target=_training_process,
+            args=(job.model_class, job.model_id, job.model_info, job.data, job.device, events, num_threads, job.metrics_log_path)
+        )
+        job.status = RUNNING
+        job.started_at = time.time()
+        job.process.start()
+        threading.Thread(target=self._monitor, args=(job, events), daemon=True).start()
+        logger.info(f"Training job {job.job_id} started for model {job.model_id} (pid {job.process.pid})")
+
+    def _monitor(self, job: TrainingJob, events):
+        outcome = None
+        try:
+            while outcome is None:
+                try:
+                    event = events.get(timeout=1)
+                except queue.Empty:
+                    if not job.process.is_alive():
+                        break
+                    continue
+                if event["type"] == "metrics":
+                    # sequence numbers let followers pick up new events from the bounded history
+                    event["seq"] = job.metrics[-1]["seq"] + 1 if job.metrics else 1
+                    job.metrics.append(event)
+                    del job.metrics[:-MAX_METRICS_HISTORY]
+                else:
+                    outcome = event
+            job.process.join()
+
+            if job.status == CANCELLED:
+                self._finish(job, CANCELLED)
+            elif outcome is None:
+                job.error = f"Training process exited unexpectedly with code {job.process.exitcode}"
+                self._finish(job, FAILED)
+            elif outcome["type"] == "error":
+                job.error = outcome["error"]
+                self._finish(job, FAILED)
+            else:
+                job.result = outcome["result"]
+                if self.on_complete:
+                    self.on_complete(job.model_id, job.result)
+                self._finish(job, COMPLETED)
+        except Exception as e:
+            logger.error(f"Training job {job.job_id} failed after training: {str(e)}")
+            job.error = str(e)
+            self._finish(job, FAILED)
+        finally:
+            with self._lock:
+                self._running -= 1
+            self._schedule()
+
+    @staticmethod
+    def _finish(job: TrainingJob, status: str):
+        job.status = status
+        job.finished_at = time.time()
+        job.done_event.set()
+        logger.info(f"Training job {job.job_id} for model {job.model_id} {status}")
@@ -0,0 +1,105 @@
+import json
+import logging
+import os
+import time
+
+from backend.core.config import TRAINING_TELEMETRY_MIN_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+# step events are throttled, every other event (epoch ends, evaluations) is always sent
+STEP_EVENT = "step"
+
+
+class TrainingTelemetry:
+    """
+    The TrainingTelemetry class turns the metrics reported by training callbacks into structured events.
+    Step events are throttled to one per min_interval, every event is enriched with the CPU, memory and
+    GPU utilisation of the training process, appended to the run's JSON lines log and passed to a sink.
+    """
+
+    def __init__(self, sink, log_path: str = None, min_interval: float = TRAINING_TELEMETRY_MIN_INTERVAL):
+        """
+        Initializes the TrainingTelemetry instance.
+
+        Args:
+            sink (callable): Receives each event dict, e.g. the put method of the job's events queue.
+            log_path (str, optional): The JSON lines file the events of the run are persisted to.
+            min_interval (float): The minimum number of seconds between two step events.
+        """
+        self.sink = sink
+        self.log_path = log_path
+        self.min_interval = min_interval
+        self._last_step_time = 0.0
+        # imported here, telemetry only runs inside training processes
+        import psutil
+
+        self._process = psutil.Process()
+        # the first reading of cpu_percent only starts the measurement
+        self._process.cpu_percent(None)
+        if log_path:
+            os.makedirs(os.path.dirname(log_path), exist_ok=True)
+
+    def __call__(self, metrics: dict):
+        """
+        Emits a metrics event, unless it is a step event arriving within min_interval of the previous one.
+
+        Args:
+            metrics (dict): The metrics reported by a callback, "event" names the kind of event (default "step").
+        """
+        now = time.time()
+        event_name = metrics.get("event", STEP_EVENT)
+        if event_name == STEP_EVENT:
+            if now - self._last_step_time < self.min_interval:
+                return
+            self._last_step_time = now
+
+        event = {"type": "metrics", "event": event_name, "time": now}
+        event.update({key: value for key, value in metrics.items() if value is not None})
+        event.update(self._sample_hardware())
+
+        if self.log_path:
+            try:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(event, default=str) + "\n")
+            except OSError as e:
+                logger.warning(f"Failed to persist training metrics to {self.log_path}: {str(e)}")
+        self.sink(event)
+
+    def _sample_hardware(self):
+        sample = {
+            "cpu_percent": self._process.cpu_percent(None),
+            "memory_rss_mb": round(self._process.memory_info().rss / (1024 ** 2), 2),
+        }
+        try:
+            import torch
+
+            if torch.cuda.is_available():
+                sample["gpu_memory_mb"] = round(torch.cuda.memory_allocated() / (1024 ** 2), 2)
+                # utilisation needs NVML, which is not installed everywhere
+                sample["gpu_utilization"] = torch.cuda.utilization()
+        except Exception:
+            pass
+        return sample
+
+
+def read_metrics_log(log_path: str):
+    """
+    Reads the persisted events of a training run.
+
+    Args:
+        log_path (str): The JSON lines log of the run.
+
+    Returns:
+        list: The events, oldest first. A line cut short by a crash is skipped.
+    """
+    events = []
+    if not os.path.exists(log_path):
+        return events
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return events